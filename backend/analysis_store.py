@@ -0,0 +1,139 @@
+"""
+分析结果存储
+负责：把 Dify 工作流产出的评分、摘要、标签、翻译批量写入 article_analyses（按文章 upsert）
+
+只更新本次提交中出现的字段：初评流程只写 filter_score，分析流程再写 score/summary 等，互不覆盖。
+写入分析结果的同时更新文章的 updated_at，增量导出（corpus_export）与订阅缓存按它发现评分 / 精选的变化。
+"""
+
+import json
+from datetime import datetime
+from typing import List, Dict
+
+from sqlalchemy import func
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+
+from models import Article, ArticleAnalysis
+import source_stats
+
+# 以 JSON 文本存储的字段
+JSON_FIELDS = ("tags", "main_points", "key_quotes", "translations")
+
+# 允许写入的字段
+FIELDS = (
+    "filter_score", "score", "one_sentence_summary", "summary", "domain", "ai_subcategory",
+    "tags", "main_points", "key_quotes", "translations", "language", "featured", "workflow_run_id",
+)
+
+# Dify 工作流输出（camelCase）-> 字段
+WORKFLOW_ALIASES = {
+    "oneSentenceSummary": "one_sentence_summary",
+    "aiSubcategory": "ai_subcategory",
+    "mainPoints": "main_points",
+    "keyQuotes": "key_quotes",
+    "filterScore": "filter_score",
+    "workflowRunId": "workflow_run_id",
+}
+
+
+def workflow_fields(output: Dict) -> Dict:
+    """把工作流输出的分析结果转换为 upsert_analyses 的字段（忽略未知字段）"""
+    fields = {}
+    for key, value in output.items():
+        field = WORKFLOW_ALIASES.get(key, key)
+        if field in FIELDS:
+            fields[field] = value
+    return fields
+
+
+def upsert_analyses(db: Session, items: List[Dict]) -> Dict:
+    """
+    批量 upsert 分析结果（单个事务）
+
+    Args:
+        items: [{"article_id": ..., <FIELDS 中的任意字段>}, ...]
+
+    Returns:
+        {"upserted": 写入数, "missing": [不存在的文章ID]}
+    """
+    article_ids = list({item["article_id"] for item in items})
+    published = {}
+    articles = {}  # article_id -> (source_id, created_at, 当前是否精选)
+    for i in range(0, len(article_ids), 500):
+        # 没有发布时间的文章用入库时间代替，保证按日期查询时不被漏掉
+        rows = db.query(
+            Article.id, func.coalesce(Article.published_at, Article.created_at),
+            Article.source_id, Article.created_at, ArticleAnalysis.featured
+        ).outerjoin(
+            ArticleAnalysis, ArticleAnalysis.article_id == Article.id
+        ).filter(Article.id.in_(article_ids[i:i + 500])).all()
+        for article_id, published_at, source_id, created_at, featured in rows:
+            published[article_id] = published_at
+            articles[article_id] = (source_id, created_at, bool(featured))
+
+    now = datetime.utcnow()
+    upserted = 0
+    missing = []
+    featured_changes = []
+
+    for item in items:
+        article_id = item["article_id"]
+        if article_id not in published:
+            missing.append(article_id)
+            continue
+
+        values = {field: item[field] for field in FIELDS if field in item}
+        for field in JSON_FIELDS:
+            if field in values and values[field] is not None and not isinstance(values[field], str):
+                values[field] = json.dumps(values[field], ensure_ascii=False)
+
+        values.update({"analyzed_at": now, "updated_at": now})
+        stmt = sqlite_insert(ArticleAnalysis).values(
+            article_id=article_id,
+            published_at=published[article_id],
+            created_at=now,
+            **values
+        )
+        db.execute(stmt.on_conflict_do_update(index_elements=["article_id"], set_=values))
+        upserted += 1
+
+        if "featured" in values:
+            source_id, created_at, was_featured = articles[article_id]
+            if bool(values["featured"]) != was_featured:
+                featured_changes.append((source_id, created_at, 1 if values["featured"] else -1))
+                articles[article_id] = (source_id, created_at, bool(values["featured"]))
+
+    written = [article_id for article_id in article_ids if article_id in published]
+    for i in range(0, len(written), 500):
+        db.query(Article).filter(Article.id.in_(written[i:i + 500])).update(
+            {Article.updated_at: now}, synchronize_session=False
+        )
+
+    source_stats.record_featured_changes(db, featured_changes)
+    db.commit()
+    return {"upserted": upserted, "missing": missing}
+
+
+def delete_for_articles(db: Session, article_ids: List[str]):
+    """
+    删除文章的分析结果并扣减精选计数（删除文章前调用，不提交）
+
+    SQLite 默认不启用外键，ondelete="CASCADE" 不会生效，因此需要显式删除。
+    """
+    rows = db.query(ArticleAnalysis.article_id, Article.source_id, Article.created_at, ArticleAnalysis.featured).join(
+        Article, Article.id == ArticleAnalysis.article_id
+    ).filter(ArticleAnalysis.article_id.in_(article_ids)).all()
+    source_stats.record_featured_changes(
+        db, [(source_id, created_at, -1) for _, source_id, created_at, featured in rows if featured]
+    )
+    db.query(ArticleAnalysis).filter(ArticleAnalysis.article_id.in_(article_ids)).delete(synchronize_session=False)
+
+
+def analysis_to_dict(analysis: ArticleAnalysis) -> Dict:
+    """分析结果 -> 接口返回的 dict（JSON 字段解码）"""
+    result = {column.name: getattr(analysis, column.name) for column in ArticleAnalysis.__table__.columns}
+    for field in JSON_FIELDS:
+        if result.get(field):
+            result[field] = json.loads(result[field])
+    return result
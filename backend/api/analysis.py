@@ -0,0 +1,121 @@
+"""
+Dify 分析结果 API
+"""
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+from typing import List, Optional, Any, Dict
+from datetime import datetime, timedelta
+from pydantic import BaseModel, ConfigDict, Field
+from database import get_db
+from models import Article, ArticleAnalysis
+from analysis_store import upsert_analyses, analysis_to_dict
+from dispatcher import dispatch_enabled, enqueue_fetched_articles
+
+router = APIRouter()
+
+
+class AnalysisItem(BaseModel):
+    """单篇文章的分析结果（字段名兼容 Dify 工作流输出的 camelCase）"""
+    model_config = ConfigDict(populate_by_name=True)
+
+    article_id: str = Field(alias="articleId")
+    filter_score: Optional[int] = Field(None, alias="filterScore")
+    score: Optional[int] = None
+    one_sentence_summary: Optional[str] = Field(None, alias="oneSentenceSummary")
+    summary: Optional[str] = None
+    domain: Optional[str] = None
+    ai_subcategory: Optional[str] = Field(None, alias="aiSubcategory")
+    tags: Optional[List[str]] = None
+    main_points: Optional[List[Dict[str, Any]]] = Field(None, alias="mainPoints")
+    key_quotes: Optional[List[str]] = Field(None, alias="keyQuotes")
+    translations: Optional[Dict[str, Any]] = None
+    language: Optional[str] = None
+    featured: Optional[bool] = None
+    workflow_run_id: Optional[str] = Field(None, alias="workflowRunId")
+
+
+class AnalysisBulkRequest(BaseModel):
+    items: List[AnalysisItem]
+
+
+@router.post("/api/analysis/bulk")
+def bulk_upsert_analysis(request: AnalysisBulkRequest, db: Session = Depends(get_db)):
+    """
+    批量写入分析结果（Dify 工作流调用）
+
+    按文章 upsert，只更新请求中提供的字段。
+    """
+    items = [item.model_dump(exclude_unset=True) for item in request.items]
+    return upsert_analyses(db, items)
+
+
+@router.post("/api/analysis/dispatch")
+def dispatch_fetched_articles(
+    limit: int = Query(None, ge=1, description="最多入队的文章数"),
+    db: Session = Depends(get_db)
+):
+    """为已提取全文但还没有提交过工作流的文章入队分发任务（由分发线程按并发与 token 预算处理）"""
+    if not dispatch_enabled():
+        raise HTTPException(status_code=400, detail="No Dify workflow configured (ARTICLE_DIFY_*_KEY)")
+    return {"queued": enqueue_fetched_articles(db, limit)}
+
+
+@router.get("/api/analysis/top")
+def top_articles(
+    days: int = Query(7, ge=1, le=365),
+    category: str = Query(None, description="领域分类（domain）"),
+    min_score: int = Query(None, ge=0, le=100),
+    featured: bool = Query(None),
+    limit: int = Query(20, ge=1, le=100),
+    db: Session = Depends(get_db)
+):
+    """近 N 天评分最高的文章（走 published_at + score 索引）"""
+    since = datetime.utcnow() - timedelta(days=days)
+
+    query = db.query(
+        ArticleAnalysis.article_id,
+        ArticleAnalysis.score,
+        ArticleAnalysis.domain,
+        ArticleAnalysis.one_sentence_summary,
+        ArticleAnalysis.featured,
+        ArticleAnalysis.published_at,
+        Article.title,
+        Article.url,
+        Article.author,
+    ).join(Article, Article.id == ArticleAnalysis.article_id).filter(
+        ArticleAnalysis.published_at >= since,
+        ArticleAnalysis.score != None  # noqa: E711
+    )
+
+    if category:
+        query = query.filter(ArticleAnalysis.domain == category)
+    if min_score is not None:
+        query = query.filter(ArticleAnalysis.score >= min_score)
+    if featured is not None:
+        query = query.filter(ArticleAnalysis.featured == featured)
+
+    rows = query.order_by(ArticleAnalysis.score.desc()).limit(limit).all()
+    return [
+        {
+            "id": row.article_id,
+            "title": row.title,
+            "url": row.url,
+            "author": row.author,
+            "score": row.score,
+            "domain": row.domain,
+            "one_sentence_summary": row.one_sentence_summary,
+            "featured": bool(row.featured),
+            "published_at": row.published_at.isoformat() if row.published_at else None,
+        }
+        for row in rows
+    ]
+
+
+@router.get("/api/analysis/{article_id}")
+def get_analysis(article_id: str, db: Session = Depends(get_db)):
+    """单篇文章的分析结果"""
+    analysis = db.get(ArticleAnalysis, article_id)
+    if analysis is None:
+        raise HTTPException(status_code=404, detail=f"Analysis for {article_id} not found")
+    return analysis_to_dict(analysis)
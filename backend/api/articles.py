@@ -3,6 +3,12 @@ from sqlalchemy.orm import Session
 from typing import List
 from models import Article, ArticleCreate, ArticleResponse, MarkdownResponse
 from database import get_db
+import queries
+import analysis_store
+import article_archive
+import view_counter
+from view_counter import get_view_counter
+from responses import FastJSONResponse
 
 router = APIRouter()
 
@@ -19,12 +25,17 @@ def get_article_markdown(
     兼容原 BestBlogs API 格式：
     GET /api/resource/markdown?id=ART_001
     """
-    article = db.query(Article).filter(Article.id == id).first()
+    row = db.execute(queries.article_markdown_stmt(id)).first()
 
-    if not article:
+    if not row:
         raise HTTPException(status_code=404, detail=f"Article {id} not found")
 
-    return MarkdownResponse(content=article.markdown_content)
+    get_view_counter().hit(id)
+
+    # 已归档的文章从归档库读取；全文尚未提取或提取失败时降级返回摘要
+    if article_archive.is_archived(row):
+        return FastJSONResponse({"content": article_archive.archived_markdown(id, row)})
+    return FastJSONResponse({"content": queries.markdown_content(row)})
 
 
 # ========== 文章管理接口（可选） ==========
@@ -53,27 +64,30 @@ def list_articles(
     skip: int = Query(0, ge=0),
     limit: int = Query(10, ge=1, le=100),
     category: str = Query(None),
+    content_language: str = Query(None, description="正文语言，如 zh_CN / en_US"),
+    min_words: int = Query(None, ge=0, description="最少字数（中文按字）"),
+    max_words: int = Query(None, ge=0, description="最多字数"),
+    min_tokens: int = Query(None, ge=0, description="最少估算 token 数"),
+    max_tokens: int = Query(None, ge=0, description="最多估算 token 数"),
     db: Session = Depends(get_db)
 ):
-    """获取文章列表"""
-    query = db.query(Article)
-
-    if category:
-        query = query.filter(Article.category == category)
-
-    articles = query.offset(skip).limit(limit).all()
-    return articles
+    """获取文章列表（可按正文语言、字数、token 数筛选）"""
+    rows = db.execute(queries.list_articles_stmt(
+        skip, limit, category, content_language, min_words, max_words, min_tokens, max_tokens
+    )).all()
+    return FastJSONResponse(queries.article_responses(rows))
 
 
 @router.get("/api/articles/{article_id}", response_model=ArticleResponse)
 def get_article(article_id: str, db: Session = Depends(get_db)):
     """获取单篇文章详情"""
-    article = db.query(Article).filter(Article.id == article_id).first()
+    article = db.execute(queries.article_stmt(article_id)).first()
 
     if not article:
         raise HTTPException(status_code=404, detail=f"Article {article_id} not found")
 
-    return article
+    get_view_counter().hit(article_id)
+    return FastJSONResponse(queries.article_response(article))
 
 
 @router.delete("/api/articles/{article_id}")
@@ -84,6 +98,9 @@ def delete_article(article_id: str, db: Session = Depends(get_db)):
     if not article:
         raise HTTPException(status_code=404, detail=f"Article {article_id} not found")
 
+    # SQLite 未启用外键，分析结果与阅读数需要显式删除（同一事务）
+    analysis_store.delete_for_articles(db, [article_id])
+    view_counter.delete_for_articles(db, [article_id])
     db.delete(article)
     db.commit()
 
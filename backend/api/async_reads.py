@@ -0,0 +1,86 @@
+"""
+读接口的异步实现
+
+与 api/articles.py、api/batches.py 中的同名路由一一对应，使用 AsyncSession 执行
+queries.py 中的同一组语句，请求处理不再占用 FastAPI 的线程池。
+main.py 在 ARTICLE_ASYNC_API=1 且安装了 aiosqlite 时把本路由注册在同步路由之前。
+"""
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from starlette.concurrency import run_in_threadpool
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List
+from models import ArticleResponse, MarkdownResponse
+from database import get_async_db
+from api.batches import BatchInfo, ArticleBrief
+import queries
+import article_archive
+from view_counter import get_view_counter
+from responses import FastJSONResponse
+
+router = APIRouter()
+
+
+@router.get("/api/resource/markdown", response_model=MarkdownResponse)
+async def get_article_markdown(
+    id: str = Query(..., description="文章ID"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """获取文章 Markdown 内容（Dify 工作流调用）"""
+    row = (await db.execute(queries.article_markdown_stmt(id))).first()
+
+    if not row:
+        raise HTTPException(status_code=404, detail=f"Article {id} not found")
+
+    get_view_counter().hit(id)
+
+    if article_archive.is_archived(row):
+        # 归档库用同步 sqlite3 读取，放到线程池中执行
+        content = await run_in_threadpool(article_archive.archived_markdown, id, row)
+        return FastJSONResponse({"content": content})
+    return FastJSONResponse({"content": queries.markdown_content(row)})
+
+
+@router.get("/api/articles", response_model=List[ArticleResponse])
+async def list_articles(
+    skip: int = Query(0, ge=0),
+    limit: int = Query(10, ge=1, le=100),
+    category: str = Query(None),
+    content_language: str = Query(None),
+    min_words: int = Query(None, ge=0),
+    max_words: int = Query(None, ge=0),
+    min_tokens: int = Query(None, ge=0),
+    max_tokens: int = Query(None, ge=0),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """获取文章列表（可按正文语言、字数、token 数筛选）"""
+    rows = (await db.execute(queries.list_articles_stmt(
+        skip, limit, category, content_language, min_words, max_words, min_tokens, max_tokens
+    ))).all()
+    return FastJSONResponse(queries.article_responses(rows))
+
+
+@router.get("/api/batches", response_model=List[BatchInfo])
+async def list_batches(db: AsyncSession = Depends(get_async_db)):
+    """获取所有文章批次列表"""
+    results = (await db.execute(queries.batches_stmt())).all()
+    return FastJSONResponse(queries.batch_infos(results))
+
+
+@router.get("/api/batches/{batch_date}/articles", response_model=List[ArticleBrief])
+async def get_batch_articles(
+    batch_date: str,  # 格式：YYYY-MM-DD
+    db: AsyncSession = Depends(get_async_db)
+):
+    """获取指定批次的文章列表"""
+    try:
+        stmt = queries.batch_articles_stmt(batch_date)
+    except ValueError:
+        raise HTTPException(status_code=404, detail=f"No articles found for batch {batch_date}")
+
+    articles = (await db.execute(stmt)).all()
+
+    if not articles:
+        raise HTTPException(status_code=404, detail=f"No articles found for batch {batch_date}")
+
+    return FastJSONResponse(queries.article_briefs(articles))
@@ -0,0 +1,94 @@
+"""
+回填 / 重新提取 API
+"""
+
+import threading
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.orm import Session
+from typing import List, Optional
+from datetime import datetime
+from pydantic import BaseModel
+from database import get_db
+from models import BackfillRun
+from backfill import MODES, is_stale, pause_backfill, run_backfill_in_new_session
+
+router = APIRouter()
+
+
+class BackfillRequest(BaseModel):
+    name: str  # 同名任务从断点继续
+    mode: str = "extract"  # extract / summary / metrics
+    status: Optional[List[str]] = None  # 按提取状态筛选
+    source_id: Optional[int] = None
+    since: Optional[str] = None  # YYYY-MM-DD（含）
+    until: Optional[str] = None  # YYYY-MM-DD（不含）
+    min_length: Optional[int] = None
+    max_length: Optional[int] = None
+    page_size: int = 200
+    max_outstanding: int = 500
+
+
+class BackfillRunResponse(BaseModel):
+    name: str
+    mode: str
+    filters: Optional[str] = None
+    status: str
+    last_key: Optional[str] = None
+    scanned: int
+    processed: int
+    last_error: Optional[str] = None
+    heartbeat_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
+
+@router.post("/api/backfill")
+def start_backfill(request: BackfillRequest, db: Session = Depends(get_db)):
+    """
+    启动（或从断点继续）回填任务；extract 模式只负责入队，由提取 worker 处理
+
+    状态为 running 但心跳已过期（运行它的进程崩溃）的任务直接接管，从断点继续。
+    """
+    if request.mode not in MODES:
+        raise HTTPException(status_code=400, detail=f"Unknown backfill mode: {request.mode}")
+
+    existing = db.get(BackfillRun, request.name)
+    if existing is not None and existing.status == "running" and not is_stale(existing):
+        raise HTTPException(status_code=409, detail=f"Backfill {request.name} is already running")
+
+    filters = request.model_dump(include={"status", "source_id", "since", "until", "min_length", "max_length"},
+                                 exclude_none=True)
+    threading.Thread(
+        target=run_backfill_in_new_session,
+        args=(request.name, request.mode, filters),
+        kwargs={"page_size": request.page_size, "max_outstanding": request.max_outstanding},
+        name=f"backfill-{request.name}",
+        daemon=True
+    ).start()
+
+    return {"message": f"Backfill {request.name} started"}
+
+
+@router.get("/api/backfill", response_model=List[BackfillRunResponse])
+def list_backfills(db: Session = Depends(get_db)):
+    """回填任务列表"""
+    return db.query(BackfillRun).order_by(BackfillRun.updated_at.desc()).all()
+
+
+@router.get("/api/backfill/{name}", response_model=BackfillRunResponse)
+def get_backfill(name: str, db: Session = Depends(get_db)):
+    """回填任务进度"""
+    run = db.get(BackfillRun, name)
+    if run is None:
+        raise HTTPException(status_code=404, detail=f"Backfill {name} not found")
+    return run
+
+
+@router.post("/api/backfill/{name}/pause")
+def pause(name: str, db: Session = Depends(get_db)):
+    """暂停回填任务（再次 POST /api/backfill 同名任务即可继续）"""
+    if not pause_backfill(db, name):
+        raise HTTPException(status_code=404, detail=f"Backfill {name} not found")
+    return {"message": f"Backfill {name} paused"}
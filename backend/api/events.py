@@ -0,0 +1,97 @@
+"""
+入库事件推送 API（Server-Sent Events）
+"""
+
+import asyncio
+import json
+
+from fastapi import APIRouter, Header, Query, Request
+from fastapi.responses import StreamingResponse
+from events import get_event_bus, PublishedEvent, EVENT_TYPES
+
+router = APIRouter()
+
+HEARTBEAT_SECONDS = 15
+RETRY_MILLISECONDS = 3000
+
+
+def _format(published: PublishedEvent) -> str:
+    data = json.dumps(published.data, ensure_ascii=False)
+    return f"id: {published.id}\nevent: {published.type}\ndata: {data}\n\n"
+
+
+@router.get("/api/events")
+async def stream_events(
+    request: Request,
+    types: str = Query(None, description="事件类型，逗号分隔：article.created,article.extracted"),
+    source: int = Query(None, description="RSS 源ID"),
+    category: str = Query(None),
+    language: str = Query(None, description="语言前缀，如 zh / en"),
+    last_event_id: int = Query(None, alias="lastEventId", description="从该事件之后续传"),
+    last_event_id_header: str = Header(None, alias="Last-Event-ID"),
+):
+    """
+    订阅文章入库事件（SSE）
+
+    - article.created：抓取到新文章
+    - article.extracted：全文提取完成
+
+    断线重连时浏览器会自动带上 Last-Event-ID，从缓冲区补发错过的事件；
+    续传位置已不在缓冲区时先发送 reset 事件，客户端应重新拉取列表。
+    """
+    wanted_types = {t.strip() for t in types.split(",") if t.strip()} if types else set(EVENT_TYPES)
+    if last_event_id is None and last_event_id_header and last_event_id_header.isdigit():
+        last_event_id = int(last_event_id_header)
+
+    def matches(published: PublishedEvent) -> bool:
+        data = published.data
+        if published.type not in wanted_types:
+            return False
+        if source is not None and data.get("source_id") != source:
+            return False
+        if category and data.get("category") != category:
+            return False
+        if language and not (data.get("language") or "").startswith(language):
+            return False
+        return True
+
+    bus = get_event_bus()
+    subscription = bus.subscribe(last_event_id)
+
+    async def event_stream():
+        try:
+            yield f"retry: {RETRY_MILLISECONDS}\n\n"
+            if subscription.gap:
+                yield "event: reset\ndata: {}\n\n"
+
+            sent = last_event_id or 0
+            for published in subscription.backlog:
+                if matches(published):
+                    yield _format(published)
+                sent = published.id
+
+            while not await request.is_disconnected():
+                if subscription.overflowed and subscription.queue.empty():
+                    # 消费太慢被断开，客户端带 Last-Event-ID 重连后从缓冲区续传
+                    break
+                try:
+                    published = await asyncio.wait_for(subscription.queue.get(), HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+                if published.id > sent and matches(published):
+                    yield _format(published)
+                    sent = published.id
+        finally:
+            bus.unsubscribe(subscription)
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no",
+            # 已设置 Content-Encoding 时 GZipMiddleware 不再压缩/缓冲事件流
+            "Content-Encoding": "identity",
+        },
+    )
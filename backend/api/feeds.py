@@ -0,0 +1,79 @@
+"""
+RSS / Atom 订阅输出 API
+"""
+
+from fastapi import APIRouter, Depends, Header, Query
+from fastapi.responses import Response
+from sqlalchemy.orm import Session
+from database import get_db
+from feed_output import FeedParams, get_feed_cache, http_date, not_modified
+
+router = APIRouter()
+
+MEDIA_TYPES = {
+    "rss": "application/rss+xml; charset=utf-8",
+    "atom": "application/atom+xml; charset=utf-8",
+}
+
+
+def _feed_response(
+    format: str,
+    category: str,
+    language: str,
+    source: int,
+    min_score: int,
+    featured: str,
+    if_none_match: str,
+    if_modified_since: str,
+    db: Session,
+) -> Response:
+    params = FeedParams.build(
+        format=format,
+        category=category,
+        language=language,
+        source_id=source,
+        min_score=min_score,
+        featured=(featured or "").lower() in ("y", "yes", "1", "true"),
+    )
+    feed = get_feed_cache().get(db, params)
+
+    headers = {
+        "ETag": feed.etag,
+        "Last-Modified": http_date(feed.last_modified),
+        "Cache-Control": "public, max-age=60",
+    }
+    if not_modified(feed, if_none_match, if_modified_since):
+        return Response(status_code=304, headers=headers)
+    return Response(content=feed.body, media_type=MEDIA_TYPES[format], headers=headers)
+
+
+@router.get("/feeds/rss")
+def rss_feed(
+    category: str = Query(None, description="分类：ai / programming / product 或源分类名"),
+    language: str = Query(None, description="语言，如 zh / en / zh_CN"),
+    source: int = Query(None, description="RSS 源ID"),
+    min_score: int = Query(None, alias="minScore", ge=0, le=100),
+    featured: str = Query(None, description="y 表示只看精选"),
+    if_none_match: str = Header(None),
+    if_modified_since: str = Header(None),
+    db: Session = Depends(get_db)
+):
+    """RSS 2.0 订阅（支持 ETag / Last-Modified 条件请求）"""
+    return _feed_response("rss", category, language, source, min_score, featured,
+                          if_none_match, if_modified_since, db)
+
+
+@router.get("/feeds/atom")
+def atom_feed(
+    category: str = Query(None, description="分类：ai / programming / product 或源分类名"),
+    language: str = Query(None, description="语言，如 zh / en / zh_CN"),
+    source: int = Query(None, description="RSS 源ID"),
+    min_score: int = Query(None, alias="minScore", ge=0, le=100),
+    featured: str = Query(None, description="y 表示只看精选"),
+    if_none_match: str = Header(None),
+    if_modified_since: str = Header(None),
+    db: Session = Depends(get_db)
+):
+    """Atom 订阅（支持 ETag / Last-Modified 条件请求）"""
+    return _feed_response("atom", category, language, source, min_score, featured,
+                          if_none_match, if_modified_since, db)
@@ -0,0 +1,58 @@
+"""
+任务队列管理 API
+"""
+
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+from typing import List, Optional
+from datetime import datetime
+from pydantic import BaseModel
+from database import get_db
+from models import Job
+from job_queue import JobQueue
+
+router = APIRouter()
+
+
+class JobResponse(BaseModel):
+    id: int
+    kind: str
+    key: str
+    priority: int
+    status: str
+    attempts: int
+    max_attempts: int
+    available_at: Optional[datetime] = None
+    lease_owner: Optional[str] = None
+    last_error: Optional[str] = None
+    updated_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
+
+@router.get("/api/jobs/stats")
+def job_stats(db: Session = Depends(get_db)):
+    """各类型任务的状态计数"""
+    return JobQueue(db).stats()
+
+
+@router.get("/api/jobs", response_model=List[JobResponse])
+def list_jobs(
+    status: str = Query("dead", description="queued / leased / done / dead"),
+    kind: str = Query(None),
+    limit: int = Query(50, ge=1, le=500),
+    db: Session = Depends(get_db)
+):
+    """按状态查看任务（默认查看死信）"""
+    query = db.query(Job).filter(Job.status == status)
+    if kind:
+        query = query.filter(Job.kind == kind)
+    return query.order_by(Job.updated_at.desc()).limit(limit).all()
+
+
+@router.post("/api/jobs/retry-dead")
+def retry_dead_jobs(kind: str = None, db: Session = Depends(get_db)):
+    """把死信任务重新放回队列"""
+    count = JobQueue(db).retry_dead(kind)
+    return {"message": f"{count} dead jobs requeued"}
@@ -0,0 +1,35 @@
+"""
+性能剖析 API（只在 ARTICLE_PROFILING=1 时注册）
+"""
+
+import os
+
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import FileResponse
+import profiling
+
+router = APIRouter()
+
+
+@router.post("/api/profile/arm")
+def arm_profile(
+    target: str = Query(..., description="fetch_all_sources、extract_batch_content 或请求路径（如 /api/batches）")
+):
+    """预约剖析下一次抓取 / 提取运行或下一个访问该路径的请求（对独立 worker 进程同样有效）"""
+    profiling.arm(target)
+    return {"armed": target}
+
+
+@router.get("/api/profile")
+def list_profiles(limit: int = Query(50, ge=1, le=500)):
+    """最近的剖析输出（.folded 采样结果、.sql.txt SQL 统计）"""
+    return profiling.list_outputs(limit)
+
+
+@router.get("/api/profile/{name}")
+def download_profile(name: str):
+    """下载剖析输出文件"""
+    path = os.path.join(profiling.PROFILE_DIR, os.path.basename(name))
+    if not os.path.isfile(path):
+        raise HTTPException(status_code=404, detail=f"Profile {name} not found")
+    return FileResponse(path, media_type="text/plain; charset=utf-8")
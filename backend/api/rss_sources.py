@@ -4,12 +4,15 @@ RSS 源管理 API
 
 from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
+from datetime import datetime
 from pydantic import BaseModel
-from database import get_db
+from database import get_db, SessionLocal
 from models import RSSSource
 from rss_manager import RSSSourceManager
-from rss_fetcher import RSSFetcher
+from rss_fetcher import RSSFetcher, FETCH_JOB
+from job_queue import JobQueue, PRIORITY_HIGH
+from settings import EMBEDDED_INGESTION
 
 router = APIRouter()
 
@@ -30,7 +33,15 @@ class RSSSourceResponse(BaseModel):
     category: str
     language: str
     enabled: bool
-    last_fetched_at: str = None
+    last_fetched_at: Optional[datetime] = None
+    # 健康状态
+    consecutive_failures: Optional[int] = 0
+    last_error: Optional[str] = None
+    last_success_at: Optional[datetime] = None
+    last_failure_at: Optional[datetime] = None
+    avg_latency_ms: Optional[float] = None
+    avg_entries_per_poll: Optional[float] = None
+    quarantined_until: Optional[datetime] = None
 
     class Config:
         from_attributes = True
@@ -38,6 +49,9 @@ class RSSSourceResponse(BaseModel):
 
 class OPMLImportRequest(BaseModel):
     opml_file_path: str
+    validate_feeds: bool = False  # 是否并发校验新源
+    concurrency: int = 16  # 校验并发数
+    disable_invalid: bool = True  # 校验失败的源以禁用状态导入
 
 
 # ========== RSS 源管理接口 ==========
@@ -64,11 +78,12 @@ def create_rss_source(
 @router.get("/api/rss/sources", response_model=List[RSSSourceResponse])
 def list_rss_sources(
     enabled_only: bool = False,
+    quarantined_only: bool = False,
     db: Session = Depends(get_db)
 ):
-    """获取 RSS 源列表"""
+    """获取 RSS 源列表（含健康状态）"""
     manager = RSSSourceManager(db)
-    sources = manager.list_sources(enabled_only=enabled_only)
+    sources = manager.list_sources(enabled_only=enabled_only, quarantined_only=quarantined_only)
     return sources
 
 
@@ -77,10 +92,15 @@ def import_opml(
     request: OPMLImportRequest,
     db: Session = Depends(get_db)
 ):
-    """从 OPML 文件导入 RSS 源"""
+    """从 OPML 文件导入 RSS 源（可选并发校验，stats.validation 为每个新源的校验结果）"""
     manager = RSSSourceManager(db)
     try:
-        stats = manager.import_from_opml(request.opml_file_path)
+        stats = manager.import_from_opml(
+            request.opml_file_path,
+            validate=request.validate_feeds,
+            concurrency=request.concurrency,
+            disable_invalid=request.disable_invalid
+        )
         return {
             "message": "OPML import completed",
             "stats": stats
@@ -91,7 +111,7 @@ def import_opml(
 
 @router.post("/api/rss/sources/{source_id}/enable")
 def enable_source(source_id: int, db: Session = Depends(get_db)):
-    """启用 RSS 源"""
+    """启用 RSS 源（同时解除隔离）"""
     manager = RSSSourceManager(db)
     manager.enable_source(source_id)
     return {"message": f"Source {source_id} enabled"}
@@ -118,15 +138,25 @@ def delete_source(source_id: int, db: Session = Depends(get_db)):
 @router.post("/api/rss/fetch")
 def fetch_rss_feeds(
     background_tasks: BackgroundTasks,
-    max_articles_per_source: int = 5,
+    max_articles_per_source: Optional[int] = None,
     db: Session = Depends(get_db)
 ):
     """手动触发 RSS 抓取"""
+    if not EMBEDDED_INGESTION:
+        # 只读 API 模式：入队抓取任务，由独立 worker 领取
+        JobQueue(db).enqueue(FETCH_JOB, "all", priority=PRIORITY_HIGH, reset=True)
+        db.commit()
+        return {"message": "RSS fetch queued for worker"}
 
     def fetch_task():
-        fetcher = RSSFetcher(db)
-        stats = fetcher.fetch_all_sources(max_articles_per_source)
-        print(f"✅ Fetch completed: {stats}")
+        # 后台任务在响应返回后运行，不能复用请求的会话
+        task_db = SessionLocal()
+        try:
+            fetcher = RSSFetcher(task_db)
+            stats = fetcher.fetch_all_sources(max_articles_per_source)
+            print(f"✅ Fetch completed: {stats}")
+        finally:
+            task_db.close()
 
     background_tasks.add_task(fetch_task)
     return {"message": "RSS fetch started in background"}
@@ -136,14 +166,21 @@ def fetch_rss_feeds(
 def extract_content(
     background_tasks: BackgroundTasks,
     limit: int = 10,
-    db: Session = Depends(get_db)
+    workers: int = 1
 ):
-    """手动触发全文提取"""
+    """手动触发全文提取（从任务队列领取）"""
+    if not EMBEDDED_INGESTION:
+        # 只读 API 模式：worker 持续消费提取队列，这里无需触发
+        return {"message": "Content extraction is handled by the worker queue"}
 
     def extract_task():
-        fetcher = RSSFetcher(db)
-        stats = fetcher.extract_batch_content(limit)
-        print(f"✅ Extraction completed: {stats}")
+        task_db = SessionLocal()
+        try:
+            fetcher = RSSFetcher(task_db)
+            stats = fetcher.extract_batch_content(limit, workers=workers)
+            print(f"✅ Extraction completed: {stats}")
+        finally:
+            task_db.close()
 
     background_tasks.add_task(extract_task)
     return {"message": "Content extraction started in background"}
@@ -0,0 +1,27 @@
+"""
+按源统计 API
+"""
+
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+from database import get_db
+import source_stats
+
+router = APIRouter()
+
+
+@router.get("/api/stats/sources")
+def get_source_stats(
+    windows: str = Query("7,30,90", description="统计窗口（天），逗号分隔"),
+    db: Session = Depends(get_db)
+):
+    """
+    每个源近 N 天入库文章的数量、提取状态、精选数与字数，以及全部文章的状态计数
+
+    数据来自增量维护的统计表，不扫描 articles。
+    """
+    days = tuple(sorted({int(n) for n in windows.split(",") if n.strip().isdigit() and 0 < int(n) <= 366}))
+    return {
+        "totals": source_stats.status_counts(db),
+        "sources": source_stats.rolling_stats(db, days or source_stats.WINDOWS),
+    }
@@ -0,0 +1,31 @@
+"""
+阅读数 API（热门 / 趋势）
+"""
+
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+from database import get_db
+import view_counter
+
+router = APIRouter()
+
+
+@router.get("/api/views/popular")
+def get_popular_articles(
+    limit: int = Query(20, ge=1, le=100),
+    source: int = Query(None, description="只看某个源"),
+    db: Session = Depends(get_db)
+):
+    """累计阅读数最多的文章（数据有最多一个刷新周期的延迟）"""
+    return view_counter.popular(db, limit=limit, source_id=source)
+
+
+@router.get("/api/views/trending")
+def get_trending_articles(
+    days: int = Query(7, ge=1, le=90, description="统计近 N 天的阅读"),
+    limit: int = Query(20, ge=1, le=100),
+    source: int = Query(None, description="只看某个源"),
+    db: Session = Depends(get_db)
+):
+    """近 N 天阅读数最多的文章"""
+    return view_counter.trending(db, days=days, limit=limit, source_id=source)
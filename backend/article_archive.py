@@ -0,0 +1,235 @@
+"""
+文章冷热分层归档
+负责：把入库超过 ARCHIVE_AFTER_DAYS 天的文章正文与摘要移入按月的归档库，读取时透明回落到归档
+
+存储布局：
+    data/archive/articles-YYYY-MM.db   每月一个 SQLite 文件（按入库时间分月），
+                                       表 archived_articles(id, markdown, summary)，正文 zlib 压缩
+
+articles 表中归档过的文章保留全部元数据（标题、链接、时间、指标等）与摘要开头，
+markdown_content 置空并记录 archive_month；/api/resource/markdown 遇到这样的行时从归档库读取。
+热表只剩近期正文，常用数据可以常驻页缓存；旧月份的归档文件可以单独备份或移到冷存储。
+
+先写归档库并提交，再清空热表中的正文，中途失败重跑即可（归档写入是幂等的）。
+
+用法（在 backend 目录下）:
+    python -m article_archive --after-days 180
+    python -m article_archive --after-days 180 --vacuum   # 归档后回收 articles.db 的空间
+    python -m article_archive --restore ART_xxx           # 把文章正文恢复到热表
+"""
+
+import argparse
+import logging
+import os
+import sqlite3
+import zlib
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from database import DB_DIR, SessionLocal, engine, init_db
+from models import Article
+import settings
+
+logger = logging.getLogger(__name__)
+
+ARCHIVE_DIR = os.path.join(DB_DIR, "archive")
+STUB_SUMMARY_CHARS = 300  # 热表中保留的摘要长度（列表接口使用）
+COMPRESS_LEVEL = 6
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS archived_articles (
+    id TEXT PRIMARY KEY,
+    markdown BLOB,
+    summary TEXT,
+    archived_at TEXT
+)
+"""
+
+
+def archive_path(month: str, root: str = ARCHIVE_DIR) -> str:
+    return os.path.join(root, f"articles-{month}.db")
+
+
+def _connect(path: str, readonly: bool = False) -> sqlite3.Connection:
+    if readonly:
+        return sqlite3.connect(f"file:{path}?mode=ro", uri=True, timeout=30)
+    conn = sqlite3.connect(path, timeout=30)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute(_SCHEMA)
+    return conn
+
+
+def read_archived(month: str, article_id: str, root: str = ARCHIVE_DIR) -> Optional[Tuple[str, str]]:
+    """
+    从归档库读取文章正文与摘要
+
+    Returns:
+        (markdown, summary)；归档库或记录不存在时返回 None
+    """
+    path = archive_path(month, root)
+    if not os.path.exists(path):
+        return None
+    conn = _connect(path, readonly=True)
+    try:
+        row = conn.execute(
+            "SELECT markdown, summary FROM archived_articles WHERE id = ?", (article_id,)
+        ).fetchone()
+    finally:
+        conn.close()
+    if row is None:
+        return None
+    markdown, summary = row
+    return (zlib.decompress(markdown).decode("utf-8") if markdown else ""), (summary or "")
+
+
+def is_archived(row) -> bool:
+    """article_markdown_stmt 的结果行是否需要回落到归档库"""
+    return bool(row.archive_month) and not row.markdown_content
+
+
+def archived_markdown(article_id: str, row) -> str:
+    """已归档文章的 Markdown 内容（与 queries.markdown_content 相同的降级规则）"""
+    archived = read_archived(row.archive_month, article_id)
+    if archived is None:
+        logger.warning(f"Archive entry missing for {article_id} ({row.archive_month})")
+        return row.summary or ""
+    markdown, summary = archived
+    return markdown or summary or row.summary or ""
+
+
+class ArticleArchiver:
+    """把旧文章的正文移入按月归档库"""
+
+    def __init__(self, db: Session, after_days: int = None, root: str = ARCHIVE_DIR, batch_size: int = 500):
+        self.db = db
+        self.after_days = after_days if after_days is not None else settings.ARCHIVE_AFTER_DAYS
+        self.root = root
+        self.batch_size = batch_size
+        os.makedirs(self.root, exist_ok=True)
+
+    def run(self) -> Dict[str, int]:
+        """
+        归档所有超过期限且还在热表中的文章（待提取的文章除外）
+
+        Returns:
+            {"archived": 归档文章数, "months": 涉及的月份数}
+        """
+        if self.after_days <= 0:
+            return {"archived": 0, "months": 0}
+
+        cutoff = datetime.utcnow() - timedelta(days=self.after_days)
+        archived = 0
+        months = set()
+        last_key = None
+
+        while True:
+            query = self.db.query(
+                Article.id, Article.created_at, Article.markdown_content, Article.summary
+            ).filter(
+                Article.archived_at == None,  # noqa: E711
+                Article.created_at < cutoff,
+                Article.fetch_status != "pending",
+            )
+            if last_key:
+                query = query.filter(Article.id > last_key)
+            rows = query.order_by(Article.id).limit(self.batch_size).all()
+            if not rows:
+                break
+            last_key = rows[-1].id
+
+            by_month: Dict[str, List] = defaultdict(list)
+            for row in rows:
+                by_month[row.created_at.strftime("%Y-%m")].append(row)
+
+            # 先持久化归档，再清空热表中的正文
+            for month, month_rows in by_month.items():
+                self._write_month(month, month_rows)
+                months.add(month)
+
+            now = datetime.utcnow()
+            for month, month_rows in by_month.items():
+                for row in month_rows:
+                    self.db.query(Article).filter(Article.id == row.id).update({
+                        Article.markdown_content: None,
+                        Article.summary: (row.summary or "")[:STUB_SUMMARY_CHARS],
+                        Article.archive_month: month,
+                        Article.archived_at: now,
+                    }, synchronize_session=False)
+            self.db.commit()
+            archived += len(rows)
+            logger.info(f"🗄️ Archived {archived} articles")
+
+        return {"archived": archived, "months": len(months)}
+
+    def restore(self, article_id: str) -> bool:
+        """把已归档文章的正文与摘要恢复到热表（归档库中的记录保留）"""
+        article = self.db.query(Article).filter(Article.id == article_id).first()
+        if article is None or not article.archive_month:
+            return False
+        archived = read_archived(article.archive_month, article_id, self.root)
+        if archived is None:
+            return False
+
+        article.markdown_content, article.summary = archived[0] or None, archived[1]
+        article.archive_month = None
+        article.archived_at = None
+        self.db.commit()
+        return True
+
+    def _write_month(self, month: str, rows: List):
+        conn = _connect(archive_path(month, self.root))
+        try:
+            now = datetime.utcnow().isoformat()
+            conn.executemany(
+                "INSERT OR REPLACE INTO archived_articles (id, markdown, summary, archived_at) VALUES (?, ?, ?, ?)",
+                [(
+                    row.id,
+                    zlib.compress(row.markdown_content.encode("utf-8"), COMPRESS_LEVEL) if row.markdown_content else None,
+                    row.summary,
+                    now,
+                ) for row in rows]
+            )
+            conn.commit()
+        finally:
+            conn.close()
+
+
+def vacuum():
+    """回收 articles.db 中被清空正文占用的空间（需要独占数据库，耗时与库大小成正比）"""
+    with engine.connect() as conn:
+        conn.execute(text("VACUUM"))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="文章冷热分层归档")
+    parser.add_argument("--after-days", type=int, default=settings.ARCHIVE_AFTER_DAYS,
+                        help="归档入库超过多少天的文章")
+    parser.add_argument("--vacuum", action="store_true", help="归档后执行 VACUUM 回收空间")
+    parser.add_argument("--restore", metavar="ARTICLE_ID", help="恢复单篇文章到热表")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    init_db()
+
+    db = SessionLocal()
+    try:
+        archiver = ArticleArchiver(db, after_days=args.after_days)
+        if args.restore:
+            print("restored" if archiver.restore(args.restore) else "not archived")
+            return
+        if args.after_days <= 0:
+            parser.error("--after-days（或 ARTICLE_ARCHIVE_AFTER_DAYS）必须大于 0")
+        print(archiver.run())
+    finally:
+        db.close()
+
+    if args.vacuum:
+        vacuum()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,338 @@
+"""
+回填 / 重新提取
+负责：按条件（状态、来源、日期、正文长度）筛选历史文章，重新提取全文、重新清洗摘要或重新计算正文指标
+
+- 键集分页（id > 断点 ORDER BY id）流式扫描，不做 OFFSET 全表扫描
+- 每页处理完成后把断点写入 backfill_runs，崩溃后用同名任务重新运行即可继续
+- extract 模式把文章以低优先级放入提取队列，由提取 worker 并行处理；
+  队列中未完成的回填任务超过 max_outstanding 时暂停入队，不会挤占实时抓取
+- 运行期间后台线程每 HEARTBEAT_SECONDS 秒写一次心跳；进程崩溃后心跳超过 STALE_AFTER 的
+  running 任务视为失效，可以被同名任务接管继续
+
+用法（在 backend 目录下）:
+    python backfill.py --name failed-2026-10 --mode extract --status failed
+    python backfill.py --name short-bodies --mode extract --max-length 500 --since 2026-09-01 --workers 4
+    python backfill.py --name clean-summary --mode summary --source-id 12
+    python backfill.py --name metrics --mode metrics --status fetched
+"""
+
+import argparse
+import html
+import json
+import logging
+import re
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Optional, Dict, List
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session, undefer
+import trafilatura
+
+from database import SessionLocal, init_db
+from entry_normalizer import utc_timestamp
+from job_queue import JobQueue, PRIORITY_LOW
+from models import Article, BackfillRun, Job
+from rss_fetcher import RSSFetcher, EXTRACT_JOB
+from text_metrics import apply_metrics
+
+logger = logging.getLogger(__name__)
+
+MODES = ("extract", "summary", "metrics")
+HEARTBEAT_SECONDS = 30
+STALE_AFTER = timedelta(minutes=2)  # 心跳超过该时长没有更新的 running 任务视为进程已退出
+
+# 摘要中仍然含有 HTML 标签或实体时才需要重新清洗
+_HTML_MARKUP = re.compile(r"<[a-zA-Z/!][^>]*>|&(?:[a-zA-Z]+|#\d+|#x[0-9a-fA-F]+);")
+
+
+class BackfillRunner:
+    """单个回填任务的执行器"""
+
+    def __init__(self, db: Session, name: str, mode: str = "extract", filters: Dict = None,
+                 page_size: int = 200, max_outstanding: int = 500, pause_seconds: float = 5,
+                 workers: int = 0):
+        """
+        Args:
+            db: 数据库会话
+            name: 任务名（断点按任务名保存）
+            mode: extract / summary / metrics
+            filters: {"status": [...], "source_id": int, "since": "YYYY-MM-DD",
+                      "until": "YYYY-MM-DD", "min_length": int, "max_length": int}
+            page_size: 每页扫描的文章数
+            max_outstanding: extract 模式下队列中最多允许的未完成回填任务数
+            pause_seconds: 等待队列消化时的轮询间隔
+            workers: 大于 0 时在当前进程内并行消费提取队列（否则交给独立 worker）
+        """
+        if mode not in MODES:
+            raise ValueError(f"Unknown backfill mode: {mode}")
+
+        self.db = db
+        self.name = name
+        self.mode = mode
+        self.filters = filters or {}
+        self.page_size = page_size
+        self.max_outstanding = max_outstanding
+        self.pause_seconds = pause_seconds
+        self.workers = workers
+
+    def run(self) -> BackfillRun:
+        """从断点开始运行直到扫描完成或被暂停"""
+        run = self._load_or_create_run()
+        run.status = "running"
+        run.heartbeat_at = datetime.utcnow()
+        self.db.commit()
+
+        heartbeat = _Heartbeat(self.name)
+        heartbeat.start()
+        try:
+            while True:
+                self.db.refresh(run)
+                if run.status == "paused":
+                    logger.info(f"⏸️ Backfill {self.name} paused at {run.last_key}")
+                    return run
+
+                rows = self._next_page(run.last_key)
+                if not rows:
+                    run.status = "done"
+                    self.db.commit()
+                    logger.info(f"✅ Backfill {self.name} done: scanned {run.scanned}, processed {run.processed}")
+                    return run
+
+                if self.mode == "extract":
+                    self._wait_for_capacity()
+                    processed = self._enqueue_extract(rows)
+                elif self.mode == "metrics":
+                    processed = self._recompute_metrics([row.id for row in rows])
+                else:
+                    processed = self._clean_summaries([row.id for row in rows])
+
+                # 检查点：本页已经完成，写入断点
+                run.last_key = rows[-1].id
+                run.scanned += len(rows)
+                run.processed += processed
+                self.db.commit()
+                logger.info(f"📦 Backfill {self.name}: scanned {run.scanned}, processed {run.processed}")
+
+                if self.workers:
+                    self._drain()
+
+        except Exception as e:
+            self.db.rollback()
+            run.status = "failed"
+            run.last_error = str(e)
+            self.db.commit()
+            raise
+        finally:
+            heartbeat.stop()
+
+    def _load_or_create_run(self) -> BackfillRun:
+        run = self.db.get(BackfillRun, self.name)
+        if run is None:
+            run = BackfillRun(
+                name=self.name,
+                mode=self.mode,
+                filters=json.dumps(self.filters),
+                scanned=0,
+                processed=0
+            )
+            self.db.add(run)
+            self.db.commit()
+        else:
+            # 续跑时沿用首次运行的参数，保证断点含义一致
+            self.mode = run.mode
+            self.filters = json.loads(run.filters or "{}")
+        return run
+
+    def _next_page(self, last_key: Optional[str]) -> List:
+        """键集分页取下一页（只取需要的列）"""
+        # 已归档文章的正文不在热表中，不参与回填
+        query = self.db.query(Article.id, Article.published_at).filter(Article.archived_at == None)  # noqa: E711
+
+        if last_key:
+            query = query.filter(Article.id > last_key)
+
+        statuses = self.filters.get("status")
+        if statuses:
+            query = query.filter(Article.fetch_status.in_(
+                [statuses] if isinstance(statuses, str) else statuses
+            ))
+        if self.filters.get("source_id"):
+            query = query.filter(Article.source_id == self.filters["source_id"])
+        if self.filters.get("since"):
+            query = query.filter(Article.created_at >= datetime.fromisoformat(self.filters["since"]))
+        if self.filters.get("until"):
+            query = query.filter(Article.created_at < datetime.fromisoformat(self.filters["until"]))
+
+        length = func.length(func.coalesce(Article.markdown_content, ""))
+        if self.filters.get("min_length") is not None:
+            query = query.filter(length >= self.filters["min_length"])
+        if self.filters.get("max_length") is not None:
+            query = query.filter(length <= self.filters["max_length"])
+
+        return query.order_by(Article.id).limit(self.page_size).all()
+
+    def _outstanding(self) -> int:
+        """队列中尚未完成的回填提取任务数"""
+        return self.db.query(func.count(Job.id)).filter(
+            Job.kind == EXTRACT_JOB,
+            Job.priority == PRIORITY_LOW,
+            Job.status.in_(["queued", "leased"])
+        ).scalar()
+
+    def _wait_for_capacity(self):
+        """节流：等待队列中的回填任务被消化到阈值以下"""
+        while self._outstanding() >= self.max_outstanding:
+            if self.workers:
+                self._drain()
+            else:
+                time.sleep(self.pause_seconds)
+
+    def _enqueue_extract(self, rows) -> int:
+        """以低优先级把文章放入提取队列（已完成的任务会被重置）"""
+        JobQueue(self.db).enqueue_many(EXTRACT_JOB, [
+            {
+                "key": row.id,
+                "payload": {"reextract": True, "backfill": self.name},
+                "priority": PRIORITY_LOW,
+                "order_key": utc_timestamp(row.published_at),
+            }
+            for row in rows
+        ], reset=True)
+        return len(rows)
+
+    def _clean_summaries(self, article_ids: List[str]) -> int:
+        """重新清洗摘要中的 HTML（已经是纯文本的摘要跳过；不会截断成 500 字的兜底摘要）"""
+        articles = self.db.query(Article).options(undefer(Article.summary)).filter(
+            Article.id.in_(article_ids)
+        ).all()
+        changed = 0
+        for article in articles:
+            summary = article.summary or ""
+            if not _HTML_MARKUP.search(summary):
+                continue
+            cleaned = trafilatura.extract(summary, output_format="txt") or _strip_markup(summary)
+            if cleaned and cleaned != summary:
+                article.summary = cleaned
+                changed += 1
+        time.sleep(self.pause_seconds / 10)  # 让出写锁给实时抓取
+        return changed
+
+    def _recompute_metrics(self, article_ids: List[str]) -> int:
+        """根据已有正文重新计算字数、token 估算、阅读时长与语言"""
+        articles = self.db.query(Article).options(undefer(Article.markdown_content)).filter(
+            Article.id.in_(article_ids),
+            Article.markdown_content != None  # noqa: E711
+        ).all()
+        for article in articles:
+            apply_metrics(article, article.markdown_content)
+        time.sleep(self.pause_seconds / 10)  # 让出写锁给实时抓取
+        return len(articles)
+
+    def _drain(self):
+        """在当前进程内并行消费一批提取任务"""
+        RSSFetcher(self.db).extract_batch_content(limit=self.page_size, workers=self.workers)
+
+
+def _strip_markup(text: str) -> str:
+    """trafilatura 处理不了的短片段：去掉标签、还原实体，保留全文"""
+    return " ".join(html.unescape(re.sub(r"<[^>]+>", " ", text)).split())
+
+
+class _Heartbeat(threading.Thread):
+    """运行期间定期更新 heartbeat_at（独立会话），用于判断 running 任务是否还活着"""
+
+    def __init__(self, name: str):
+        super().__init__(name=f"backfill-heartbeat-{name}", daemon=True)
+        self.run_name = name
+        self._stop_event = threading.Event()
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+
+    def run(self):
+        while not self._stop_event.wait(HEARTBEAT_SECONDS):
+            db = SessionLocal()
+            try:
+                db.query(BackfillRun).filter(BackfillRun.name == self.run_name).update(
+                    {BackfillRun.heartbeat_at: datetime.utcnow()}, synchronize_session=False
+                )
+                db.commit()
+            except Exception as e:
+                db.rollback()
+                logger.warning(f"Backfill heartbeat failed for {self.run_name}: {e}")
+            finally:
+                db.close()
+
+
+def is_stale(run: BackfillRun) -> bool:
+    """running 状态但心跳已过期（运行它的进程已经退出）"""
+    beat = run.heartbeat_at or run.updated_at
+    return beat is None or datetime.utcnow() - beat > STALE_AFTER
+
+
+def pause_backfill(db: Session, name: str) -> bool:
+    """请求暂停（运行中的任务在下一页开始前停止）"""
+    run = db.get(BackfillRun, name)
+    if run is None:
+        return False
+    run.status = "paused"
+    db.commit()
+    return True
+
+
+def run_backfill_in_new_session(name: str, mode: str, filters: Dict, **options):
+    """在独立会话中运行回填（供后台线程使用）"""
+    db = SessionLocal()
+    try:
+        BackfillRunner(db, name, mode, filters, **options).run()
+    except Exception as e:
+        logger.error(f"❌ Backfill {name} failed: {e}")
+    finally:
+        db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="回填 / 重新提取历史文章")
+    parser.add_argument("--name", required=True, help="任务名，同名任务从断点继续")
+    parser.add_argument("--mode", choices=MODES, default="extract")
+    parser.add_argument("--status", action="append", help="按提取状态筛选，可重复（pending/fetched/failed）")
+    parser.add_argument("--source-id", type=int)
+    parser.add_argument("--since", help="创建日期起（含），YYYY-MM-DD")
+    parser.add_argument("--until", help="创建日期止（不含），YYYY-MM-DD")
+    parser.add_argument("--min-length", type=int, help="正文最短长度")
+    parser.add_argument("--max-length", type=int, help="正文最长长度")
+    parser.add_argument("--page-size", type=int, default=200)
+    parser.add_argument("--max-outstanding", type=int, default=500)
+    parser.add_argument("--workers", type=int, default=0, help="在本进程内并行提取（0 表示交给 worker）")
+    args = parser.parse_args()
+
+    init_db()
+
+    filters = {
+        "status": args.status,
+        "source_id": args.source_id,
+        "since": args.since,
+        "until": args.until,
+        "min_length": args.min_length,
+        "max_length": args.max_length,
+    }
+    filters = {key: value for key, value in filters.items() if value is not None}
+
+    db = SessionLocal()
+    try:
+        run = BackfillRunner(
+            db, args.name, args.mode, filters,
+            page_size=args.page_size,
+            max_outstanding=args.max_outstanding,
+            workers=args.workers
+        ).run()
+        print(f"{run.name}: {run.status}, scanned {run.scanned}, processed {run.processed}")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+条目规范化基准：每 10k 个条目的时间解析耗时
+
+对比：
+  dateutil     - 旧实现：每个条目都用 dateutil.parser.parse 解析原始 published 字符串
+  normalize    - entry_normalizer.normalize_entry，条目带 *_parsed 时间结构（feedparser / feed_stream 的情况）
+  fast-path    - entry_normalizer.normalize_entry，条目只有原始字符串（走 RFC 822 / ISO 8601 正则快速路径）
+
+条目的时间格式混合 RFC 822（GMT / 数字时区 / 时区缩写）与 ISO 8601（Z / 数字时区 / 小数秒）。
+
+用法（在 backend 目录下）:
+    python benchmarks/bench_entry_normalization.py --entries 10000 --rounds 5
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dateutil import parser as date_parser  # noqa: E402
+from entry_normalizer import normalize_entry, parse_datetime  # noqa: E402
+
+FORMATS = [
+    lambda d: d.strftime("%a, %d %b %Y %H:%M:%S GMT"),
+    lambda d: d.strftime("%a, %d %b %Y %H:%M:%S +0800"),
+    lambda d: d.strftime("%d %b %Y %H:%M PDT"),
+    lambda d: d.strftime("%Y-%m-%dT%H:%M:%SZ"),
+    lambda d: d.strftime("%Y-%m-%dT%H:%M:%S.%f+02:00"),
+    lambda d: d.strftime("%Y-%m-%d %H:%M:%S"),
+]
+
+
+def build_entries(count: int, with_structs: bool) -> list:
+    random.seed(42)
+    now = datetime.utcnow()
+    entries = []
+    for i in range(count):
+        published = now - timedelta(minutes=random.randint(0, 60 * 24 * 365))
+        value = FORMATS[i % len(FORMATS)](published)
+        entry = {
+            "id": f"urn:entry:{i}",
+            "link": f"https://example.com/posts/{i}",
+            "title": f"Post {i}",
+            "summary": "",
+            "published": value,
+        }
+        if with_structs:
+            entry["published_parsed"] = parse_datetime(value).timetuple()
+        entries.append(entry)
+    return entries
+
+
+def legacy(entry):
+    try:
+        return date_parser.parse(entry["published"])
+    except Exception:
+        return datetime.utcnow()
+
+
+def measure(label: str, func, entries: list, rounds: int):
+    best = float("inf")
+    for _ in range(rounds):
+        start = time.perf_counter()
+        for entry in entries:
+            func(entry)
+        best = min(best, time.perf_counter() - start)
+    per_10k = best / len(entries) * 10000 * 1000
+    print(f"{label:<12} {per_10k:8.1f} ms / 10k entries")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="条目规范化基准")
+    parser.add_argument("--entries", type=int, default=10000)
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+
+    raw = build_entries(args.entries, with_structs=False)
+    structured = build_entries(args.entries, with_structs=True)
+
+    measure("dateutil", legacy, raw, args.rounds)
+    measure("normalize", normalize_entry, structured, args.rounds)
+    measure("fast-path", normalize_entry, raw, args.rounds)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+序列化基准：1000 篇文章的批次列表响应
+
+对比：
+  pydantic  - 逐行构建 ArticleBrief 再经 FastAPI 默认路径（校验 + jsonable_encoder + json.dumps）
+  fast      - 行 -> dict（queries.article_briefs）+ orjson.dumps（responses.FastJSONResponse 的路径）
+并给出 gzip 前后的响应大小。
+
+用法（在 backend 目录下）:
+    python benchmarks/bench_serialization.py --articles 1000 --rounds 200
+"""
+
+import argparse
+import gzip
+import json
+import os
+import sys
+import timeit
+from collections import namedtuple
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi.encoders import jsonable_encoder  # noqa: E402
+from api.batches import ArticleBrief  # noqa: E402
+import queries  # noqa: E402
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+Row = namedtuple("Row", ["id", "title", "summary", "author", "url", "published_at", "created_at"])
+
+
+def make_rows(count: int):
+    now = datetime.utcnow()
+    return [
+        Row(
+            id=f"ART_{i:012x}",
+            title=f"示例文章标题 {i}：关于大模型推理性能优化的实践",
+            summary="这是一段摘要。" * 20,
+            author="ArticleAggregator",
+            url=f"https://example.com/posts/{i}",
+            published_at=now - timedelta(minutes=i),
+            created_at=now - timedelta(minutes=i, seconds=30),
+        )
+        for i in range(count)
+    ]
+
+
+def pydantic_path(rows) -> bytes:
+    briefs = [ArticleBrief(**brief) for brief in queries.article_briefs(rows)]
+    return json.dumps(jsonable_encoder(briefs), ensure_ascii=False).encode("utf-8")
+
+
+def fast_path(rows) -> bytes:
+    payload = queries.article_briefs(rows)
+    if orjson is not None:
+        return orjson.dumps(payload)
+    return json.dumps(payload, ensure_ascii=False).encode("utf-8")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="批次列表序列化基准")
+    parser.add_argument("--articles", type=int, default=1000)
+    parser.add_argument("--rounds", type=int, default=200)
+    args = parser.parse_args()
+
+    rows = make_rows(args.articles)
+
+    print(f"{args.articles} 篇文章，{args.rounds} 轮（orjson: {'yes' if orjson else 'no'}）")
+    for name, func in (("pydantic", pydantic_path), ("fast", fast_path)):
+        seconds = timeit.timeit(lambda: func(rows), number=args.rounds) / args.rounds
+        body = func(rows)
+        print(f"  {name:<9} {seconds * 1000:8.2f} ms/响应   "
+              f"{len(body) / 1024:8.1f} KB   gzip {len(gzip.compress(body)) / 1024:6.1f} KB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+"""
+Dify 工作流 API 的本地模拟服务，用于在不消耗 LLM 额度的情况下测试分发器
+
+模拟 POST /v1/workflows/run（blocking 模式）：按 API Key 区分初评 / 分析 / 翻译工作流，
+随机延迟后返回与真实工作流相同结构的 outputs 与 total_tokens，可按比例注入 429 与 500。
+同时统计并发峰值与每秒 token 用量，便于验证并发上限与 token 预算是否生效。
+
+用法（在 backend 目录下）:
+    python benchmarks/dify_stub.py --port 5001 --latency 2 --rate-limit-ratio 0.05
+
+    ARTICLE_DIFY_API_BASE=http://localhost:5001/v1 \\
+    ARTICLE_DIFY_FILTER_KEY=filter ARTICLE_DIFY_ANALYSIS_KEY=analysis ARTICLE_DIFY_TRANSLATE_KEY=translate \\
+    python -m worker
+"""
+
+import argparse
+import json
+import random
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+DOMAINS = ["软件编程", "人工智能", "产品设计", "商业科技"]
+
+
+class StubState:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.in_flight = 0
+        self.peak = 0
+        self.runs = 0
+        self.tokens = 0
+        self.seen_keys = {}  # "<阶段>:<文章ID>" -> 运行次数
+        self.started = time.monotonic()
+
+    def report(self) -> str:
+        with self.lock:
+            elapsed = max(time.monotonic() - self.started, 1e-6)
+            repeats = sum(count - 1 for count in self.seen_keys.values())
+            return (f"runs={self.runs} in_flight={self.in_flight} peak={self.peak} "
+                    f"tokens/s={self.tokens / elapsed:.0f} repeated_runs={repeats}")
+
+
+def workflow_output(stage: str, article_id: str) -> dict:
+    if stage == "filter":
+        value = random.randint(0, 5)
+        result = {"ignore": value == 0, "reason": "stub", "value": value}
+        return {"analysisResult": json.dumps(result, ensure_ascii=False), "languageName": "中文"}
+
+    if stage == "translate":
+        result = {"oneSentenceSummary": f"Stub translation of {article_id}", "summary": "..."}
+        return {"analysisResult": result, "destLanguageName": "英文"}
+
+    result = {
+        "oneSentenceSummary": f"{article_id} 的一句话总结",
+        "summary": "模拟的文章摘要",
+        "domain": random.choice(DOMAINS),
+        "aiSubcategory": "其他",
+        "tags": ["stub", "测试"],
+        "mainPoints": [{"point": "观点", "explanation": "解释"}],
+        "keyQuotes": ["金句"],
+        "score": random.randint(50, 98),
+        "improvements": "",
+    }
+    return {"analysisResult": "```json\n" + json.dumps(result, ensure_ascii=False) + "\n```", "destLanguageName": "英文"}
+
+
+def make_handler(state: StubState, latency: float, rate_limit_ratio: float, error_ratio: float):
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, format, *args):
+            pass
+
+        def _send(self, status: int, body: dict, headers: dict = None):
+            data = json.dumps(body, ensure_ascii=False).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_POST(self):
+            if not self.path.rstrip("/").endswith("/workflows/run"):
+                return self._send(404, {"message": "not found"})
+
+            length = int(self.headers.get("Content-Length") or 0)
+            request = json.loads(self.rfile.read(length) or b"{}")
+            stage = self.headers.get("Authorization", "").replace("Bearer ", "") or "analysis"
+            article_id = (request.get("inputs") or {}).get("input_article_id", "")
+            key = f"{stage}:{article_id}"
+
+            roll = random.random()
+            if roll < rate_limit_ratio:
+                return self._send(429, {"message": "rate limited"}, {"Retry-After": "5"})
+            if roll < rate_limit_ratio + error_ratio:
+                return self._send(500, {"message": "internal error"})
+
+            with state.lock:
+                state.in_flight += 1
+                state.peak = max(state.peak, state.in_flight)
+            try:
+                time.sleep(random.uniform(latency * 0.5, latency * 1.5))
+            finally:
+                with state.lock:
+                    state.in_flight -= 1
+
+            tokens = random.randint(1000, 6000)
+            with state.lock:
+                state.runs += 1
+                state.tokens += tokens
+                state.seen_keys[key] = state.seen_keys.get(key, 0) + 1
+
+            run_id = str(uuid.uuid4())
+            self._send(200, {
+                "workflow_run_id": run_id,
+                "task_id": str(uuid.uuid4()),
+                "data": {
+                    "id": run_id,
+                    "status": "succeeded",
+                    "outputs": workflow_output(stage, article_id),
+                    "error": None,
+                    "total_tokens": tokens,
+                    "elapsed_time": latency,
+                },
+            })
+
+    return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Dify 工作流 API 模拟服务")
+    parser.add_argument("--port", type=int, default=5001)
+    parser.add_argument("--latency", type=float, default=2.0, help="平均运行时长（秒）")
+    parser.add_argument("--rate-limit-ratio", type=float, default=0.0, help="返回 429 的比例")
+    parser.add_argument("--error-ratio", type=float, default=0.0, help="返回 500 的比例")
+    args = parser.parse_args()
+
+    state = StubState()
+    server = ThreadingHTTPServer(
+        ("127.0.0.1", args.port),
+        make_handler(state, args.latency, args.rate_limit_ratio, args.error_ratio)
+    )
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    print(f"Dify stub listening on http://127.0.0.1:{args.port}/v1 (API Key = filter / analysis / translate)")
+
+    try:
+        while True:
+            time.sleep(5)
+            print(state.report())
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""
+读接口压测：对比同步 / 异步实现的吞吐量（req/s）与延迟分位数
+
+先分别启动两个后端实例（同一个数据库）：
+    ARTICLE_ASYNC_API=0 uvicorn main:app --port 8765 --workers 1
+    ARTICLE_ASYNC_API=1 uvicorn main:app --port 8766 --workers 1
+
+再运行：
+    python benchmarks/load_test.py --base http://localhost:8765 --base http://localhost:8766 \
+        --concurrency 64 --duration 20
+
+每个并发连接使用一个保持长连接的 http.client，只依赖标准库。
+"""
+
+import argparse
+import http.client
+import json
+import threading
+import time
+import urllib.parse
+import urllib.request
+from typing import List, Dict
+
+
+def discover_paths(base: str) -> List[str]:
+    """根据现有数据生成压测路径：批次列表、最新批次文章、文章列表、Markdown"""
+    paths = ["/api/batches", "/api/articles?limit=20"]
+
+    with urllib.request.urlopen(f"{base}/api/batches") as response:
+        batches = json.loads(response.read())
+    if batches:
+        paths.append(f"/api/batches/{batches[0]['batch_date']}/articles")
+
+    with urllib.request.urlopen(f"{base}/api/articles?limit=1") as response:
+        articles = json.loads(response.read())
+    if articles:
+        paths.append(f"/api/resource/markdown?id={articles[0]['id']}")
+
+    return paths
+
+
+def run(base: str, paths: List[str], concurrency: int, duration: float) -> Dict[str, float]:
+    """在 duration 秒内用 concurrency 个连接循环请求 paths"""
+    parsed = urllib.parse.urlparse(base)
+    deadline = time.monotonic() + duration
+    latencies: List[float] = []
+    errors = [0]
+    lock = threading.Lock()
+
+    def client(offset: int):
+        conn = http.client.HTTPConnection(parsed.hostname, parsed.port or 80, timeout=30)
+        local, local_errors, i = [], 0, offset
+        while time.monotonic() < deadline:
+            path = paths[i % len(paths)]
+            i += 1
+            started = time.perf_counter()
+            try:
+                conn.request("GET", path)
+                response = conn.getresponse()
+                response.read()
+                if response.status >= 400:
+                    local_errors += 1
+            except Exception:
+                local_errors += 1
+                conn.close()
+                conn = http.client.HTTPConnection(parsed.hostname, parsed.port or 80, timeout=30)
+                continue
+            local.append(time.perf_counter() - started)
+        conn.close()
+        with lock:
+            latencies.extend(local)
+            errors[0] += local_errors
+
+    threads = [threading.Thread(target=client, args=(n,)) for n in range(concurrency)]
+    started = time.monotonic()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.monotonic() - started
+
+    latencies.sort()
+
+    def percentile(p: float) -> float:
+        if not latencies:
+            return 0.0
+        return latencies[min(len(latencies) - 1, int(len(latencies) * p))] * 1000
+
+    return {
+        "requests": len(latencies),
+        "errors": errors[0],
+        "rps": len(latencies) / elapsed if elapsed else 0.0,
+        "p50_ms": percentile(0.50),
+        "p99_ms": percentile(0.99),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="读接口压测")
+    parser.add_argument("--base", action="append", required=True, help="后端地址，可重复指定以对比")
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--duration", type=float, default=20.0, help="每个地址的压测时长（秒）")
+    parser.add_argument("--path", action="append", help="只压测指定路径（可重复）；默认根据现有数据自动生成")
+    args = parser.parse_args()
+
+    paths = args.path or discover_paths(args.base[0])
+    print(f"压测路径: {paths}")
+    print(f"{'base':<28}{'requests':>10}{'errors':>8}{'req/s':>10}{'p50(ms)':>10}{'p99(ms)':>10}")
+
+    for base in args.base:
+        result = run(base, paths, args.concurrency, args.duration)
+        print(f"{base:<28}{result['requests']:>10}{result['errors']:>8}"
+              f"{result['rps']:>10.1f}{result['p50_ms']:>10.1f}{result['p99_ms']:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
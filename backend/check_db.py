@@ -5,9 +5,10 @@
 """
 
 import sys
-from database import SessionLocal
-from models import RSSSource, Article
+from database import SessionLocal, init_db
+from models import RSSSource, Article, SourceStats
 from sqlalchemy import func
+import source_stats
 
 def check_database():
     """检查数据库状态"""
@@ -15,6 +16,7 @@ def check_database():
     print("📊 ArticleAggregator - 数据库状态检查")
     print("=" * 60)
 
+    init_db()
     db = SessionLocal()
 
     try:
@@ -29,17 +31,13 @@ def check_database():
         print(f"   启用: {enabled_sources}")
         print(f"   禁用: {total_sources - enabled_sources}")
 
-        # 2. 文章统计
-        total_articles = db.query(func.count(Article.id)).scalar()
-        pending_articles = db.query(func.count(Article.id)).filter(
-            Article.fetch_status == "pending"
-        ).scalar()
-        fetched_articles = db.query(func.count(Article.id)).filter(
-            Article.fetch_status == "fetched"
-        ).scalar()
-        failed_articles = db.query(func.count(Article.id)).filter(
-            Article.fetch_status == "failed"
-        ).scalar()
+        # 2. 文章统计（读取增量维护的按源统计，不扫描 articles）
+        source_stats.ensure_built(db)
+        counts = source_stats.status_counts(db)
+        total_articles = counts["total"]
+        pending_articles = counts["pending"]
+        fetched_articles = counts["fetched"]
+        failed_articles = counts["failed"]
 
         print(f"\n📄 文章:")
         print(f"   总数: {total_articles}")
@@ -63,14 +61,13 @@ def check_database():
 
         # 4. 按源统计文章数
         print(f"\n📊 各源文章数（Top 10）:")
-        source_stats = db.query(
-            RSSSource.name,
-            func.count(Article.id).label('article_count')
-        ).join(Article).group_by(RSSSource.id).order_by(
-            func.count(Article.id).desc()
+        top_sources = db.query(
+            RSSSource.name, SourceStats.total
+        ).join(SourceStats, SourceStats.source_id == RSSSource.id).order_by(
+            SourceStats.total.desc()
         ).limit(10).all()
 
-        for source_name, count in source_stats:
+        for source_name, count in top_sources:
             print(f"   {source_name}: {count} 篇")
 
         print("\n" + "=" * 60)
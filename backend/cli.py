@@ -0,0 +1,394 @@
+"""
+命令行工具
+负责：导入 RSS 源、抓取、提取全文、查看统计、重建统计与索引，以及新节点的流水线式初始化（全部非交互）
+
+用法（在 backend 目录下）:
+    python -m cli import [--opml PATH] [--validate]
+    python -m cli fetch [--source 3 --source "OpenAI Blog"] [--category ai] [--max-per-source 10] [--concurrency 8]
+    python -m cli extract [--limit 200] [--workers 4]
+    python -m cli stats
+    python -m cli reindex
+    python -m cli bootstrap [--fetch-concurrency 16] [--extract-workers 8] [--max-per-source 10] [--extract-limit 20]
+
+bootstrap 把导入、抓取、提取组织成流水线：OPML 导入后，多个抓取线程并发抓取各个源，
+每个源入库提交时其新文章已进入提取队列，提取线程随即领取，不必等所有源抓取结束；
+抓取全部完成且队列中没有可领取的任务后退出（失败重试的任务留给 worker 处理）。
+与原来的 init_rss 一样，默认每个源最多 10 篇、最多提取 20 篇（传 0 表示不限制）。
+终端中显示实时进度，输出被重定向时每隔几秒打印一行。
+
+抓取与提取阶段各算一次剖析运行（fetch_all_sources / extract_batch_content，见 profiling）。
+"""
+
+import argparse
+import logging
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+from sqlalchemy import or_, text
+
+from database import SessionLocal, engine, init_db
+from job_queue import JobQueue
+from models import RSSSource
+from rss_fetcher import RSSFetcher, EXTRACT_JOB
+from rss_manager import RSSSourceManager
+import profiling
+import source_health
+import source_stats
+
+logger = logging.getLogger(__name__)
+
+# 默认 OPML 文件（config/opml/ArticleAggregator_RSS_Articles.opml）
+OPML_FILE = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    "config",
+    "opml",
+    "ArticleAggregator_RSS_Articles.opml"
+)
+
+EXTRACT_LEASE_BATCH = 5  # 提取线程每次领取的任务数
+IDLE_POLL_SECONDS = 0.5  # 提取线程暂时没有任务时的等待间隔
+
+
+def select_sources(db, sources: List[str] = None, category: str = None,
+                   include_quarantined: bool = False) -> List[RSSSource]:
+    """按 ID / 名称、分类筛选启用的源（默认跳过隔离中的源）"""
+    query = db.query(RSSSource).filter(RSSSource.enabled == True)  # noqa: E712
+    if not include_quarantined:
+        query = query.filter(source_health.due_filter())
+    if sources:
+        ids = [int(value) for value in sources if value.isdigit()]
+        names = [value for value in sources if not value.isdigit()]
+        query = query.filter(or_(RSSSource.id.in_(ids), RSSSource.name.in_(names)))
+    if category:
+        query = query.filter(RSSSource.category == category)
+    return query.order_by(RSSSource.id).all()
+
+
+class Progress:
+    """线程安全的计数器，后台线程定期输出进度"""
+
+    def __init__(self, interval: float = None):
+        self.counts: Dict[str, int] = {
+            "sources_done": 0, "sources_total": 0, "fetch_errors": 0, "new_articles": 0,
+            "extracted": 0, "extract_failed": 0,
+        }
+        self.tty = sys.stdout.isatty()
+        self.interval = interval if interval is not None else (0.5 if self.tty else 5)
+        self.started = time.monotonic()
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def add(self, **deltas):
+        with self._lock:
+            for key, value in deltas.items():
+                self.counts[key] += value
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="progress", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join()
+        self._print(final=True)
+
+    def _run(self):
+        while not self._stop_event.wait(self.interval):
+            self._print()
+
+    def _print(self, final: bool = False):
+        with self._lock:
+            c = dict(self.counts)
+        line = (f"[{time.monotonic() - self.started:6.0f}s] "
+                f"源 {c['sources_done']}/{c['sources_total']}（失败 {c['fetch_errors']}） | "
+                f"新文章 {c['new_articles']} | 已提取 {c['extracted']}（失败 {c['extract_failed']}）")
+        if self.tty:
+            sys.stdout.write("\r\033[K" + line + ("\n" if final else ""))
+            sys.stdout.flush()
+        else:
+            print(line, flush=True)
+
+
+def _fetch_one(source_id: int, max_articles: Optional[int], progress: Progress):
+    """单个抓取线程任务：每个源使用独立的会话"""
+    db = SessionLocal()
+    try:
+        source = db.query(RSSSource).filter(RSSSource.id == source_id).first()
+        new_count = RSSFetcher(db).fetch_and_record(source, max_articles)
+        if new_count is None:
+            progress.add(sources_done=1, fetch_errors=1)
+        else:
+            progress.add(sources_done=1, new_articles=new_count)
+    finally:
+        db.close()
+
+
+@profiling.profiled_run("fetch_all_sources")
+def fetch_sources(source_ids: List[int], max_articles: Optional[int], concurrency: int, progress: Progress):
+    """并发抓取（每个源提交后其文章即可被提取线程领取；max_articles 为 0 / None 时不限制）"""
+    progress.add(sources_total=len(source_ids))
+    task = profiling.in_current_context(lambda source_id: _fetch_one(source_id, max_articles or None, progress))
+    with ThreadPoolExecutor(max_workers=max(1, concurrency), thread_name_prefix="fetch") as executor:
+        list(executor.map(task, source_ids))
+
+
+@profiling.profiled_run("extract_batch_content")
+def extract_sources(fetch_done: threading.Event, progress: Progress, limit: Optional[int], workers: int):
+    """提取阶段：workers 个提取线程领取任务直到抓取结束且队列为空（整个阶段算一次运行）"""
+    claimed, lock = [0, 0], threading.Lock()
+    task = profiling.in_current_context(lambda _: extract_until_idle(fetch_done, progress, limit, claimed, lock))
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="extract") as executor:
+        list(executor.map(task, range(workers)))
+
+
+def extract_until_idle(fetch_done: threading.Event, progress: Progress, limit: Optional[int],
+                       claimed: List[int], lock: threading.Lock):
+    """
+    单个提取线程：持续领取提取任务，直到抓取结束且没有可领取的任务
+
+    claimed 为所有提取线程共享的 [已预留数, 进行中的批次数]（用于 --extract-limit）：
+    预留用尽但还有其他线程的批次在进行时先等待，它们领不满时会退回预留；
+    只有额度真正用完（没有进行中的批次）才退出。
+    """
+    db = SessionLocal()
+    try:
+        fetcher = RSSFetcher(db)
+        while True:
+            with lock:
+                batch = EXTRACT_LEASE_BATCH if limit is None else min(EXTRACT_LEASE_BATCH, limit - claimed[0])
+                if batch <= 0 and claimed[1] == 0:
+                    return
+                if batch > 0:
+                    claimed[0] += batch
+                    claimed[1] += 1
+            if batch <= 0:
+                time.sleep(IDLE_POLL_SECONDS)
+                continue
+
+            # 先读取抓取状态再领取：抓取已结束时领不到任务说明队列已经处理完
+            # （直接领取而不经过 extract_batch_content，每批 5 篇不会各算一次剖析运行）
+            finished = fetch_done.is_set()
+            stats = {"total": 0}
+            try:
+                stats = fetcher._drain_extract_jobs(batch)
+            finally:
+                with lock:
+                    claimed[0] -= batch - stats["total"]
+                    claimed[1] -= 1
+            progress.add(extracted=stats["success"], extract_failed=stats["failed"])
+
+            if stats["total"] == 0:
+                if finished:
+                    return
+                time.sleep(IDLE_POLL_SECONDS)
+    finally:
+        db.close()
+
+
+def _quiet_fetch_logs(verbose: bool):
+    """显示进度时不输出每个源 / 每篇文章的日志（错误仍然输出）"""
+    if not verbose:
+        for name in ("rss_fetcher", "rss_manager", "extraction_cache", "source_health"):
+            logging.getLogger(name).setLevel(logging.WARNING)
+
+
+# ========== 子命令 ==========
+
+def cmd_import(args) -> int:
+    db = SessionLocal()
+    try:
+        stats = RSSSourceManager(db).import_from_opml(
+            args.opml, validate=args.validate, concurrency=args.concurrency
+        )
+    finally:
+        db.close()
+    print(f"OPML 导入完成: 总数 {stats['total']}, 新增 {stats['new']}, 已存在 {stats['existing']}"
+          + (f", 校验失败 {stats['invalid']}" if args.validate else ""))
+    return 0
+
+
+def cmd_fetch(args) -> int:
+    db = SessionLocal()
+    try:
+        source_ids = [source.id for source in select_sources(
+            db, args.source, args.category, args.include_quarantined
+        )]
+    finally:
+        db.close()
+    if not source_ids:
+        print("没有匹配的启用源")
+        return 1
+
+    _quiet_fetch_logs(args.verbose)
+    progress = Progress()
+    progress.start()
+    try:
+        fetch_sources(source_ids, args.max_per_source, args.concurrency, progress)
+    finally:
+        progress.stop()
+    return 0 if progress.counts["fetch_errors"] < len(source_ids) else 1
+
+
+def cmd_extract(args) -> int:
+    db = SessionLocal()
+    try:
+        fetcher = RSSFetcher(db)
+        fetcher.enqueue_pending_articles()
+        stats = fetcher.extract_batch_content(limit=args.limit, workers=args.workers)
+    finally:
+        db.close()
+    print(f"全文提取完成: 处理 {stats['total']}, 成功 {stats['success']}, 失败 {stats['failed']}, 死信 {stats['dead']}")
+    return 0
+
+
+def cmd_stats(args) -> int:
+    db = SessionLocal()
+    try:
+        source_stats.ensure_built(db)
+        counts = source_stats.status_counts(db)
+        enabled = db.query(RSSSource).filter(RSSSource.enabled == True).count()  # noqa: E712
+        total_sources = db.query(RSSSource).count()
+        jobs = JobQueue(db).stats()
+    finally:
+        db.close()
+
+    print(f"RSS 源: {total_sources}（启用 {enabled}）")
+    print(f"文章: {counts['total']}（待提取 {counts['pending']}, 已提取 {counts['fetched']}, "
+          f"失败 {counts['failed']}, 精选 {counts['featured']}）, 阅读 {counts['views']}")
+    for kind, statuses in sorted(jobs.items()):
+        print(f"任务 {kind}: " + ", ".join(f"{status} {count}" for status, count in sorted(statuses.items())))
+    return 0
+
+
+def cmd_reindex(args) -> int:
+    """重建派生数据：按源统计、缺失的提取任务，并刷新 SQLite 索引与查询计划统计"""
+    db = SessionLocal()
+    try:
+        source_stats.rebuild(db)
+        queued = RSSFetcher(db).enqueue_pending_articles()
+    finally:
+        db.close()
+    with engine.connect() as conn:
+        if args.full:
+            conn.execute(text("REINDEX"))
+        conn.execute(text("ANALYZE"))
+        conn.commit()
+    print(f"统计已重建, 补建提取任务 {queued} 个" + (", 索引已重建" if args.full else ""))
+    return 0
+
+
+def cmd_bootstrap(args) -> int:
+    if not args.skip_import:
+        if os.path.exists(args.opml):
+            cmd_import(args)
+        else:
+            print(f"OPML 文件不存在，跳过导入: {args.opml}")
+
+    db = SessionLocal()
+    try:
+        source_ids = [source.id for source in select_sources(db, args.source, args.category)]
+        RSSFetcher(db).enqueue_pending_articles()
+    finally:
+        db.close()
+    if not source_ids:
+        print("没有可抓取的启用源")
+        return 1
+
+    _quiet_fetch_logs(args.verbose)
+    progress = Progress()
+    fetch_done = threading.Event()
+    extractor = None
+    if args.extract_workers > 0:
+        extractor = threading.Thread(
+            target=extract_sources, args=(fetch_done, progress, args.extract_limit or None, args.extract_workers),
+            name="extract", daemon=True
+        )
+
+    progress.start()
+    try:
+        if extractor is not None:
+            extractor.start()
+        try:
+            fetch_sources(source_ids, args.max_per_source, args.fetch_concurrency, progress)
+        finally:
+            fetch_done.set()
+        if extractor is not None:
+            extractor.join()
+    finally:
+        progress.stop()
+
+    db = SessionLocal()
+    try:
+        statuses = JobQueue(db).stats().get(EXTRACT_JOB, {})
+        remaining = statuses.get("queued", 0) + statuses.get("leased", 0)
+    finally:
+        db.close()
+    if remaining:
+        print(f"还有 {remaining} 个提取任务（重试中或超出 --extract-limit），将由 worker 或 python -m cli extract 处理")
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m cli", description="ArticleAggregator 命令行工具")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    def add_import_args(p):
+        p.add_argument("--opml", default=OPML_FILE, help="OPML 文件路径")
+        p.add_argument("--validate", action="store_true", help="导入前并发校验新源")
+        p.add_argument("--concurrency", type=int, default=16, help="校验并发数")
+
+    def add_source_filters(p):
+        p.add_argument("--source", action="append", help="源 ID 或名称（可重复）")
+        p.add_argument("--category", help="源分类")
+        p.add_argument("--max-per-source", type=int, default=None, help="每个源最多处理的新条目数（0 表示不限制）")
+        p.add_argument("--verbose", action="store_true", help="输出每个源的抓取日志")
+
+    p = subparsers.add_parser("import", help="从 OPML 导入 RSS 源")
+    add_import_args(p)
+    p.set_defaults(func=cmd_import)
+
+    p = subparsers.add_parser("fetch", help="抓取 RSS 源")
+    add_source_filters(p)
+    p.add_argument("--concurrency", type=int, default=4, help="并发抓取的源数")
+    p.add_argument("--include-quarantined", action="store_true", help="同时抓取隔离中的源")
+    p.set_defaults(func=cmd_fetch)
+
+    p = subparsers.add_parser("extract", help="从提取队列领取并提取全文")
+    p.add_argument("--limit", type=int, default=20, help="最多处理的任务数")
+    p.add_argument("--workers", type=int, default=1, help="并发提取线程数")
+    p.set_defaults(func=cmd_extract)
+
+    p = subparsers.add_parser("stats", help="数据库与任务队列统计")
+    p.set_defaults(func=cmd_stats)
+
+    p = subparsers.add_parser("reindex", help="重建按源统计、补建提取任务并刷新索引统计")
+    p.add_argument("--full", action="store_true", help="同时执行 REINDEX（耗时与库大小成正比）")
+    p.set_defaults(func=cmd_reindex)
+
+    p = subparsers.add_parser("bootstrap", help="导入 → 抓取 → 提取流水线（新节点初始化）")
+    add_import_args(p)
+    add_source_filters(p)
+    p.add_argument("--skip-import", action="store_true", help="不导入 OPML")
+    p.add_argument("--fetch-concurrency", type=int, default=16, help="并发抓取的源数")
+    p.add_argument("--extract-workers", type=int, default=8, help="并发提取线程数（0 表示只抓取）")
+    p.add_argument("--extract-limit", type=int, default=20, help="本次最多提取的文章数（0 表示不限制）")
+    p.set_defaults(func=cmd_bootstrap, max_per_source=10)  # 与原 init_rss 相同：每个源最多 10 篇
+
+    return parser
+
+
+def main(argv: List[str] = None) -> int:
+    args = build_parser().parse_args(argv)
+    init_db()
+    profiling.install()
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,273 @@
+"""
+语料列式导出
+负责：把 articles / rss_sources 增量导出为按日期、分类分区的 Parquet（或 Arrow IPC）文件，供离线分析使用
+
+分析（各源文章数、分类占比、提取失败率、长度分布等）改为用 pandas / DuckDB 读取导出目录，
+不再直接查询线上 articles.db。导出只读、按主键分批查询，每批是一个很短的读事务，不阻塞写入（WAL）。
+
+导出布局：
+    data/export/articles/date=YYYY-MM-DD/category=<分类>/part-<导出批次>-<序号>.parquet
+    data/export/sources/sources.parquet        每次导出整体重写（源的数量很少）
+    data/export/_watermark.json                已导出到的 (updated_at, id)
+
+增量：每次只导出 updated_at 晚于水位的文章（新文章，以及提取完成、状态变化、写入分析结果的文章；
+analysis_store 写入评分 / 精选时会同时更新 articles.updated_at），
+因此同一篇文章可能出现在多个文件中，按 exported_at 取最新一行即可：
+    SELECT * FROM read_parquet('data/export/articles/**/*.parquet', hive_partitioning = true)
+    QUALIFY row_number() OVER (PARTITION BY id ORDER BY exported_at DESC) = 1
+
+需要安装 pyarrow（可选依赖）。
+
+用法（在 backend 目录下）:
+    python -m corpus_export                    # 增量导出
+    python -m corpus_export --full             # 清空导出目录后全量导出
+    python -m corpus_export --format arrow     # 写 Arrow IPC 文件
+"""
+
+import argparse
+import json
+import logging
+import os
+import re
+import shutil
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import and_, or_
+from sqlalchemy.orm import Session
+
+from database import DB_DIR, SessionLocal, init_db
+from models import Article, ArticleAnalysis, RSSSource
+
+try:
+    import pyarrow as pa
+    import pyarrow.feather as feather
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+
+logger = logging.getLogger(__name__)
+
+EXPORT_DIR = os.path.join(DB_DIR, "export")
+WATERMARK_FILE = "_watermark.json"
+PAGE_SIZE = 5000  # 每次查询的行数
+FLUSH_ROWS = 100000  # 缓冲多少行写一次文件（避免产生大量小文件）
+FORMATS = {"parquet": ".parquet", "arrow": ".arrow"}
+
+ARTICLE_FIELDS = [
+    ("id", "string"),
+    ("source_id", "int64"),
+    ("title", "string"),
+    ("author", "string"),
+    ("url", "string"),
+    ("category", "string"),
+    ("language", "string"),
+    ("content_language", "string"),
+    ("fetch_status", "string"),
+    ("word_count", "int64"),
+    ("char_count", "int64"),
+    ("token_estimate", "int64"),
+    ("reading_time_minutes", "int64"),
+    ("archived", "bool"),
+    ("score", "int64"),
+    ("domain", "string"),
+    ("featured", "bool"),
+    ("published_at", "timestamp"),
+    ("created_at", "timestamp"),
+    ("updated_at", "timestamp"),
+    ("exported_at", "timestamp"),
+]
+
+SOURCE_FIELDS = [
+    ("id", "int64"),
+    ("name", "string"),
+    ("rss_url", "string"),
+    ("website_url", "string"),
+    ("category", "string"),
+    ("language", "string"),
+    ("enabled", "bool"),
+    ("consecutive_failures", "int64"),
+    ("avg_latency_ms", "float64"),
+    ("avg_entries_per_poll", "float64"),
+    ("last_success_at", "timestamp"),
+    ("last_failure_at", "timestamp"),
+    ("quarantined_until", "timestamp"),
+    ("created_at", "timestamp"),
+]
+
+ARTICLE_COLUMNS = (
+    Article.id, Article.source_id, Article.title, Article.author, Article.url, Article.category,
+    Article.language, Article.content_language, Article.fetch_status, Article.word_count,
+    Article.char_count, Article.token_estimate, Article.reading_time_minutes, Article.archived_at,
+    ArticleAnalysis.score, ArticleAnalysis.domain, ArticleAnalysis.featured,
+    Article.published_at, Article.created_at, Article.updated_at,
+)
+
+_UNSAFE_PATH = re.compile(r"[^\w.-]+")
+
+
+def _schema(fields: List[Tuple[str, str]]):
+    types = {
+        "string": pa.string(),
+        "int64": pa.int64(),
+        "float64": pa.float64(),
+        "bool": pa.bool_(),
+        "timestamp": pa.timestamp("us"),
+    }
+    return pa.schema([(name, types[kind]) for name, kind in fields])
+
+
+def _partition_value(value: Optional[str]) -> str:
+    """分区目录名中只保留安全字符"""
+    return _UNSAFE_PATH.sub("_", value) if value else "unknown"
+
+
+class CorpusExporter:
+    """增量列式导出"""
+
+    def __init__(self, db: Session, out_dir: str = EXPORT_DIR, format: str = "parquet"):
+        if pa is None:
+            raise RuntimeError("pyarrow is required for corpus export: pip install pyarrow")
+        if format not in FORMATS:
+            raise ValueError(f"Unsupported format: {format}")
+        self.db = db
+        self.out_dir = out_dir
+        self.format = format
+        self.run_id = datetime.utcnow().strftime("%Y%m%dT%H%M%S")
+        self.article_schema = _schema(ARTICLE_FIELDS)
+        self.source_schema = _schema(SOURCE_FIELDS)
+        self._files = 0
+
+    def run(self, full: bool = False) -> Dict[str, int]:
+        """
+        导出 updated_at 晚于水位的文章，并重写源快照
+
+        Returns:
+            {"articles": 导出文章行数, "files": 写入的文章文件数, "sources": 源数量}
+        """
+        if full and os.path.exists(self.out_dir):
+            shutil.rmtree(self.out_dir)
+        os.makedirs(self.out_dir, exist_ok=True)
+
+        watermark = None if full else self._load_watermark()
+        exported_at = datetime.utcnow()
+        buffers: Dict[Tuple[str, str], List[dict]] = defaultdict(list)
+        buffered = 0
+        exported = 0
+
+        while True:
+            rows = self._next_page(watermark)
+            if not rows:
+                break
+
+            for row in rows:
+                record = self._article_record(row, exported_at)
+                buffers[(row.created_at.strftime("%Y-%m-%d"), _partition_value(row.category))].append(record)
+            buffered += len(rows)
+            exported += len(rows)
+            watermark = (rows[-1].updated_at, rows[-1].id)
+
+            if buffered >= FLUSH_ROWS:
+                self._flush(buffers)
+                self._save_watermark(watermark)
+                buffered = 0
+
+        if buffered:
+            self._flush(buffers)
+            self._save_watermark(watermark)
+
+        sources = self._export_sources()
+        return {"articles": exported, "files": self._files, "sources": sources}
+
+    def _next_page(self, watermark: Optional[Tuple[datetime, str]]) -> List:
+        """按 (updated_at, id) 键集分页；每页一个独立的短读事务"""
+        query = self.db.query(*ARTICLE_COLUMNS).outerjoin(
+            ArticleAnalysis, ArticleAnalysis.article_id == Article.id
+        ).filter(Article.updated_at != None)  # noqa: E711
+        if watermark:
+            updated_at, article_id = watermark
+            query = query.filter(or_(
+                Article.updated_at > updated_at,
+                and_(Article.updated_at == updated_at, Article.id > article_id),
+            ))
+        rows = query.order_by(Article.updated_at, Article.id).limit(PAGE_SIZE).all()
+        self.db.rollback()
+        return rows
+
+    def _article_record(self, row, exported_at: datetime) -> dict:
+        record = {name: getattr(row, name, None) for name, _ in ARTICLE_FIELDS}
+        record["archived"] = row.archived_at is not None
+        record["featured"] = bool(row.featured) if row.featured is not None else None
+        record["exported_at"] = exported_at
+        return record
+
+    def _flush(self, buffers: Dict[Tuple[str, str], List[dict]]):
+        """每个分区写一个文件"""
+        for (date, category), records in buffers.items():
+            directory = os.path.join(self.out_dir, "articles", f"date={date}", f"category={category}")
+            os.makedirs(directory, exist_ok=True)
+            self._files += 1
+            path = os.path.join(directory, f"part-{self.run_id}-{self._files:05d}{FORMATS[self.format]}")
+            self._write(pa.Table.from_pylist(records, schema=self.article_schema), path)
+        buffers.clear()
+
+    def _export_sources(self) -> int:
+        rows = self.db.query(RSSSource).all()
+        records = [{name: getattr(source, name) for name, _ in SOURCE_FIELDS} for source in rows]
+        self.db.rollback()
+
+        directory = os.path.join(self.out_dir, "sources")
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f"sources{FORMATS[self.format]}")
+        self._write(pa.Table.from_pylist(records, schema=self.source_schema), path)
+        return len(records)
+
+    def _write(self, table, path: str):
+        """先写临时文件再改名，读取方不会看到写了一半的文件"""
+        tmp_path = path + ".tmp"
+        if self.format == "parquet":
+            pq.write_table(table, tmp_path, compression="zstd")
+        else:
+            feather.write_feather(table, tmp_path, compression="zstd")
+        os.replace(tmp_path, path)
+
+    def _load_watermark(self) -> Optional[Tuple[datetime, str]]:
+        path = os.path.join(self.out_dir, WATERMARK_FILE)
+        if not os.path.exists(path):
+            return None
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        return datetime.fromisoformat(data["updated_at"]), data["id"]
+
+    def _save_watermark(self, watermark: Tuple[datetime, str]):
+        path = os.path.join(self.out_dir, WATERMARK_FILE)
+        with open(path + ".tmp", "w", encoding="utf-8") as f:
+            json.dump({
+                "updated_at": watermark[0].isoformat(),
+                "id": watermark[1],
+                "run_id": self.run_id,
+            }, f)
+        os.replace(path + ".tmp", path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="语料列式导出（Parquet / Arrow）")
+    parser.add_argument("--out", default=EXPORT_DIR, help="导出目录")
+    parser.add_argument("--format", choices=sorted(FORMATS), default="parquet")
+    parser.add_argument("--full", action="store_true", help="清空导出目录后全量导出")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    init_db()
+
+    db = SessionLocal()
+    try:
+        stats = CorpusExporter(db, out_dir=args.out, format=args.format).run(full=args.full)
+        print(stats)
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,4 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event, inspect, text
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 import os
@@ -11,12 +11,38 @@ DATABASE_URL = f"sqlite:///{os.path.join(DB_DIR, 'articles.db')}"
 # 创建数据库引擎
 engine = create_engine(
     DATABASE_URL,
-    connect_args={"check_same_thread": False}  # SQLite 需要
+    connect_args={
+        "check_same_thread": False,  # SQLite 需要
+        "timeout": 30  # 多个 worker 写入时等待锁，而不是立即报 database is locked
+    }
 )
 
+
+@event.listens_for(engine, "connect")
+def _set_sqlite_pragma(dbapi_connection, connection_record):
+    """WAL 模式：读不阻塞写，允许多个进程/线程并发消费任务队列"""
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute("PRAGMA busy_timeout=30000")
+    cursor.close()
+
 # 创建会话工厂
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# 异步引擎（可选，需要 aiosqlite）：供读多写少的接口使用，不占用线程池
+try:
+    import aiosqlite  # noqa: F401
+    from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+
+    ASYNC_DATABASE_URL = f"sqlite+aiosqlite:///{os.path.join(DB_DIR, 'articles.db')}"
+    async_engine = create_async_engine(ASYNC_DATABASE_URL, connect_args={"timeout": 30})
+    event.listen(async_engine.sync_engine, "connect", _set_sqlite_pragma)
+    AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+except ImportError:
+    async_engine = None
+    AsyncSessionLocal = None
+
 # 创建基类
 Base = declarative_base()
 
@@ -27,3 +53,58 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+# 依赖注入：获取异步数据库会话
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+def init_db():
+    """
+    创建数据库表，并为已有表补齐模型中新增的列和索引
+
+    create_all 只会创建缺失的表，不会修改已存在的表；
+    这里用 ALTER TABLE ADD COLUMN 让旧的 articles.db 无需删除即可升级。
+    """
+    import models  # noqa: F401  确保所有模型已注册到 Base.metadata
+
+    Base.metadata.create_all(bind=engine)
+
+    inspector = inspect(engine)
+    with engine.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            existing = {column["name"] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in existing:
+                    continue
+                column_type = column.type.compile(dialect=engine.dialect)
+                conn.execute(text(f'ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}'))
+
+            for index in table.indexes:
+                index.create(bind=conn, checkfirst=True)
+
+    _purge_orphans()
+
+
+# 引用 articles.id 的表：SQLite 默认不启用外键，ondelete="CASCADE" 不生效，删除文章时由代码显式删除
+DEPENDENT_TABLES = ("article_analyses", "article_views", "article_view_daily")
+
+
+def _purge_orphans():
+    """清理旧版本删除文章时遗留的分析结果与阅读数；有清理时重算按源统计（精选数与阅读数）"""
+    removed = 0
+    with engine.begin() as conn:
+        for table in DEPENDENT_TABLES:
+            removed += conn.execute(text(
+                f"DELETE FROM {table} WHERE article_id NOT IN (SELECT id FROM articles)"
+            )).rowcount
+
+    if removed:
+        import source_stats
+        db = SessionLocal()
+        try:
+            source_stats.rebuild(db)
+        finally:
+            db.close()
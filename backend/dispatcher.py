@@ -0,0 +1,390 @@
+"""
+Dify 工作流分发
+负责：全文提取完成后，把文章依次提交给初评、分析、翻译工作流，并把结果写回 article_analyses
+
+- 每篇文章的每个阶段是任务队列中的一个 dispatch 任务，键为 "<阶段>:<文章ID>"，
+  同一篇文章的同一阶段只会入队一次（去重只来自任务键：Dify 的 workflows/run 不支持幂等键，
+  任务在工作流运行成功后、结果提交前崩溃时，重试会再运行一次）；
+- 并发数固定（DISPATCH_CONCURRENCY 个分发线程），同时进行的工作流运行不会超过该值；
+- 所有线程共享一个 token 预算：按 DISPATCH_TOKENS_PER_WINDOW / DISPATCH_WINDOW_SECONDS 的速率匀速补充，
+  桶容量只有几秒的用量，因此长时间空闲后也不会突发大量请求；预算按文章的 token_estimate 预扣，
+  运行结束后按工作流返回的实际 token 数校正；
+- 失败（超时、5xx、工作流运行失败）交给任务队列按指数退避重试，多次失败后进入死信；
+  收到 429 时所有线程暂停提交，任务按 Retry-After 重新排队，不计入尝试次数；
+  停止时正在等待预算的任务同样直接放回队列。
+"""
+
+import json
+import logging
+import re
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+import requests
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from analysis_store import upsert_analyses, workflow_fields
+from database import SessionLocal
+from job_queue import JobQueue, job_payload, PRIORITY_NORMAL
+from models import Article, ArticleAnalysis, Job
+import settings
+
+logger = logging.getLogger(__name__)
+
+DISPATCH_JOB = "dispatch"  # 工作流分发任务类型
+
+FILTER_STAGE = "filter"
+ANALYSIS_STAGE = "analysis"
+TRANSLATE_STAGE = "translate"
+STAGES = (FILTER_STAGE, ANALYSIS_STAGE, TRANSLATE_STAGE)
+
+# 工作流输出 token 的预估（输入按文章 token_estimate 计算）
+OUTPUT_TOKEN_ALLOWANCE = {
+    FILTER_STAGE: 300,
+    ANALYSIS_STAGE: 3000,
+    TRANSLATE_STAGE: 3000,
+}
+DEFAULT_INPUT_TOKENS = 2000  # 文章没有 token_estimate 时的预估
+BURST_SECONDS = 5  # 预算桶容量：相当于几秒的补充量
+RATE_LIMIT_PAUSE_SECONDS = 30  # 收到 429 且没有 Retry-After 时的暂停时长
+CONNECT_TIMEOUT = 10
+RUN_TIMEOUT = 600  # blocking 模式下等待工作流完成的时间
+
+_JSON_FENCE = re.compile(r"^```(?:json)?\s*|\s*```$")
+
+
+class DispatchError(Exception):
+    """工作流调用失败（由任务队列重试）"""
+
+
+class TokenBudget:
+    """按窗口限制 token 用量的令牌桶（线程安全）"""
+
+    def __init__(self, tokens_per_window: int, window_seconds: float, burst_seconds: float = BURST_SECONDS):
+        self.rate = tokens_per_window / window_seconds
+        self.capacity = max(self.rate * burst_seconds, 1.0)
+        self.level = self.capacity
+        self.paused_until = 0.0
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, cost: int, stop_event: threading.Event = None) -> bool:
+        """
+        等待预算足够后预扣 cost 个 token
+
+        单次用量超过桶容量时，桶满即可提交（余额变为负数，后续请求相应推迟）。
+
+        Returns:
+            是否获得预算（stop_event 被设置时返回 False）
+        """
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                if now >= self.paused_until and self.level >= min(cost, self.capacity):
+                    self.level -= cost
+                    return True
+                wait = max(self.paused_until - now,
+                           (min(cost, self.capacity) - self.level) / self.rate, 0.05)
+
+            if stop_event is None:
+                time.sleep(wait)
+            elif stop_event.wait(wait):
+                return False
+
+    def settle(self, estimated: int, actual: Optional[int]):
+        """运行结束后按实际用量校正预扣的 token"""
+        if actual is None:
+            return
+        with self._lock:
+            self.level = min(self.level + estimated - actual, self.capacity)
+
+    def pause(self, seconds: float):
+        """暂停提交（上游限流时）"""
+        with self._lock:
+            self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+
+    def _refill(self, now: float):
+        self.level = min(self.level + (now - self._updated) * self.rate, self.capacity)
+        self._updated = now
+
+
+def stage_keys() -> Dict[str, str]:
+    """各阶段工作流的 API Key（未配置的阶段不启用）"""
+    keys = {
+        FILTER_STAGE: settings.DIFY_FILTER_KEY,
+        ANALYSIS_STAGE: settings.DIFY_ANALYSIS_KEY,
+        TRANSLATE_STAGE: settings.DIFY_TRANSLATE_KEY,
+    }
+    return {stage: key for stage, key in keys.items() if key}
+
+
+def dispatch_enabled() -> bool:
+    return bool(stage_keys())
+
+
+def first_stage() -> Optional[str]:
+    keys = stage_keys()
+    return next((stage for stage in STAGES if stage in keys), None)
+
+
+def dispatch_item(stage: str, article_id: str, priority: int = PRIORITY_NORMAL) -> dict:
+    """分发任务的入队参数"""
+    return {
+        "key": f"{stage}:{article_id}",
+        "payload": {"stage": stage, "article_id": article_id},
+        "priority": priority,
+    }
+
+
+def enqueue_first_stage(db: Session, article_ids: List[str]):
+    """文章提取完成后入队第一个启用的阶段（不提交事务，未配置工作流时不入队）"""
+    stage = first_stage()
+    if stage and article_ids:
+        JobQueue(db).enqueue_many(DISPATCH_JOB, [dispatch_item(stage, article_id) for article_id in article_ids])
+
+
+def enqueue_fetched_articles(db: Session, limit: int = None) -> int:
+    """
+    为已提取全文、还没有分发任务的文章补建第一阶段任务
+
+    Returns:
+        入队的文章数
+    """
+    stage = first_stage()
+    if stage is None:
+        return 0
+
+    queued_ids = db.query(func.substr(Job.key, len(stage) + 2)).filter(
+        Job.kind == DISPATCH_JOB, Job.key.like(f"{stage}:%")
+    )
+    query = db.query(Article.id).filter(
+        Article.fetch_status == "fetched",
+        ~Article.id.in_(queued_ids)
+    ).order_by(Article.created_at.desc())
+    if limit:
+        query = query.limit(limit)
+
+    article_ids = [row[0] for row in query.all()]
+    enqueue_first_stage(db, article_ids)
+    db.commit()
+    return len(article_ids)
+
+
+class WorkflowClient:
+    """Dify 工作流 API 客户端（blocking 模式）"""
+
+    def __init__(self, api_base: str = None, session: requests.Session = None):
+        self.api_base = (api_base or settings.DIFY_API_BASE).rstrip("/")
+        self.session = session or requests.Session()
+
+    def run(self, api_key: str, inputs: dict) -> dict:
+        """
+        运行工作流并返回 data（含 outputs、total_tokens）
+
+        Raises:
+            DispatchError: 网络错误、非 2xx 响应或工作流运行失败；429 时带 retry_after 属性
+        """
+        try:
+            response = self.session.post(
+                f"{self.api_base}/workflows/run",
+                json={
+                    "inputs": inputs,
+                    "response_mode": "blocking",
+                    "user": "article-aggregator",
+                },
+                headers={"Authorization": f"Bearer {api_key}"},
+                timeout=(CONNECT_TIMEOUT, RUN_TIMEOUT),
+            )
+        except requests.RequestException as e:
+            raise DispatchError(f"request failed: {e}")
+
+        if response.status_code == 429:
+            error = DispatchError("rate limited (429)")
+            retry_after = response.headers.get("Retry-After", "")
+            error.retry_after = float(retry_after) if retry_after.isdigit() else RATE_LIMIT_PAUSE_SECONDS
+            raise error
+        if response.status_code >= 400:
+            raise DispatchError(f"HTTP {response.status_code}: {response.text[:500]}")
+
+        data = response.json().get("data") or {}
+        if data.get("status") != "succeeded":
+            raise DispatchError(f"workflow {data.get('status')}: {data.get('error')}")
+        return data
+
+
+def as_score(value, field: str) -> Optional[int]:
+    """
+    工作流输出的评分（初评 value、分析 score）转换为整数后再与阈值比较
+
+    Raises:
+        DispatchError: 不是数字（如 "high"），交给任务队列按失败重试
+    """
+    if value is None or value == "":
+        return None
+    if isinstance(value, bool):
+        raise DispatchError(f"workflow output {field} is not a number: {value!r}")
+    try:
+        return int(float(value))
+    except (TypeError, ValueError):
+        raise DispatchError(f"workflow output {field} is not a number: {value!r}")
+
+
+def parse_result(value) -> dict:
+    """工作流输出的 analysisResult 可能是对象，也可能是（带 ```json 围栏的）JSON 字符串"""
+    if isinstance(value, dict):
+        return value
+    if not value:
+        return {}
+    try:
+        parsed = json.loads(_JSON_FENCE.sub("", value.strip()))
+    except ValueError:
+        raise DispatchError("workflow output is not valid JSON")
+    return parsed if isinstance(parsed, dict) else {}
+
+
+class Dispatcher:
+    """从任务队列领取 dispatch 任务并调用工作流"""
+
+    def __init__(self, concurrency: int = None, budget: TokenBudget = None,
+                 client: WorkflowClient = None, poll_seconds: float = 5):
+        self.concurrency = concurrency or settings.DISPATCH_CONCURRENCY
+        self.budget = budget or TokenBudget(settings.DISPATCH_TOKENS_PER_WINDOW, settings.DISPATCH_WINDOW_SECONDS)
+        self.client = client or WorkflowClient()
+        self.poll_seconds = poll_seconds
+        self.stop_event = threading.Event()
+        self.threads: List[threading.Thread] = []
+
+    def start(self):
+        """启动分发线程（后台运行）"""
+        self.threads = [
+            threading.Thread(target=self._loop, name=f"dispatch-{i}", daemon=True)
+            for i in range(self.concurrency)
+        ]
+        for thread in self.threads:
+            thread.start()
+        logger.info(f"🤖 Dispatcher started: {self.concurrency} concurrent runs, "
+                    f"{settings.DISPATCH_TOKENS_PER_WINDOW} tokens / {settings.DISPATCH_WINDOW_SECONDS}s")
+
+    def stop(self, timeout: float = 30):
+        self.stop_event.set()
+        for thread in self.threads:
+            thread.join(timeout=timeout)
+
+    def drain(self, limit: int = None) -> Dict[str, int]:
+        """在当前线程中处理任务直到队列为空或达到 limit（--once 模式使用）"""
+        stats = {"total": 0, "success": 0, "failed": 0, "dead": 0}
+        while limit is None or stats["total"] < limit:
+            db = SessionLocal()
+            try:
+                result = self.process_one(db)
+            finally:
+                db.close()
+            if result is None:
+                break
+            stats["total"] += 1
+            stats[result] = stats.get(result, 0) + 1
+        return stats
+
+    def _loop(self):
+        while not self.stop_event.is_set():
+            db = SessionLocal()
+            try:
+                result = self.process_one(db)
+            except Exception as e:
+                logger.error(f"❌ Dispatch error: {str(e)}")
+                result = None
+            finally:
+                db.close()
+
+            if result is None:
+                self.stop_event.wait(self.poll_seconds)
+
+    def process_one(self, db: Session) -> Optional[str]:
+        """
+        领取并处理一个任务
+
+        Returns:
+            success / failed / dead / rate_limited；队列为空（或正在停止）时返回 None
+        """
+        queue = JobQueue(db, lease_seconds=RUN_TIMEOUT + 60)
+        jobs = queue.lease(DISPATCH_JOB, limit=1)
+        if not jobs:
+            return None
+
+        job = jobs[0]
+        payload = job_payload(job) or {}
+        stage = payload.get("stage")
+        article = db.query(Article).filter(Article.id == payload.get("article_id")).first()
+        api_key = stage_keys().get(stage)
+
+        if article is None or api_key is None:
+            # 文章已删除或该阶段已停用
+            queue.complete(job)
+            return "success"
+
+        cost = (article.token_estimate or DEFAULT_INPUT_TOKENS) + OUTPUT_TOKEN_ALLOWANCE.get(stage, 0)
+        if not self.budget.acquire(cost, self.stop_event):
+            # 停止中：放回队列，不计入尝试次数
+            queue.release(job)
+            return None
+
+        try:
+            data = self.client.run(api_key, {"input_article_id": article.id})
+            self.budget.settle(cost, data.get("total_tokens"))
+            item, next_stage = self._result_item(db, stage, article, data)
+            if next_stage:
+                # 下一阶段与本阶段结果在同一事务中提交
+                JobQueue(db).enqueue(DISPATCH_JOB, **dispatch_item(next_stage, article.id))
+            upsert_analyses(db, [item])
+            queue.complete(job)
+            return "success"
+        except Exception as e:
+            db.rollback()
+            if getattr(e, "retry_after", None):
+                # 限流不是任务本身的失败：所有线程暂停，任务按 Retry-After 重新排队
+                self.budget.pause(e.retry_after)
+                queue.release(job, delay_seconds=e.retry_after, error=str(e))
+                return "rate_limited"
+            status = queue.fail(job, str(e))
+            logger.warning(f"⚠️ Dispatch {job.key} failed ({status}): {e}")
+            return "dead" if status == "dead" else "failed"
+
+    def _result_item(self, db: Session, stage: str, article: Article, data: dict) -> Tuple[dict, Optional[str]]:
+        """工作流结果 -> (upsert_analyses 的条目, 下一个要入队的阶段)"""
+        outputs = data.get("outputs") or {}
+        result = parse_result(outputs.get("analysisResult"))
+        run_id = data.get("workflow_run_id") or data.get("id")
+        keys = stage_keys()
+
+        if stage == FILTER_STAGE:
+            value = as_score(result.get("value"), "value")
+            item = {
+                "article_id": article.id,
+                "filter_score": value,
+                "language": outputs.get("languageName"),
+                "workflow_run_id": run_id,
+            }
+            passed = not result.get("ignore") and (value or 0) >= settings.DISPATCH_MIN_FILTER_VALUE
+            return item, (ANALYSIS_STAGE if passed and ANALYSIS_STAGE in keys else None)
+
+        if stage == ANALYSIS_STAGE:
+            item = workflow_fields(result)
+            item.update({"article_id": article.id, "workflow_run_id": run_id})
+            if "score" in item:
+                item["score"] = as_score(item["score"], "score")
+            score = item.get("score") or 0
+            if TRANSLATE_STAGE in keys and score >= settings.DISPATCH_TRANSLATE_MIN_SCORE:
+                return item, TRANSLATE_STAGE
+            return item, None
+
+        # 翻译结果按目标语言合并到已有的 translations 中
+        language = outputs.get("destLanguageName") or result.get("language") or "en"
+        existing = db.query(ArticleAnalysis.translations).filter(
+            ArticleAnalysis.article_id == article.id
+        ).scalar()
+        translations = json.loads(existing) if existing else {}
+        translations[language] = result
+        return {"article_id": article.id, "translations": translations}, None
@@ -0,0 +1,174 @@
+"""
+feed 条目规范化
+负责：把 feedparser / feed_stream 产出的条目转换为统一的 NormalizedEntry（时间统一为 UTC naive）
+
+时间解析按代价从低到高依次尝试：
+1. feedparser / feed_stream 已经解析好的 *_parsed 时间结构（UTC），直接使用；
+2. 预编译正则的快速路径：RFC 822（RSS pubDate）与 ISO 8601（Atom / dc:date）；
+3. dateutil 通用解析，仅作为最后手段。
+都解析不出时返回 None，而不是用当前时间代替（否则会打乱排序与增量抓取的高水位）。
+"""
+
+import calendar
+import re
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from dateutil import parser as date_parser
+
+# 晚于当前时间超过该值的发布时间视为无效（时区写错或占位值）
+MAX_FUTURE_SKEW = timedelta(days=1)
+MIN_YEAR = 1990
+
+_MONTHS = {name: index for index, name in enumerate(
+    ("jan", "feb", "mar", "apr", "may", "jun", "jul", "aug", "sep", "oct", "nov", "dec"), start=1
+)}
+
+# RFC 822 / 2822 时区缩写（美国时区按 RFC 822 定义）
+_TZ_NAMES = {
+    "ut": 0, "utc": 0, "gmt": 0, "z": 0,
+    "est": -5, "edt": -4, "cst": -6, "cdt": -5,
+    "mst": -7, "mdt": -6, "pst": -8, "pdt": -7,
+}
+
+# "Tue, 10 Jun 2003 04:00:00 GMT" / "10 Jun 2003 04:00 +0800"
+_RFC822 = re.compile(
+    r"^\s*(?:[A-Za-z]{3,9},?\s*)?(\d{1,2})\s+([A-Za-z]{3})[A-Za-z]*\.?\s+(\d{2,4})"
+    r"\s+(\d{1,2}):(\d{2})(?::(\d{2}))?"
+    r"\s*(?:([+-])(\d{2}):?(\d{2})|([A-Za-z]{1,5}))?\s*$"
+)
+
+# "2003-12-13T18:30:02Z" / "2003-12-13T18:30:02.25+01:00" / "2003-12-13 18:30" / "2003-12-13"
+_ISO8601 = re.compile(
+    r"^\s*(\d{4})-(\d{2})-(\d{2})"
+    r"(?:[Tt ](\d{2}):(\d{2})(?::(\d{2})(?:[.,](\d{1,6})\d*)?)?)?"
+    r"\s*(?:([Zz])|([+-])(\d{2}):?(\d{2}))?\s*$"
+)
+
+
+@dataclass
+class NormalizedEntry:
+    """规范化后的条目"""
+    key: str  # 唯一标识：GUID 优先，其次链接（用于高水位）
+    guid: Optional[str]
+    url: str
+    title: str
+    author: Optional[str]
+    summary: str
+    published_at: Optional[datetime]  # UTC naive；缺失时取 updated_at
+    updated_at: Optional[datetime]  # UTC naive
+
+
+def normalize_entry(entry) -> NormalizedEntry:
+    """feedparser 风格的条目 dict -> NormalizedEntry"""
+    guid = (entry.get("id") or "").strip() or None
+    url = (entry.get("link") or "").strip()
+    published = entry_datetime(entry, "published")
+    updated = entry_datetime(entry, "updated")
+
+    return NormalizedEntry(
+        key=guid or url,
+        guid=guid,
+        url=url,
+        title=entry.get("title") or "Untitled",
+        author=entry.get("author") or None,
+        summary=entry.get("summary") or "",
+        published_at=published or updated,
+        updated_at=updated,
+    )
+
+
+def entry_datetime(entry, field: str) -> Optional[datetime]:
+    """读取条目的 published / updated 时间（UTC naive），优先使用预解析的时间结构"""
+    parsed = entry.get(f"{field}_parsed")
+    if parsed:
+        try:
+            return _checked(datetime(*parsed[:6]))
+        except (TypeError, ValueError):
+            pass
+    return parse_datetime(entry.get(field))
+
+
+def parse_datetime(value: Optional[str]) -> Optional[datetime]:
+    """解析时间字符串为 UTC naive datetime，无法解析时返回 None"""
+    if not value:
+        return None
+
+    parsed = _parse_rfc822(value) or _parse_iso8601(value)
+    if parsed is None:
+        try:
+            parsed = date_parser.parse(value)
+        except (ValueError, OverflowError, TypeError):
+            return None
+        if parsed.tzinfo is not None:
+            parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+
+    return _checked(parsed)
+
+
+def utc_timestamp(value: Optional[datetime]) -> int:
+    """UTC naive datetime -> Unix 时间戳（datetime.timestamp() 会把 naive 值当作本地时间）"""
+    return calendar.timegm(value.timetuple()) if value else 0
+
+
+def _parse_rfc822(value: str) -> Optional[datetime]:
+    match = _RFC822.match(value)
+    if not match:
+        return None
+
+    day, month_name, year, hour, minute, second, sign, tz_hour, tz_minute, tz_name = match.groups()
+    month = _MONTHS.get(month_name.lower())
+    if month is None:
+        return None
+
+    year = int(year)
+    if year < 100:
+        year += 2000 if year < 50 else 1900
+
+    if sign:
+        offset = timedelta(hours=int(tz_hour), minutes=int(tz_minute))
+        if sign == "-":
+            offset = -offset
+    elif tz_name:
+        hours = _TZ_NAMES.get(tz_name.lower())
+        if hours is None:
+            return None  # 不认识的时区缩写交给 dateutil
+        offset = timedelta(hours=hours)
+    else:
+        offset = timedelta(0)
+
+    try:
+        local = datetime(year, month, int(day), int(hour), int(minute), int(second or 0))
+    except ValueError:
+        return None
+    return local - offset
+
+
+def _parse_iso8601(value: str) -> Optional[datetime]:
+    match = _ISO8601.match(value)
+    if not match:
+        return None
+
+    year, month, day, hour, minute, second, fraction, zulu, sign, tz_hour, tz_minute = match.groups()
+    try:
+        local = datetime(
+            int(year), int(month), int(day),
+            int(hour or 0), int(minute or 0), int(second or 0),
+            int((fraction or "0").ljust(6, "0"))
+        )
+    except ValueError:
+        return None
+
+    if sign:
+        offset = timedelta(hours=int(tz_hour), minutes=int(tz_minute))
+        return local - offset if sign == "+" else local + offset
+    # 没有时区（包括 Z）按 UTC 处理
+    return local
+
+
+def _checked(value: datetime) -> Optional[datetime]:
+    """过滤明显错误的时间（过早或在未来）"""
+    if value.year < MIN_YEAR or value > datetime.utcnow() + MAX_FUTURE_SKEW:
+        return None
+    return value
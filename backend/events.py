@@ -0,0 +1,223 @@
+"""
+入库事件推送
+负责：文章入库（article.created）与全文提取完成（article.extracted）事件的进程内发布/订阅
+
+- 抓取/提取代码在提交事务前调用 record()；事务提交后事件才会发布，回滚则丢弃；
+- 进程内 EventBus 把事件放入环形缓冲区并分发给所有 SSE 订阅者，订阅者之间不共享数据库查询；
+  客户端断线重连时带上 Last-Event-ID，从缓冲区补发错过的事件；
+- 抓取/提取不在 API 进程中时（独立 worker、命令行回填等），record() 改为把事件写入 events 表
+  （与文章同一事务），每个 API 进程用一个 EventTailer 线程轮询该表并发布到自己的 EventBus。
+"""
+
+import asyncio
+import json
+import logging
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+from sqlalchemy import event as sa_event, func
+from sqlalchemy.orm import Session
+
+from database import SessionLocal
+from models import Article, Event
+
+logger = logging.getLogger(__name__)
+
+ARTICLE_CREATED = "article.created"
+ARTICLE_EXTRACTED = "article.extracted"
+EVENT_TYPES = (ARTICLE_CREATED, ARTICLE_EXTRACTED)
+
+RING_SIZE = 2000  # 用于断线续传的最近事件数
+SUBSCRIBER_QUEUE_SIZE = 1000  # 单个订阅者的待发送上限，超过后断开（客户端重连后从缓冲区续传）
+TAIL_INTERVAL_SECONDS = 1.0
+EVENT_RETENTION = timedelta(days=1)
+
+_PENDING_KEY = "pending_events"
+
+
+@dataclass
+class PublishedEvent:
+    id: int
+    type: str
+    data: Dict
+
+
+@dataclass(eq=False)
+class Subscription:
+    queue: "asyncio.Queue"
+    backlog: List[PublishedEvent] = field(default_factory=list)
+    gap: bool = False  # 请求续传的位置已不在缓冲区内，客户端需要重新同步
+    overflowed: bool = False
+
+
+class EventBus:
+    """进程内发布/订阅（发布可以来自任意线程，订阅者在事件循环中消费）"""
+
+    def __init__(self, ring_size: int = RING_SIZE, queue_size: int = SUBSCRIBER_QUEUE_SIZE):
+        self.queue_size = queue_size
+        self._ring = deque(maxlen=ring_size)
+        self._subscribers = set()
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        # 进程内事件ID以启动时间（毫秒）为起点，重启后的ID仍大于之前发出的ID
+        self._floor = int(time.time() * 1000)
+        self._last_id = self._floor
+
+    def attach(self, loop: asyncio.AbstractEventLoop):
+        """绑定 API 进程的事件循环（在 lifespan 中调用）"""
+        self._loop = loop
+
+    @property
+    def attached(self) -> bool:
+        return self._loop is not None
+
+    def publish(self, type: str, data: Dict) -> PublishedEvent:
+        with self._lock:
+            self._last_id += 1
+            published = PublishedEvent(self._last_id, type, data)
+            self._ring.append(published)
+            subscribers = list(self._subscribers)
+
+        if subscribers and self._loop is not None and not self._loop.is_closed():
+            for subscription in subscribers:
+                self._loop.call_soon_threadsafe(self._deliver, subscription, published)
+        return published
+
+    def subscribe(self, last_event_id: int = None) -> Subscription:
+        """注册订阅者；带 last_event_id 时 backlog 中是缓冲区里之后的事件"""
+        subscription = Subscription(queue=asyncio.Queue(maxsize=self.queue_size))
+        with self._lock:
+            if last_event_id is not None:
+                oldest = self._ring[0].id - 1 if self._ring else self._floor
+                subscription.gap = last_event_id < oldest
+                subscription.backlog = [e for e in self._ring if e.id > last_event_id]
+            self._subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        with self._lock:
+            self._subscribers.discard(subscription)
+
+    def _deliver(self, subscription: Subscription, published: PublishedEvent):
+        if subscription.overflowed:
+            return
+        try:
+            subscription.queue.put_nowait(published)
+        except asyncio.QueueFull:
+            subscription.overflowed = True
+            self.unsubscribe(subscription)
+
+
+_bus = EventBus()
+
+
+def get_event_bus() -> EventBus:
+    return _bus
+
+
+def record(db: Session, type: str, data: Dict):
+    """
+    记录一个事件，随 db 的下一次提交发布（不提交事务）
+
+    API 进程内：暂存在会话上，提交后发布到进程内 EventBus；
+    其他进程（独立 worker、命令行）：写入 events 表，由 API 进程的 EventTailer 发布。
+    """
+    if _bus.attached:
+        db.info.setdefault(_PENDING_KEY, []).append((type, data))
+    else:
+        db.add(Event(type=type, payload=json.dumps(data, ensure_ascii=False)))
+
+
+@sa_event.listens_for(Session, "after_commit")
+def _publish_pending(session: Session):
+    for type, data in session.info.pop(_PENDING_KEY, ()):
+        _bus.publish(type, data)
+
+
+@sa_event.listens_for(Session, "after_rollback")
+def _discard_pending(session: Session):
+    session.info.pop(_PENDING_KEY, None)
+
+
+def _iso(value: Optional[datetime]) -> Optional[str]:
+    return value.isoformat() if value else None
+
+
+def article_created(article: Article) -> Dict:
+    """article.created 事件数据"""
+    return {
+        "id": article.id,
+        "source_id": article.source_id,
+        "title": article.title,
+        "url": article.url,
+        "category": article.category,
+        "language": article.language,
+        "published_at": _iso(article.published_at),
+    }
+
+
+def article_extracted(article: Article) -> Dict:
+    """article.extracted 事件数据"""
+    return {
+        "id": article.id,
+        "source_id": article.source_id,
+        "title": article.title,
+        "url": article.url,
+        "category": article.category,
+        "language": article.content_language or article.language,
+        "word_count": article.word_count,
+        "token_estimate": article.token_estimate,
+    }
+
+
+class EventTailer(threading.Thread):
+    """轮询 events 表（其他进程写入的事件），发布到进程内 EventBus"""
+
+    def __init__(self, bus: EventBus = None, interval: float = TAIL_INTERVAL_SECONDS):
+        super().__init__(name="event-tailer", daemon=True)
+        self.bus = bus or _bus
+        self.interval = interval
+        self._stop_event = threading.Event()
+
+    def stop(self):
+        self._stop_event.set()
+
+    def run(self):
+        db = SessionLocal()
+        try:
+            last_id = db.query(func.max(Event.id)).scalar() or 0
+            last_prune = 0.0
+
+            while not self._stop_event.is_set():
+                rows = []
+                try:
+                    rows = db.query(Event.id, Event.type, Event.payload).filter(
+                        Event.id > last_id
+                    ).order_by(Event.id).limit(500).all()
+                    db.rollback()  # 结束读事务，下次轮询能看到新提交的数据
+                    for row in rows:
+                        self.bus.publish(row.type, json.loads(row.payload or "{}"))
+                        last_id = row.id
+
+                    if time.monotonic() - last_prune > 600:
+                        self._prune(db)
+                        last_prune = time.monotonic()
+                except Exception as e:
+                    db.rollback()
+                    logger.warning(f"Event tailer error: {e}")
+
+                if len(rows) < 500:
+                    self._stop_event.wait(self.interval)
+        finally:
+            db.close()
+
+    def _prune(self, db: Session):
+        """删除过期事件（多个 API 进程重复执行也没有影响）"""
+        db.query(Event).filter(
+            Event.created_at < datetime.utcnow() - EVENT_RETENTION
+        ).delete(synchronize_session=False)
+        db.commit()
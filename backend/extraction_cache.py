@@ -0,0 +1,105 @@
+"""
+全文提取缓存
+负责：按"页面内容 hash + 提取参数 hash"缓存 trafilatura 的提取结果，容量超限时按最近使用时间淘汰
+
+重定向别名、镜像、AMP 页面等不同 URL 下载到相同内容时直接复用 Markdown；
+提取参数或 trafilatura 版本变化后 options_hash 随之变化，旧结果自然不再命中。
+"""
+
+import hashlib
+import json
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import func
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+
+from models import ExtractionCacheEntry
+
+MAX_CACHE_BYTES = 256 * 1024 * 1024  # 缓存容量上限（按 Markdown 字节数计）
+
+
+def content_hash(body: bytes) -> str:
+    """页面内容 hash"""
+    return hashlib.sha256(body).hexdigest()
+
+
+def options_hash(options: dict) -> str:
+    """提取参数 hash（包含 trafilatura 版本，升级后自动失效）"""
+    try:
+        import trafilatura
+        version = getattr(trafilatura, "__version__", "")
+    except ImportError:
+        version = ""
+    raw = json.dumps(options, sort_keys=True) + version
+    return hashlib.sha256(raw.encode()).hexdigest()[:16]
+
+
+class ExtractionCache:
+    """表存储的提取缓存"""
+
+    def __init__(self, db: Session, max_bytes: int = MAX_CACHE_BYTES):
+        self.db = db
+        self.max_bytes = max_bytes
+
+    def get(self, body_hash: str, opts_hash: str) -> Optional[str]:
+        """
+        查询缓存（命中时刷新最近使用时间，不提交事务）
+
+        Returns:
+            缓存的 Markdown；空字符串表示已知提取不到正文；None 表示未命中
+        """
+        entry = self.db.get(ExtractionCacheEntry, f"{body_hash}:{opts_hash}")
+        if entry is None:
+            return None
+        entry.last_used_at = datetime.utcnow()
+        return entry.markdown or ""
+
+    def put(self, body_hash: str, opts_hash: str, markdown: Optional[str]):
+        """写入缓存（不提交事务）"""
+        markdown = markdown or ""
+        now = datetime.utcnow()
+        # 多个 worker 可能同时提取相同页面，用 upsert 避免主键冲突
+        stmt = sqlite_insert(ExtractionCacheEntry).values(
+            cache_key=f"{body_hash}:{opts_hash}",
+            content_hash=body_hash,
+            options_hash=opts_hash,
+            markdown=markdown,
+            size=len(markdown.encode("utf-8")),
+            created_at=now,
+            last_used_at=now
+        )
+        self.db.execute(stmt.on_conflict_do_update(
+            index_elements=["cache_key"],
+            set_={"last_used_at": now}
+        ))
+
+    def evict(self) -> int:
+        """
+        容量超限时按最近使用时间从旧到新淘汰，直到低于上限的 90%
+
+        Returns:
+            淘汰的条目数
+        """
+        total = self.db.query(func.coalesce(func.sum(ExtractionCacheEntry.size), 0)).scalar()
+        if total <= self.max_bytes:
+            return 0
+
+        target = int(self.max_bytes * 0.9)
+        evicted = []
+        rows = self.db.query(ExtractionCacheEntry.cache_key, ExtractionCacheEntry.size).order_by(
+            ExtractionCacheEntry.last_used_at
+        ).all()
+        for cache_key, size in rows:
+            if total <= target:
+                break
+            evicted.append(cache_key)
+            total -= size or 0
+
+        for i in range(0, len(evicted), 500):
+            self.db.query(ExtractionCacheEntry).filter(
+                ExtractionCacheEntry.cache_key.in_(evicted[i:i + 500])
+            ).delete(synchronize_session=False)
+        self.db.commit()
+        return len(evicted)
@@ -0,0 +1,420 @@
+"""
+RSS / Atom 订阅输出
+负责：按参数组合（分类、语言、来源、最低评分、精选）生成订阅文档，并在内存中缓存
+
+阅读器会频繁轮询同一个地址，因此：
+- 每个参数组合的文档渲染一次后缓存，附带 ETag / Last-Modified，未变化时返回 304；
+- 两次检查之间（CHECK_INTERVAL_SECONDS）直接使用缓存，不查询数据库；
+- 检查时先比较全局版本（articles.created_at / updated_at、article_analyses.analyzed_at 的最大值，均走索引，
+  以及文章数），有变化时只查询水位之后新增 / 更新 / 重新分析的文章，渲染这些条目后与已缓存的条目合并；
+  更新的文章（如 content_language 变化）在 Python 中重新判断订阅条件，不再满足时移出；
+  文章数少于“上次的文章数 + 新增数”（有删除）或移出条目后订阅不足 FEED_LIMIT 条时整体重建；
+- 每个参数组合一把锁：不同订阅的刷新互不阻塞，同一订阅并发请求时只刷新一次。
+"""
+
+import email.utils
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+from xml.sax.saxutils import escape
+
+from sqlalchemy import func, or_, select
+from sqlalchemy.orm import Session
+
+from models import Article, ArticleAnalysis
+
+FEED_TITLE = "ArticleAggregator"
+FEED_LINK = "http://localhost:8765/"
+FEED_LIMIT = 50  # 每个订阅最多条目数
+CHECK_INTERVAL_SECONDS = 30  # 两次检查数据库之间直接使用缓存
+MAX_CACHED_FEEDS = 256  # 缓存的参数组合数上限（LRU）
+SUMMARY_MAX_CHARS = 2000
+
+FORMATS = ("rss", "atom")
+
+# 订阅地址中的简写分类（与 bestblogs.dev 的订阅参数一致）-> 源分类
+CATEGORY_ALIASES = {
+    "ai": "Artificial_Intelligence",
+    "programming": "Programming_Technology",
+    "product": "Product_Development",
+}
+
+# 每个条目需要的列
+FEED_COLUMNS = (
+    Article.id,
+    Article.title,
+    Article.author,
+    Article.url,
+    Article.summary,
+    Article.category,
+    Article.published_at,
+    Article.created_at,
+    Article.source_id,
+    Article.language,
+    Article.content_language,
+    ArticleAnalysis.score,
+    ArticleAnalysis.featured,
+    ArticleAnalysis.one_sentence_summary,
+)
+
+
+@dataclass(frozen=True)
+class FeedParams:
+    """订阅参数（规范化后作为缓存键）"""
+    format: str = "rss"
+    category: Optional[str] = None
+    language: Optional[str] = None
+    source_id: Optional[int] = None
+    min_score: Optional[int] = None
+    featured: bool = False
+
+    @classmethod
+    def build(cls, format: str = "rss", category: str = None, language: str = None,
+              source_id: int = None, min_score: int = None, featured: bool = False) -> "FeedParams":
+        if category:
+            category = CATEGORY_ALIASES.get(category.lower(), category)
+        return cls(
+            format=format,
+            category=category or None,
+            language=(language or "").replace("-", "_") or None,
+            source_id=source_id,
+            min_score=min_score,
+            featured=bool(featured),
+        )
+
+    @property
+    def needs_analysis(self) -> bool:
+        """条件依赖分析结果（重新分析后条目可能进入或移出订阅）"""
+        return self.min_score is not None or self.featured
+
+
+@dataclass
+class FeedItem:
+    id: str
+    sort_key: datetime
+    xml: str
+
+
+@dataclass
+class CachedFeed:
+    items: List[FeedItem] = field(default_factory=list)
+    body: bytes = b""
+    etag: str = ""
+    last_modified: datetime = None
+    created_mark: Optional[datetime] = None  # 已处理到的 articles.created_at
+    analyzed_mark: Optional[datetime] = None  # 已处理到的 article_analyses.analyzed_at
+    updated_mark: Optional[datetime] = None  # 已处理到的 articles.updated_at
+    article_count: Optional[int] = None  # 上次检查时的文章数（少于“上次 + 新增”说明有文章被删除）
+    checked_at: float = 0.0
+    lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+
+class FeedCache:
+    """按参数组合缓存渲染好的订阅文档（进程内，线程安全）"""
+
+    def __init__(self, limit: int = FEED_LIMIT, check_interval: float = CHECK_INTERVAL_SECONDS,
+                 max_feeds: int = MAX_CACHED_FEEDS):
+        self.limit = limit
+        self.check_interval = check_interval
+        self.max_feeds = max_feeds
+        self._feeds: "OrderedDict[FeedParams, CachedFeed]" = OrderedDict()
+        self._lock = threading.Lock()  # 只保护 _feeds；刷新时持有各订阅自己的锁
+
+    def get(self, db: Session, params: FeedParams) -> CachedFeed:
+        """返回最新的订阅文档（必要时增量更新）"""
+        with self._lock:
+            feed = self._feeds.get(params)
+            if feed is not None:
+                self._feeds.move_to_end(params)
+            else:
+                feed = CachedFeed()
+                self._feeds[params] = feed
+                while len(self._feeds) > self.max_feeds:
+                    self._feeds.popitem(last=False)
+
+        with feed.lock:
+            if feed.body and time.monotonic() - feed.checked_at < self.check_interval:
+                return feed
+            self._refresh(db, params, feed)
+            feed.checked_at = time.monotonic()
+            return feed
+
+    def clear(self):
+        with self._lock:
+            self._feeds.clear()
+
+    def _refresh(self, db: Session, params: FeedParams, feed: CachedFeed):
+        created_mark, analyzed_mark, updated_mark, article_count = db.execute(select(
+            select(func.max(Article.created_at)).scalar_subquery(),
+            select(func.max(ArticleAnalysis.analyzed_at)).scalar_subquery(),
+            select(func.max(Article.updated_at)).scalar_subquery(),
+            select(func.count(Article.id)).scalar_subquery(),
+        )).one()
+
+        articles_changed = created_mark != feed.created_mark
+        analyses_changed = params.needs_analysis and analyzed_mark != feed.analyzed_mark
+        updated_changed = updated_mark != feed.updated_mark
+        deleted = self._articles_deleted(db, feed, article_count, articles_changed)
+        if feed.body and not (articles_changed or analyses_changed or updated_changed or deleted):
+            return
+
+        rows = None
+        if feed.body and not deleted:
+            rows = self._changed_rows(db, params, feed, articles_changed, analyses_changed, updated_changed)
+        merged = None if rows is None else self._merge(params, feed, rows)
+        rebuild = merged is None
+        if rebuild:
+            # 首次生成、有文章被删除、变化太多或移出条目后不足 limit 条：整体重建
+            feed.items = []
+            rows = db.execute(self._select(params).limit(self.limit)).all()
+            self._merge(params, feed, rows)
+
+        if merged or rebuild:
+            self._render(params, feed)
+
+        feed.created_mark = created_mark
+        feed.analyzed_mark = analyzed_mark
+        feed.updated_mark = updated_mark
+        feed.article_count = article_count
+
+    def _articles_deleted(self, db: Session, feed: CachedFeed, article_count: int, articles_changed: bool) -> bool:
+        """
+        上次检查以来是否有文章被删除
+
+        只比较文章数时，同一间隔内删除一篇又新增一篇会漏掉删除；因此与“上次的文章数 + 水位之后新增的文章数”比较
+        （created_at 有索引）。入库时间不晚于水位的新文章会被误判为删除，只会多一次整体重建。
+        """
+        if feed.article_count is None:
+            return False
+        inserted = 0
+        if articles_changed and feed.created_mark is not None:
+            inserted = db.execute(
+                select(func.count(Article.id)).where(Article.created_at > feed.created_mark)
+            ).scalar()
+        return article_count < feed.article_count + inserted
+
+    def _changed_rows(self, db: Session, params: FeedParams, feed: CachedFeed,
+                      articles_changed: bool, analyses_changed: bool, updated_changed: bool) -> Optional[List]:
+        """
+        水位之后新增的文章、（评分类订阅）水位之后重新分析的文章，以及水位之后更新的文章；变化太多时返回 None
+
+        更新的文章不按订阅条件过滤（语言等可能刚好变得不满足），由 _merge 在 Python 中判断。
+        """
+        changed = []
+        if articles_changed and feed.created_mark is not None:
+            changed.append(Article.created_at > feed.created_mark)
+        elif articles_changed:
+            changed.append(Article.created_at != None)  # noqa: E711
+        if analyses_changed and feed.analyzed_mark is not None:
+            changed.append(ArticleAnalysis.analyzed_at > feed.analyzed_mark)
+        elif analyses_changed:
+            changed.append(ArticleAnalysis.analyzed_at != None)  # noqa: E711
+
+        # 评分条件在 Python 中判断，这样分数下降的文章也能查出来并移出订阅
+        cap = self.limit * 4
+        rows = []
+        if changed:
+            stmt = self._select(params, apply_analysis=False).where(or_(*changed))
+            rows = db.execute(stmt.limit(cap)).all()
+        if updated_changed and len(rows) < cap:
+            stmt = self._select(params, apply_filters=False)
+            if feed.updated_mark is not None:
+                stmt = stmt.where(Article.updated_at > feed.updated_mark)
+            rows += db.execute(stmt.limit(cap)).all()
+        return None if len(rows) >= cap else rows
+
+    def _select(self, params: FeedParams, apply_analysis: bool = True, apply_filters: bool = True):
+        stmt = select(*FEED_COLUMNS).outerjoin(
+            ArticleAnalysis, ArticleAnalysis.article_id == Article.id
+        )
+        if not apply_filters:
+            return stmt.order_by(func.coalesce(Article.published_at, Article.created_at).desc())
+        if params.category:
+            stmt = stmt.where(Article.category == params.category)
+        if params.language:
+            stmt = stmt.where(
+                func.coalesce(Article.content_language, Article.language).like(f"{params.language}%")
+            )
+        if params.source_id is not None:
+            stmt = stmt.where(Article.source_id == params.source_id)
+        if apply_analysis and params.min_score is not None:
+            stmt = stmt.where(ArticleAnalysis.score >= params.min_score)
+        if apply_analysis and params.featured:
+            stmt = stmt.where(ArticleAnalysis.featured == True)  # noqa: E712
+        return stmt.order_by(func.coalesce(Article.published_at, Article.created_at).desc())
+
+    def _merge(self, params: FeedParams, feed: CachedFeed, rows) -> Optional[bool]:
+        """把变化的文章合并进条目列表，返回条目是否有变化；移出条目后不足 limit 条时返回 None（需要重建）"""
+        if not rows:
+            return False
+
+        full = len(feed.items) >= self.limit
+        items: Dict[str, FeedItem] = {item.id: item for item in feed.items}
+        changed = False
+        for row in rows:
+            if _matches(params, row):
+                xml = _render_item(params.format, row)
+                old = items.get(row.id)
+                if old is None or old.xml != xml:
+                    items[row.id] = FeedItem(row.id, row.published_at or row.created_at, xml)
+                    changed = True
+            elif items.pop(row.id, None) is not None:
+                changed = True
+
+        if full and len(items) < self.limit:
+            return None
+        if changed:
+            ordered = sorted(items.values(), key=lambda item: item.sort_key, reverse=True)
+            feed.items = ordered[:self.limit]
+        return changed
+
+    def _render(self, params: FeedParams, feed: CachedFeed):
+        # ETag 只取决于条目内容：整体重建但内容未变时，阅读器仍然得到 304
+        digest = hashlib.sha1()
+        for item in feed.items:
+            digest.update(item.xml.encode("utf-8"))
+        etag = f'"{digest.hexdigest()}"'
+        if feed.body and etag == feed.etag:
+            return
+
+        now = datetime.utcnow().replace(microsecond=0)
+        feed.body = _render_document(params, feed.items, now).encode("utf-8")
+        feed.etag = etag
+        feed.last_modified = now
+
+
+def _matches(params: FeedParams, row) -> bool:
+    """条目是否满足订阅条件（与 _select 中的 SQL 条件一致）"""
+    if params.category and row.category != params.category:
+        return False
+    if params.language and not (row.content_language or row.language or "").lower().startswith(params.language.lower()):
+        return False
+    if params.source_id is not None and row.source_id != params.source_id:
+        return False
+    if params.min_score is not None and (row.score is None or row.score < params.min_score):
+        return False
+    if params.featured and not row.featured:
+        return False
+    return True
+
+
+def _item_text(row) -> str:
+    text = row.one_sentence_summary or row.summary or ""
+    return text[:SUMMARY_MAX_CHARS]
+
+
+def _render_item(format: str, row) -> str:
+    """渲染单个条目（rss: <item>，atom: <entry>）"""
+    published = row.published_at or row.created_at
+    title = escape(row.title or "")
+    link = escape(row.url or "")
+    summary = escape(_item_text(row))
+    author = escape(row.author or "")
+    category = escape(row.category or "")
+
+    if format == "atom":
+        return (
+            "<entry>"
+            f"<id>urn:article:{escape(row.id)}</id>"
+            f"<title>{title}</title>"
+            f'<link rel="alternate" href="{link}"/>'
+            f"<updated>{_atom_date(published)}</updated>"
+            + (f"<author><name>{author}</name></author>" if author else "")
+            + (f'<category term="{category}"/>' if category else "")
+            + f'<summary type="html">{summary}</summary>'
+            "</entry>"
+        )
+
+    return (
+        "<item>"
+        f"<title>{title}</title>"
+        f"<link>{link}</link>"
+        f'<guid isPermaLink="false">{escape(row.id)}</guid>'
+        f"<pubDate>{_rss_date(published)}</pubDate>"
+        + (f"<dc:creator>{author}</dc:creator>" if author else "")
+        + (f"<category>{category}</category>" if category else "")
+        + f"<description>{summary}</description>"
+        "</item>"
+    )
+
+
+def _render_document(params: FeedParams, items: List[FeedItem], now: datetime) -> str:
+    title = escape(_feed_title(params))
+    body = "".join(item.xml for item in items)
+
+    if params.format == "atom":
+        return (
+            '<?xml version="1.0" encoding="utf-8"?>\n'
+            '<feed xmlns="http://www.w3.org/2005/Atom">'
+            f"<id>{escape(FEED_LINK)}</id>"
+            f"<title>{title}</title>"
+            f'<link rel="alternate" href="{escape(FEED_LINK)}"/>'
+            f"<updated>{_atom_date(now)}</updated>"
+            f"{body}"
+            "</feed>"
+        )
+
+    return (
+        '<?xml version="1.0" encoding="utf-8"?>\n'
+        '<rss version="2.0" xmlns:dc="http://purl.org/dc/elements/1.1/"><channel>'
+        f"<title>{title}</title>"
+        f"<link>{escape(FEED_LINK)}</link>"
+        f"<description>{title}</description>"
+        f"<lastBuildDate>{_rss_date(now)}</lastBuildDate>"
+        f"{body}"
+        "</channel></rss>"
+    )
+
+
+def _feed_title(params: FeedParams) -> str:
+    parts = [FEED_TITLE]
+    if params.category:
+        parts.append(params.category)
+    if params.language:
+        parts.append(params.language)
+    if params.featured:
+        parts.append("featured")
+    if params.min_score is not None:
+        parts.append(f"score>={params.min_score}")
+    return " - ".join(parts)
+
+
+def _rss_date(value: datetime) -> str:
+    return email.utils.format_datetime(value.replace(tzinfo=timezone.utc), usegmt=True)
+
+
+def _atom_date(value: datetime) -> str:
+    return value.replace(microsecond=0).isoformat() + "Z"
+
+
+def http_date(value: datetime) -> str:
+    """datetime（UTC）-> Last-Modified 头格式"""
+    return _rss_date(value.replace(microsecond=0))
+
+
+def not_modified(feed: CachedFeed, if_none_match: Optional[str], if_modified_since: Optional[str]) -> bool:
+    """根据条件请求头判断是否可以返回 304（If-None-Match 优先）"""
+    if if_none_match:
+        tags = [tag.strip() for tag in if_none_match.split(",")]
+        return feed.etag in tags or "*" in tags
+    if if_modified_since and feed.last_modified:
+        try:
+            since = email.utils.parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError, IndexError):
+            return False
+        if since.tzinfo is not None:
+            since = since.astimezone(timezone.utc).replace(tzinfo=None)
+        return feed.last_modified <= since
+    return False
+
+
+_feed_cache = FeedCache()
+
+
+def get_feed_cache() -> FeedCache:
+    """进程内共享的订阅缓存"""
+    return _feed_cache
@@ -0,0 +1,180 @@
+"""
+流式 feed 解析
+负责：边下载边用 XMLPullParser 增量解析 RSS 2.0 / RSS 1.0 (RDF) / Atom，逐条产出条目
+
+调用方停止迭代时，后续数据块不再读取（连接随 response.close() 归还连接池），
+已处理的条目元素会从树中移除，因此峰值内存与 feed 大小无关。
+XML 不规范（例如未转义的 HTML 实体）导致增量解析失败时，退回 feedparser 完整解析。
+"""
+
+import copy
+import logging
+from typing import Iterator, Iterable, Optional, Dict, List, Callable
+from xml.etree.ElementTree import XMLPullParser, ParseError, Element, tostring
+from xml.sax.saxutils import escape
+
+import feedparser
+
+from entry_normalizer import parse_datetime
+
+logger = logging.getLogger(__name__)
+
+ATOM_NS = "http://www.w3.org/2005/Atom"
+RSS1_NS = "http://purl.org/rss/1.0/"
+DC_NS = "http://purl.org/dc/elements/1.1/"
+CONTENT_NS = "http://purl.org/rss/1.0/modules/content/"
+
+# 条目元素：(命名空间, 本地名)
+ENTRY_TAGS = {
+    ("", "item"),
+    (RSS1_NS, "item"),
+    (ATOM_NS, "entry"),
+}
+
+
+def iter_feed_entries(chunks: Iterable[bytes],
+                      fallback: Callable[[], "feedparser.FeedParserDict"] = None) -> Iterator[Dict]:
+    """
+    增量解析 feed，逐条产出条目 dict
+
+    产出的 dict 使用与 feedparser 条目相同的键（id、link、title、author、summary、
+    published、updated、published_parsed、updated_parsed），调用方可以透明切换。
+
+    Args:
+        chunks: 响应体数据块迭代器（http_client.HTTPClient.stream 的返回值）
+        fallback: 增量解析失败时调用，返回 feedparser 的完整解析结果（通常是重新下载后解析）；
+                  为 None 时直接抛出解析错误
+    """
+    parser = XMLPullParser(events=("start", "end"))
+    stack: List[Element] = []
+    yielded = 0
+
+    try:
+        for chunk in chunks:
+            parser.feed(chunk)
+            for event, element in parser.read_events():
+                if event == "start":
+                    stack.append(element)
+                    continue
+
+                stack.pop()
+                if _split_tag(element.tag) not in ENTRY_TAGS:
+                    continue
+
+                entry = _element_to_entry(element)
+                # 从父元素移除已处理的条目，释放内存
+                if stack:
+                    stack[-1].remove(element)
+                element.clear()
+                yielded += 1
+                yield entry
+        parser.close()
+
+    except ParseError as e:
+        if fallback is None:
+            raise
+        logger.warning(f"Streaming parse failed ({e}), falling back to feedparser")
+        feed = fallback()
+        if feed.bozo and not feed.entries:
+            raise ValueError(f"Feed parse error: {feed.bozo_exception}")
+        # 跳过增量解析阶段已经产出的条目
+        for entry in feed.entries[yielded:]:
+            yield entry
+
+
+def _split_tag(tag: str):
+    """'{ns}local' -> (ns, local)"""
+    if tag.startswith("{"):
+        namespace, local = tag[1:].split("}", 1)
+        return namespace, local
+    return "", tag
+
+
+def _inner_xml(element: Element) -> str:
+    """元素内部的标记（子元素去掉命名空间后序列化），与 feedparser 对 xhtml 内容的处理一致"""
+    parts = [escape(element.text or "")]
+    for child in element:
+        child = copy.deepcopy(child)
+        for node in child.iter():
+            if isinstance(node.tag, str):
+                node.tag = _split_tag(node.tag)[1]
+        parts.append(tostring(child, encoding="unicode"))
+    return "".join(parts).strip()
+
+
+def _content_text(child: Element) -> str:
+    """
+    摘要 / 正文元素的内容
+
+    Atom 的 type="xhtml" 内容包在一个 <div> 中，child.text 为空，需要序列化其中的元素；
+    其他类型（text / html / CDATA）直接取文本。
+    """
+    text = (child.text or "").strip()
+    if text or len(child) == 0:
+        return text
+    if child.get("type") == "xhtml" and len(child) == 1 and _split_tag(child[0].tag)[1] == "div":
+        return _inner_xml(child[0])
+    return _inner_xml(child)
+
+
+def _element_to_entry(element: Element) -> Dict:
+    """把 item / entry 元素转换为 feedparser 风格的条目 dict"""
+    entry: Dict = {}
+    atom_links = []
+
+    for child in element:
+        namespace, local = _split_tag(child.tag)
+        text = (child.text or "").strip()
+
+        if local == "title":
+            entry.setdefault("title", text)
+        elif local == "link":
+            if namespace == ATOM_NS:
+                atom_links.append(child)
+            elif text:
+                entry.setdefault("link", text)
+        elif local in ("guid", "id"):
+            entry.setdefault("id", text)
+        elif local in ("description", "summary"):
+            entry.setdefault("summary", _content_text(child))
+        elif namespace == CONTENT_NS and local == "encoded":
+            entry.setdefault("content_encoded", text)
+        elif namespace == ATOM_NS and local == "content":
+            entry.setdefault("content_encoded", _content_text(child))
+        elif local == "author":
+            name = child.find(f"{{{ATOM_NS}}}name")
+            entry.setdefault("author", (name.text or "").strip() if name is not None else text)
+        elif namespace == DC_NS and local == "creator":
+            entry.setdefault("author", text)
+        elif local in ("pubDate", "published", "issued") or (namespace == DC_NS and local == "date"):
+            entry.setdefault("published", text)
+        elif local in ("updated", "modified"):
+            entry.setdefault("updated", text)
+
+    if "link" not in entry and atom_links:
+        alternate = [link for link in atom_links if link.get("rel", "alternate") == "alternate"]
+        entry["link"] = (alternate or atom_links)[0].get("href", "")
+
+    # RSS 1.0 的 item 用 rdf:about 作为标识
+    if "id" not in entry:
+        about = element.get("{http://www.w3.org/1999/02/22-rdf-syntax-ns#}about")
+        if about:
+            entry["id"] = about
+
+    # 没有摘要时用全文内容代替
+    if not entry.get("summary") and entry.get("content_encoded"):
+        entry["summary"] = entry["content_encoded"]
+    entry.pop("content_encoded", None)
+
+    for field in ("published", "updated"):
+        parsed = _parse_struct(entry.get(field))
+        if parsed:
+            entry[f"{field}_parsed"] = parsed
+
+    return entry
+
+
+def _parse_struct(value: Optional[str]):
+    """RFC 822 / ISO 8601 -> UTC time.struct_time（与 feedparser 的 *_parsed 一致）"""
+    parsed = parse_datetime(value)
+    return parsed.timetuple() if parsed else None
@@ -0,0 +1,153 @@
+"""
+共享 HTTP 客户端
+负责：为 RSS feed 与文章页面下载提供统一的连接池、超时、压缩与大小限制
+
+所有对外请求都应通过 get_http_client() 获取的同一个客户端发出，
+这样同一主机的多个源可以复用 keep-alive 连接，避免重复的 TLS 握手。
+"""
+
+import threading
+from typing import Optional, Tuple, Iterator
+
+import requests
+from requests.adapters import HTTPAdapter
+
+try:
+    # 安装了 brotli / brotlicffi 时 urllib3 会自动解码 br 响应
+    import brotli  # noqa: F401
+    _ACCEPT_ENCODING = "gzip, deflate, br"
+except ImportError:
+    try:
+        import brotlicffi  # noqa: F401
+        _ACCEPT_ENCODING = "gzip, deflate, br"
+    except ImportError:
+        _ACCEPT_ENCODING = "gzip, deflate"
+
+USER_AGENT = "ArticleAggregator/1.0 (RSS Reader)"
+
+# 默认参数
+CONNECT_TIMEOUT = 5  # 建立连接超时（秒）
+READ_TIMEOUT = 20  # 读取超时（秒）
+MAX_BODY_SIZE = 10 * 1024 * 1024  # 单个响应体上限（10MB）
+POOL_CONNECTIONS = 64  # 缓存的主机连接池数量
+POOL_MAXSIZE = 16  # 每个主机连接池的最大连接数
+CHUNK_SIZE = 64 * 1024
+
+
+class ResponseTooLarge(Exception):
+    """响应体超过大小限制"""
+
+
+class HTTPClient:
+    """基于 requests.Session 的共享 HTTP 客户端（线程安全的只读 GET 使用）"""
+
+    def __init__(self,
+                 connect_timeout: float = CONNECT_TIMEOUT,
+                 read_timeout: float = READ_TIMEOUT,
+                 max_body_size: int = MAX_BODY_SIZE,
+                 pool_connections: int = POOL_CONNECTIONS,
+                 pool_maxsize: int = POOL_MAXSIZE):
+        self.timeout = (connect_timeout, read_timeout)
+        self.max_body_size = max_body_size
+
+        self.session = requests.Session()
+        self.session.headers.update({
+            'User-Agent': USER_AGENT,
+            'Accept-Encoding': _ACCEPT_ENCODING,
+            'Connection': 'keep-alive',
+        })
+
+        # 每个主机一个 keep-alive 连接池；重试由上层调度处理，这里不重试
+        adapter = HTTPAdapter(
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize,
+            max_retries=0,
+            pool_block=False
+        )
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def stream(self, url: str, accept: str = None,
+               max_body_size: int = None) -> Tuple[requests.Response, Iterator[bytes]]:
+        """
+        以流的方式发起 GET 请求
+
+        Args:
+            url: 请求地址
+            accept: 可选的 Accept 头
+            max_body_size: 本次请求的响应体上限（默认使用客户端的 max_body_size）
+
+        Returns:
+            (响应对象, 已解压的数据块迭代器)；迭代超过 max_body_size 时抛出 ResponseTooLarge。
+            调用方用完后必须调用 response.close() 把连接归还连接池。
+        """
+        limit = max_body_size or self.max_body_size
+        headers = {'Accept': accept} if accept else None
+        response = self.session.get(url, headers=headers, timeout=self.timeout, stream=True)
+        try:
+            response.raise_for_status()
+
+            declared = response.headers.get("Content-Length")
+            if declared and declared.isdigit() and int(declared) > limit:
+                raise ResponseTooLarge(f"{url}: Content-Length {declared} exceeds {limit}")
+        except Exception:
+            response.close()
+            raise
+
+        return response, self._iter_limited(url, response, limit)
+
+    def get_bytes(self, url: str, accept: str = None,
+                  max_body_size: int = None) -> Tuple[bytes, requests.Response]:
+        """
+        下载完整响应体（受 max_body_size 限制）
+
+        Returns:
+            (响应体字节, 响应对象)
+        """
+        response, chunks = self.stream(url, accept=accept, max_body_size=max_body_size)
+        try:
+            body = b"".join(chunks)
+        finally:
+            response.close()
+        return body, response
+
+    def _iter_limited(self, url: str, response: requests.Response, limit: int) -> Iterator[bytes]:
+        """逐块读取响应体，超过大小上限时中止"""
+        received = 0
+        for chunk in response.iter_content(chunk_size=CHUNK_SIZE):
+            if not chunk:
+                continue
+            received += len(chunk)
+            if received > limit:
+                raise ResponseTooLarge(f"{url}: body exceeds {limit} bytes")
+            yield chunk
+
+    def close(self):
+        """关闭所有连接池"""
+        self.session.close()
+
+
+_client: Optional[HTTPClient] = None
+_client_lock = threading.Lock()
+
+
+def get_http_client() -> HTTPClient:
+    """获取进程内共享的 HTTP 客户端（惰性创建）"""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = HTTPClient()
+    return _client
+
+
+def feed_response_headers(response: requests.Response) -> dict:
+    """提取 feedparser 需要的响应头（用于正确判断编码与相对链接）"""
+    headers = {
+        "content-location": response.url,
+    }
+    for name in ("content-type", "content-language", "etag", "last-modified"):
+        value = response.headers.get(name)
+        if value:
+            headers[name] = value
+    return headers
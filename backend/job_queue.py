@@ -0,0 +1,298 @@
+"""
+持久化任务队列
+负责：基于数据库表的任务入队、租约领取、完成、失败重试（指数退避）与死信
+
+多个 worker（线程或进程）可以同时消费同一个队列：领取任务时使用
+"带条件的 UPDATE"（compare-and-set），只有一个 worker 能把任务改为 leased，
+因此不会重复处理；worker 崩溃后租约到期，任务会重新变为可领取。
+"""
+
+import json
+import os
+import random
+import socket
+import threading
+from datetime import datetime, timedelta
+from typing import List, Optional, Iterable, Dict
+
+from sqlalchemy import and_, or_, func
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+
+from models import Job
+
+# 默认参数
+LEASE_SECONDS = 300  # 可见性超时：租约到期前其他 worker 看不到该任务
+MAX_ATTEMPTS = 5
+BACKOFF_BASE_SECONDS = 60  # 第一次重试等待时间，之后每次翻倍
+BACKOFF_MAX_SECONDS = 6 * 3600
+
+# 优先级档位
+PRIORITY_HIGH = 10  # 手动触发
+PRIORITY_NORMAL = 0  # 日常抓取
+PRIORITY_LOW = -10  # 回填等后台任务
+
+
+def default_worker_id() -> str:
+    """worker 标识：主机名:进程号:线程号"""
+    return f"{socket.gethostname()}:{os.getpid()}:{threading.get_ident()}"
+
+
+class JobQueue:
+    """表驱动的任务队列"""
+
+    def __init__(self, db: Session, worker_id: str = None, lease_seconds: int = LEASE_SECONDS):
+        self.db = db
+        self.worker_id = worker_id or default_worker_id()
+        self.lease_seconds = lease_seconds
+
+    def enqueue(self, kind: str, key: str, payload: dict = None,
+                priority: int = PRIORITY_NORMAL, order_key: int = 0,
+                max_attempts: int = MAX_ATTEMPTS, reset: bool = False):
+        """
+        入队单个任务（不提交事务，由调用方提交）
+
+        Args:
+            kind: 任务类型
+            key: 业务键，同 kind 下重复入队会被忽略
+            payload: 任务参数
+            priority: 优先级
+            order_key: 同优先级内排序键（越大越先）
+            max_attempts: 最大尝试次数
+            reset: 已存在的任务（包括已完成/死信）是否重置为待处理
+        """
+        self.enqueue_many(kind, [{
+            "key": key,
+            "payload": payload,
+            "priority": priority,
+            "order_key": order_key,
+        }], max_attempts=max_attempts, reset=reset)
+
+    def enqueue_many(self, kind: str, items: Iterable[dict],
+                     max_attempts: int = MAX_ATTEMPTS, reset: bool = False):
+        """
+        批量入队（一条 INSERT ... ON CONFLICT），不提交事务
+
+        Args:
+            kind: 任务类型
+            items: [{"key": ..., "payload": {...}, "priority": 0, "order_key": 0}, ...]
+        """
+        now = datetime.utcnow()
+        rows = [{
+            "kind": kind,
+            "key": item["key"],
+            "payload": json.dumps(item["payload"]) if item.get("payload") is not None else None,
+            "priority": item.get("priority", PRIORITY_NORMAL),
+            "order_key": item.get("order_key", 0),
+            "status": "queued",
+            "attempts": 0,
+            "max_attempts": max_attempts,
+            "available_at": now,
+            "created_at": now,
+            "updated_at": now,
+        } for item in items]
+
+        if not rows:
+            return
+
+        stmt = sqlite_insert(Job).values(rows)
+        if reset:
+            stmt = stmt.on_conflict_do_update(
+                index_elements=["kind", "key"],
+                set_={
+                    "payload": stmt.excluded.payload,
+                    "priority": stmt.excluded.priority,
+                    "order_key": stmt.excluded.order_key,
+                    "status": "queued",
+                    "attempts": 0,
+                    "max_attempts": stmt.excluded.max_attempts,
+                    "available_at": now,
+                    "lease_owner": None,
+                    "lease_expires_at": None,
+                    "last_error": None,
+                    "updated_at": now,
+                },
+                # 正在处理中的任务不打断
+                where=Job.status != "leased"
+            )
+        else:
+            stmt = stmt.on_conflict_do_nothing(index_elements=["kind", "key"])
+
+        self.db.execute(stmt)
+
+    def lease(self, kind: str, limit: int = 1) -> List[Job]:
+        """
+        领取最多 limit 个可处理的任务
+
+        可领取的任务：queued 且已过退避时间，或 leased 但租约已过期（worker 崩溃）。
+        每个任务用带条件的 UPDATE 抢占，rowcount 为 1 才算领取成功。
+
+        Returns:
+            领取到的任务列表（已提交）
+        """
+        now = datetime.utcnow()
+        self._reap_expired(kind, now)
+
+        claimable = and_(
+            Job.kind == kind,
+            Job.attempts < Job.max_attempts,
+            or_(
+                and_(Job.status == "queued", Job.available_at <= now),
+                and_(Job.status == "leased", Job.lease_expires_at <= now),
+            )
+        )
+
+        # 多取一些候选，抵消与其他 worker 的竞争
+        candidate_ids = [row[0] for row in self.db.query(Job.id).filter(claimable).order_by(
+            Job.priority.desc(), Job.order_key.desc(), Job.id
+        ).limit(limit * 3).all()]
+
+        leased_ids = []
+        expires = now + timedelta(seconds=self.lease_seconds)
+        for job_id in candidate_ids:
+            if len(leased_ids) >= limit:
+                break
+            updated = self.db.query(Job).filter(Job.id == job_id, claimable).update({
+                Job.status: "leased",
+                Job.lease_owner: self.worker_id,
+                Job.lease_expires_at: expires,
+                Job.attempts: Job.attempts + 1,
+                Job.updated_at: now,
+            }, synchronize_session=False)
+            if updated == 1:
+                leased_ids.append(job_id)
+        self.db.commit()
+
+        if not leased_ids:
+            return []
+
+        jobs = self.db.query(Job).filter(Job.id.in_(leased_ids)).all()
+        jobs.sort(key=lambda job: leased_ids.index(job.id))
+        return jobs
+
+    def extend(self, job: Job, seconds: int = None):
+        """延长租约（长任务的心跳）"""
+        expires = datetime.utcnow() + timedelta(seconds=seconds or self.lease_seconds)
+        self.db.query(Job).filter(
+            Job.id == job.id, Job.lease_owner == self.worker_id, Job.status == "leased"
+        ).update({Job.lease_expires_at: expires}, synchronize_session=False)
+        self.db.commit()
+
+    def complete(self, job: Job) -> bool:
+        """
+        标记任务完成
+
+        Returns:
+            是否仍持有租约（租约已被他人接管时返回 False）
+        """
+        updated = self.db.query(Job).filter(
+            Job.id == job.id, Job.lease_owner == self.worker_id, Job.status == "leased"
+        ).update({
+            Job.status: "done",
+            Job.lease_owner: None,
+            Job.lease_expires_at: None,
+            Job.last_error: None,
+            Job.updated_at: datetime.utcnow(),
+        }, synchronize_session=False)
+        self.db.commit()
+        return updated == 1
+
+    def fail(self, job: Job, error: str) -> str:
+        """
+        记录一次失败：未达到上限则按指数退避重新排队，否则进入死信
+
+        Returns:
+            任务的新状态：queued、dead；租约已被他人接管时返回 lost
+        """
+        now = datetime.utcnow()
+        attempts = job.attempts or 1
+        max_attempts = job.max_attempts or MAX_ATTEMPTS
+
+        if attempts >= max_attempts:
+            values = {Job.status: "dead"}
+            new_status = "dead"
+        else:
+            delay = min(BACKOFF_BASE_SECONDS * (2 ** (attempts - 1)), BACKOFF_MAX_SECONDS)
+            delay = delay * random.uniform(0.8, 1.2)  # 抖动，避免同时重试
+            values = {Job.status: "queued", Job.available_at: now + timedelta(seconds=delay)}
+            new_status = "queued"
+
+        values.update({
+            Job.lease_owner: None,
+            Job.lease_expires_at: None,
+            Job.last_error: (error or "")[:2000],
+            Job.updated_at: now,
+        })
+        updated = self.db.query(Job).filter(
+            Job.id == job.id, Job.lease_owner == self.worker_id, Job.status == "leased"
+        ).update(values, synchronize_session=False)
+        self.db.commit()
+        return new_status if updated == 1 else "lost"
+
+    def release(self, job: Job, delay_seconds: float = 0, error: str = None) -> bool:
+        """
+        放弃租约、delay_seconds 秒后重新可领取，不计入尝试次数（停止中、被限流等不是任务本身的失败）
+
+        Returns:
+            是否仍持有租约（租约已被他人接管时返回 False）
+        """
+        now = datetime.utcnow()
+        values = {
+            Job.status: "queued",
+            Job.available_at: now + timedelta(seconds=delay_seconds),
+            Job.attempts: func.max(Job.attempts - 1, 0),  # 退回 lease 时加上的一次
+            Job.lease_owner: None,
+            Job.lease_expires_at: None,
+            Job.updated_at: now,
+        }
+        if error is not None:
+            values[Job.last_error] = error[:2000]
+        updated = self.db.query(Job).filter(
+            Job.id == job.id, Job.lease_owner == self.worker_id, Job.status == "leased"
+        ).update(values, synchronize_session=False)
+        self.db.commit()
+        return updated == 1
+
+    def retry_dead(self, kind: str = None) -> int:
+        """把死信任务重新放回队列"""
+        query = self.db.query(Job).filter(Job.status == "dead")
+        if kind:
+            query = query.filter(Job.kind == kind)
+        count = query.update({
+            Job.status: "queued",
+            Job.attempts: 0,
+            Job.available_at: datetime.utcnow(),
+            Job.updated_at: datetime.utcnow(),
+        }, synchronize_session=False)
+        self.db.commit()
+        return count
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        """各类型任务的状态计数 {kind: {status: count}}"""
+        rows = self.db.query(Job.kind, Job.status, func.count(Job.id)).group_by(
+            Job.kind, Job.status
+        ).all()
+        result: Dict[str, Dict[str, int]] = {}
+        for kind, status, count in rows:
+            result.setdefault(kind, {})[status] = count
+        return result
+
+    def _reap_expired(self, kind: str, now: datetime):
+        """租约过期且已用完尝试次数的任务（worker 反复崩溃）直接进入死信"""
+        self.db.query(Job).filter(
+            Job.kind == kind,
+            Job.status == "leased",
+            Job.lease_expires_at <= now,
+            Job.attempts >= Job.max_attempts,
+        ).update({
+            Job.status: "dead",
+            Job.lease_owner: None,
+            Job.lease_expires_at: None,
+            Job.last_error: "lease expired",
+            Job.updated_at: now,
+        }, synchronize_session=False)
+
+
+def job_payload(job: Job) -> Optional[dict]:
+    """解析任务参数"""
+    return json.loads(job.payload) if job.payload else None
@@ -1,16 +1,34 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 from fastapi.staticfiles import StaticFiles
-from database import engine, Base, SessionLocal
+from database import SessionLocal, AsyncSessionLocal, async_engine, init_db
 from api.articles import router as articles_router
 from api.rss_sources import router as rss_router
 from api.batches import router as batches_router
+from api.jobs import router as jobs_router
+from api.backfill import router as backfill_router
+from api.analysis import router as analysis_router
+from api.feeds import router as feeds_router
+from api.events import router as events_router
+from api.stats import router as stats_router
+from api.views import router as views_router
 from rss_fetcher import RSSFetcher
+from events import get_event_bus, EventTailer
+from dispatcher import Dispatcher, dispatch_enabled
+import source_stats
+from view_counter import get_view_counter
+import profiling
+from settings import EMBEDDED_INGESTION, ASYNC_API, PROFILING_ENABLED
 from contextlib import asynccontextmanager
+import asyncio
 import os
 
-# 创建数据库表
-Base.metadata.create_all(bind=engine)
+# 创建数据库表（并为旧库补齐新增列）
+init_db()
+
+# SQL 耗时 / 慢查询钩子（全部关闭时不注册）
+profiling.install()
 
 
 @asynccontextmanager
@@ -19,24 +37,58 @@ async def lifespan(app: FastAPI):
     # 启动时
     print("🚀 Starting ArticleAggregator Backend...")
 
-    # 启动时执行一次RSS抓取
-    print("📥 启动时抓取RSS文章...")
+    # 事件推送：本进程内的抓取/提取直接发布，其他进程（worker、命令行）写入 events 表后由 tailer 发布
+    get_event_bus().attach(asyncio.get_running_loop())
+    event_tailer = EventTailer()
+    event_tailer.start()
+
+    # 旧库升级后第一次启动：从 articles 重算按源统计
     db = SessionLocal()
     try:
-        fetcher = RSSFetcher(db)
-        stats = fetcher.fetch_all_sources(max_articles_per_source=10)
-        print(f"✅ 启动抓取完成: 抓取 {stats['sources_fetched']} 个源, {stats['new_articles']} 篇新文章")
-    except Exception as e:
-        print(f"⚠️ 启动抓取失败: {e}")
+        source_stats.ensure_built(db)
     finally:
         db.close()
 
+    # 阅读数在内存中聚合，后台线程定期批量写入
+    view_counter = get_view_counter()
+    view_counter.start()
+
+    if EMBEDDED_INGESTION:
+        # 启动时执行一次RSS抓取
+        print("📥 启动时抓取RSS文章...")
+        db = SessionLocal()
+        try:
+            fetcher = RSSFetcher(db)
+            queued = fetcher.enqueue_pending_articles()
+            if queued:
+                print(f"📋 为 {queued} 篇待提取文章补建了提取任务")
+            stats = fetcher.fetch_all_sources()
+            print(f"✅ 启动抓取完成: 抓取 {stats['sources_fetched']} 个源, {stats['new_articles']} 篇新文章")
+        except Exception as e:
+            print(f"⚠️ 启动抓取失败: {e}")
+        finally:
+            db.close()
+    else:
+        print("📖 只读 API 模式：抓取与提取由独立 worker 进程（python -m worker）负责")
+
+    # 内嵌模式下配置了 Dify 工作流时，在 API 进程中运行分发线程
+    dispatcher = None
+    if EMBEDDED_INGESTION and dispatch_enabled():
+        dispatcher = Dispatcher()
+        dispatcher.start()
+
     print("✅ Backend started successfully!")
 
     yield
 
     # 关闭时
     print("🛑 Shutting down...")
+    event_tailer.stop()
+    view_counter.stop()
+    if dispatcher is not None:
+        dispatcher.stop(timeout=5)
+    if async_engine is not None:
+        await async_engine.dispose()
 
 
 # 创建 FastAPI 应用
@@ -56,6 +108,13 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# 大响应（批次文章列表、Markdown 正文）gzip 压缩
+app.add_middleware(GZipMiddleware, minimum_size=1024)
+
+# 按需剖析单个请求（X-Profile: 1 或 POST /api/profile/arm 预约）；未开启时不注册，没有任何开销
+if PROFILING_ENABLED:
+    app.middleware("http")(profiling.profile_request)
+
 # 健康检查接口
 @app.get("/api/health")
 def health_check():
@@ -66,9 +125,25 @@ def health_check():
     }
 
 # 注册路由
+if ASYNC_API and AsyncSessionLocal is not None:
+    # 异步读接口必须先注册，才能优先匹配同路径的同步路由；
+    # 接口契约与同步版本相同，文档中只展示同步版本，避免重复的 operationId
+    from api.async_reads import router as async_reads_router
+    app.include_router(async_reads_router, include_in_schema=False)
+
 app.include_router(articles_router, tags=["Articles"])
 app.include_router(rss_router, tags=["RSS Sources"])
 app.include_router(batches_router, tags=["Batches"])
+app.include_router(jobs_router, tags=["Jobs"])
+app.include_router(backfill_router, tags=["Backfill"])
+app.include_router(analysis_router, tags=["Analysis"])
+app.include_router(feeds_router, tags=["Feeds"])
+app.include_router(events_router, tags=["Events"])
+app.include_router(stats_router, tags=["Stats"])
+app.include_router(views_router, tags=["Views"])
+if PROFILING_ENABLED:
+    from api.profiling import router as profiling_router
+    app.include_router(profiling_router, tags=["Profiling"])
 
 # 挂载前端静态文件（必须在最后）
 frontend_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), "frontend")
@@ -1,5 +1,5 @@
-from sqlalchemy import Column, String, Integer, Text, DateTime, Boolean, ForeignKey
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, String, Integer, Float, Text, DateTime, Boolean, ForeignKey, UniqueConstraint, Index
+from sqlalchemy.orm import relationship, deferred, column_property
 from datetime import datetime
 from database import Base
 from pydantic import BaseModel
@@ -18,6 +18,16 @@ class RSSSource(Base):
     language = Column(String, default="zh_CN")  # 语言
     enabled = Column(Boolean, default=True)  # 是否启用
     last_fetched_at = Column(DateTime)  # 最后抓取时间
+    last_entry_id = Column(String)  # 高水位：上次处理到的最新条目 GUID/链接
+    last_entry_published_at = Column(DateTime)  # 高水位：上次处理到的最新条目发布时间（UTC）
+    # 健康状态
+    consecutive_failures = Column(Integer, default=0)  # 连续失败次数
+    last_error = Column(Text)  # 最近一次错误
+    last_success_at = Column(DateTime)  # 最近一次成功抓取时间
+    last_failure_at = Column(DateTime)  # 最近一次失败时间
+    avg_latency_ms = Column(Float)  # 抓取耗时（指数移动平均）
+    avg_entries_per_poll = Column(Float)  # 每次抓取的新条目数（指数移动平均）
+    quarantined_until = Column(DateTime, index=True)  # 隔离到期时间，到期后重新探测
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
@@ -29,22 +39,205 @@ class Article(Base):
     __tablename__ = "articles"
 
     id = Column(String, primary_key=True, index=True)  # 文章ID，基于URL的hash
-    source_id = Column(Integer, ForeignKey("rss_sources.id"))  # 所属RSS源
+    # source_stats 按这三列的新旧值维护计数：active_history 让提交 / 回滚后（实例已过期）再赋值时先加载旧值，
+    # 否则 flush 时拿不到旧值，旧行会被当作 pending、0 字计算
+    source_id = column_property(Column(Integer, ForeignKey("rss_sources.id")), active_history=True)  # 所属RSS源
     title = Column(String, nullable=False)
     author = Column(String)
     url = Column(String, unique=True, nullable=False, index=True)  # 原文链接（用于去重）
-    summary = Column(Text)  # 摘要
-    markdown_content = Column(Text)  # Markdown 格式文章内容（可能为空，需要全文提取）
-    published_at = Column(DateTime)  # 发布时间
+    # 大字段默认延迟加载：列表等接口只查询需要的列，访问时才单独加载
+    summary = deferred(Column(Text))  # 摘要
+    markdown_content = deferred(Column(Text))  # Markdown 格式文章内容（可能为空，需要全文提取）
+    published_at = Column(DateTime)  # 发布时间（UTC）；feed 未提供时为空
+    entry_updated_at = Column(DateTime)  # feed 条目的更新时间（UTC）
+    guid = Column(String, index=True)  # feed 条目的 GUID / Atom id（与链接一起判断条目是否处理过）
     category = Column(String)  # 分类
     language = Column(String, default="zh_CN")
-    fetch_status = Column(String, default="pending")  # pending, fetched, failed
-    created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    fetch_status = column_property(Column(String, default="pending", index=True), active_history=True)  # pending, fetched, failed
+    content_hash = Column(String, index=True)  # 下载页面的 sha256（相同页面内容的文章共享）
+    # 正文指标（全文提取时计算，用于按长度/语言筛选而无需读取正文）
+    word_count = column_property(Column(Integer, index=True), active_history=True)  # 字数：中日韩按字、其他按词
+    char_count = Column(Integer)  # 非空白字符数
+    token_estimate = Column(Integer, index=True)  # 估算 token 数
+    reading_time_minutes = Column(Integer)  # 估算阅读时长
+    content_language = Column(String, index=True)  # 根据正文判断的语言（zh_CN / en_US / ja_JP / ko_KR）
+    archive_month = Column(String)  # 正文已移入的归档库月份（YYYY-MM），为空表示在热表中
+    archived_at = Column(DateTime, index=True)
+    created_at = Column(DateTime, default=datetime.utcnow, index=True)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, index=True)  # 增量导出水位
 
     # 关系
     source = relationship("RSSSource", back_populates="articles")
 
+
+class Job(Base):
+    """持久化任务队列（全文提取等后台任务）"""
+    __tablename__ = "jobs"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    kind = Column(String, nullable=False)  # 任务类型：extract, ...
+    key = Column(String, nullable=False)  # 业务键（如文章ID），与 kind 一起去重
+    payload = Column(Text)  # JSON 参数
+    priority = Column(Integer, default=0)  # 优先级，越大越先处理
+    order_key = Column(Integer, default=0)  # 同优先级内的排序键，越大越先（如发布时间戳，实现新文章优先）
+    status = Column(String, default="queued")  # queued, leased, done, dead
+    attempts = Column(Integer, default=0)  # 已尝试次数
+    max_attempts = Column(Integer, default=5)  # 超过后进入死信
+    available_at = Column(DateTime, default=datetime.utcnow)  # 最早可领取时间（用于退避）
+    lease_owner = Column(String)  # 当前租约持有者
+    lease_expires_at = Column(DateTime)  # 租约到期时间（可见性超时）
+    last_error = Column(Text)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    __table_args__ = (
+        UniqueConstraint("kind", "key", name="uq_jobs_kind_key"),
+        Index("ix_jobs_ready", "kind", "status", "priority", "order_key"),
+    )
+
+
+class ExtractionCacheEntry(Base):
+    """全文提取缓存：相同页面内容 + 相同提取参数只提取一次"""
+    __tablename__ = "extraction_cache"
+
+    cache_key = Column(String, primary_key=True)  # content_hash:options_hash
+    content_hash = Column(String, nullable=False, index=True)  # 页面内容 sha256
+    options_hash = Column(String, nullable=False)  # 提取参数（含 trafilatura 版本）的 hash
+    markdown = Column(Text)  # 提取结果；空字符串表示该页面提取不到正文
+    size = Column(Integer, default=0)  # 结果字节数（用于容量淘汰）
+    created_at = Column(DateTime, default=datetime.utcnow)
+    last_used_at = Column(DateTime, default=datetime.utcnow, index=True)
+
+
+class RawPage(Base):
+    """原始页面存储索引：页面内容按 sha256 存放在 data/pages/ 下的追加式 pack 文件中"""
+    __tablename__ = "raw_pages"
+
+    content_hash = Column(String, primary_key=True)  # 页面内容 sha256（与 Article.content_hash 对应）
+    pack = Column(String, nullable=False, index=True)  # pack 文件名
+    offset = Column(Integer, nullable=False)  # 在 pack 中的偏移
+    length = Column(Integer, nullable=False)  # 压缩后长度
+    size = Column(Integer, nullable=False)  # 原始长度
+    url = Column(String)  # 首次下载该内容的地址
+    created_at = Column(DateTime, default=datetime.utcnow, index=True)
+
+
+class BackfillRun(Base):
+    """回填任务进度（断点续跑）"""
+    __tablename__ = "backfill_runs"
+
+    name = Column(String, primary_key=True)  # 回填任务名，同名任务从断点继续
+    mode = Column(String, nullable=False)  # extract（重新提取全文）/ summary（重新清洗摘要）
+    filters = Column(Text)  # JSON 过滤条件
+    status = Column(String, default="running")  # running, paused, done, failed
+    last_key = Column(String)  # 键集分页的断点（已处理的最后一个文章ID）
+    scanned = Column(Integer, default=0)  # 已扫描文章数
+    processed = Column(Integer, default=0)  # 已入队 / 已处理文章数
+    last_error = Column(Text)
+    heartbeat_at = Column(DateTime)  # 运行中的进程定期更新；过期的 running 任务可以被接管
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
+class ArticleAnalysis(Base):
+    """Dify 初评 / 分析 / 翻译工作流的结果（每篇文章一行）"""
+    __tablename__ = "article_analyses"
+
+    article_id = Column(String, ForeignKey("articles.id", ondelete="CASCADE"), primary_key=True)
+    filter_score = Column(Integer)  # 初评流程评分
+    score = Column(Integer)  # 分析流程最终评分（0-100）
+    one_sentence_summary = Column(Text)
+    summary = Column(Text)
+    domain = Column(String)  # 领域分类（软件编程、人工智能、产品设计、商业科技）
+    ai_subcategory = Column(String)
+    tags = Column(Text)  # JSON 数组
+    main_points = Column(Text)  # JSON 数组 [{"point", "explanation"}]
+    key_quotes = Column(Text)  # JSON 数组
+    translations = Column(Text)  # JSON 对象 {语言: 翻译后的分析结果}
+    language = Column(String)  # 分析结果语言
+    featured = Column(Boolean, default=False)  # 是否精选
+    workflow_run_id = Column(String)  # Dify 工作流运行ID
+    published_at = Column(DateTime)  # 冗余文章发布时间，用于按日期 + 评分的索引查询
+    analyzed_at = Column(DateTime, default=datetime.utcnow)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    article = relationship("Article")
+
+    __table_args__ = (
+        Index("ix_analysis_published_score", "published_at", "score"),
+        Index("ix_analysis_domain_published_score", "domain", "published_at", "score"),
+        Index("ix_analysis_score", "score"),
+        Index("ix_analysis_analyzed_at", "analyzed_at"),
+    )
+
+
+class Event(Base):
+    """入库事件（独立 worker 模式下由 worker 写入，API 进程轮询后推送给 SSE 客户端）"""
+    __tablename__ = "events"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)  # 即 SSE 的事件ID
+    type = Column(String, nullable=False)  # article.created, article.extracted
+    payload = Column(Text)  # JSON 数据
+    created_at = Column(DateTime, default=datetime.utcnow, index=True)
+
+
+class SourceDailyStats(Base):
+    """每个源每天入库文章的状态计数（按文章入库日期分桶，随入库、提取、状态变化增量更新）"""
+    __tablename__ = "source_daily_stats"
+
+    source_id = Column(Integer, primary_key=True)  # 0 表示手动创建、不属于任何源的文章
+    day = Column(String, primary_key=True)  # YYYY-MM-DD（UTC）
+    total = Column(Integer, default=0)
+    pending = Column(Integer, default=0)
+    fetched = Column(Integer, default=0)
+    failed = Column(Integer, default=0)
+    featured = Column(Integer, default=0)
+    word_count = Column(Integer, default=0)
+
+    __table_args__ = (
+        Index("ix_source_daily_stats_day", "day"),
+    )
+
+
+class SourceStats(Base):
+    """每个源的累计状态计数（与 SourceDailyStats 同步更新，查询总量时无需扫描 articles）"""
+    __tablename__ = "source_stats"
+
+    source_id = Column(Integer, primary_key=True)
+    total = Column(Integer, default=0)
+    pending = Column(Integer, default=0)
+    fetched = Column(Integer, default=0)
+    failed = Column(Integer, default=0)
+    featured = Column(Integer, default=0)
+    word_count = Column(Integer, default=0)
+    views = Column(Integer, default=0)  # 累计阅读数（由 view_counter 批量写入）
+
+
+class ArticleViews(Base):
+    """文章累计阅读数（view_counter 在内存中聚合后批量写入）"""
+    __tablename__ = "article_views"
+
+    article_id = Column(String, ForeignKey("articles.id", ondelete="CASCADE"), primary_key=True)
+    source_id = Column(Integer)  # 冗余，按源汇总时无需联表
+    views = Column(Integer, default=0, index=True)
+    last_viewed_at = Column(DateTime)
+
+
+class ArticleViewDaily(Base):
+    """文章每天的阅读数（按阅读日期分桶，用于近 N 天的热门 / 按源阅读数）"""
+    __tablename__ = "article_view_daily"
+
+    article_id = Column(String, primary_key=True)
+    day = Column(String, primary_key=True)  # YYYY-MM-DD（UTC）
+    source_id = Column(Integer)
+    views = Column(Integer, default=0)
+
+    __table_args__ = (
+        Index("ix_article_view_daily_day_source", "day", "source_id"),
+    )
+
+
 # Pydantic 模型（用于 API 请求/响应）
 class ArticleCreate(BaseModel):
     id: str
@@ -63,6 +256,11 @@ class ArticleResponse(BaseModel):
     category: Optional[str]
     language: str
     created_at: datetime
+    word_count: Optional[int] = None
+    char_count: Optional[int] = None
+    token_estimate: Optional[int] = None
+    reading_time_minutes: Optional[int] = None
+    content_language: Optional[str] = None
 
     class Config:
         from_attributes = True
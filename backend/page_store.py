@@ -0,0 +1,208 @@
+"""
+原始页面存储
+负责：按内容寻址保存下载的 HTML（zlib 压缩、追加写入 pack 文件），通过内存映射读取
+
+存储布局：
+    data/pages/pack-<创建时间>-<进程号>.pack   只追加的数据文件，每个进程写自己的 pack，无需跨进程加锁
+    raw_pages 表                                content_hash -> (pack, offset, length) 索引
+
+相同内容只存一份。总大小超过上限时，从最旧的 pack 开始整体删除（连同索引）。
+"""
+
+import logging
+import mmap
+import os
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from datetime import datetime
+from typing import Optional, Dict
+
+from sqlalchemy import func
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+
+from database import DB_DIR
+from models import RawPage
+
+logger = logging.getLogger(__name__)
+
+PAGES_DIR = os.path.join(DB_DIR, "pages")
+PACK_MAX_BYTES = 256 * 1024 * 1024  # 单个 pack 文件写满后切换新文件
+MAX_OPEN_MAPS = 32  # 同时保持映射的 pack 数量
+COMPRESS_LEVEL = 6
+ACTIVE_PACK_SECONDS = 3600  # 最近一小时内写过的 pack 视为活跃，不淘汰
+
+
+class PageStore:
+    """内容寻址的原始页面存储（进程内单例，线程安全）"""
+
+    def __init__(self, root: str = PAGES_DIR, max_bytes: int = None):
+        self.root = root
+        self.max_bytes = max_bytes
+        os.makedirs(self.root, exist_ok=True)
+
+        self._write_lock = threading.Lock()
+        self._pack_name: Optional[str] = None
+        self._pack_file = None
+
+        self._map_lock = threading.Lock()
+        self._maps: "OrderedDict[str, mmap.mmap]" = OrderedDict()
+
+    # ========== 写入 ==========
+
+    def put(self, db: Session, content_hash: str, body: bytes, url: str = None) -> bool:
+        """
+        保存页面（已存在则跳过），索引写入 db 但不提交事务
+
+        Returns:
+            是否新写入
+        """
+        if db.get(RawPage, content_hash) is not None:
+            return False
+
+        compressed = zlib.compress(body, COMPRESS_LEVEL)
+        with self._write_lock:
+            pack_file = self._writable_pack(len(compressed))
+            offset = pack_file.tell()
+            pack_file.write(compressed)
+            pack_file.flush()
+            pack_name = self._pack_name
+
+        # 并发写入相同内容时以先写入的为准，多写的字节只占用 pack 空间
+        db.execute(sqlite_insert(RawPage).values(
+            content_hash=content_hash,
+            pack=pack_name,
+            offset=offset,
+            length=len(compressed),
+            size=len(body),
+            url=url,
+            created_at=datetime.utcnow()
+        ).on_conflict_do_nothing(index_elements=["content_hash"]))
+        return True
+
+    def _writable_pack(self, incoming: int):
+        """当前进程的 pack 文件，写满后切换"""
+        if self._pack_file is not None and self._pack_file.tell() + incoming > PACK_MAX_BYTES:
+            self._pack_file.close()
+            self._pack_file = None
+
+        if self._pack_file is None:
+            self._pack_name = f"pack-{datetime.utcnow():%Y%m%d%H%M%S}-{os.getpid()}.pack"
+            self._pack_file = open(os.path.join(self.root, self._pack_name), "ab")
+
+        return self._pack_file
+
+    # ========== 读取 ==========
+
+    def get(self, db: Session, content_hash: str) -> Optional[bytes]:
+        """按内容 hash 读取页面，不存在时返回 None"""
+        page = db.get(RawPage, content_hash)
+        if page is None:
+            return None
+        return self.read(page.pack, page.offset, page.length)
+
+    def read(self, pack: str, offset: int, length: int) -> bytes:
+        """通过内存映射读取并解压一条记录"""
+        # 在锁内复制出压缩数据：映射可能被其他线程关闭（重新映射、LRU 淘汰、evict），锁外只做解压
+        with self._map_lock:
+            data = self._map(pack, offset + length)[offset:offset + length]
+        return zlib.decompress(data)
+
+    def _map(self, pack: str, needed: int) -> mmap.mmap:
+        """获取 pack 的内存映射；pack 仍在追加时按需重新映射（调用方持有 _map_lock）"""
+        view = self._maps.get(pack)
+        if view is not None and len(view) >= needed:
+            self._maps.move_to_end(pack)
+            return view
+
+        if view is not None:
+            view.close()
+
+        with open(os.path.join(self.root, pack), "rb") as f:
+            view = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._maps[pack] = view
+        self._maps.move_to_end(pack)
+
+        while len(self._maps) > MAX_OPEN_MAPS:
+            _, oldest = self._maps.popitem(last=False)
+            oldest.close()
+
+        return view
+
+    # ========== 容量管理 ==========
+
+    def usage(self, db: Session) -> Dict[str, int]:
+        """存储统计"""
+        pages, stored, original = db.query(
+            func.count(RawPage.content_hash),
+            func.coalesce(func.sum(RawPage.length), 0),
+            func.coalesce(func.sum(RawPage.size), 0)
+        ).one()
+        return {"pages": pages, "stored_bytes": stored, "original_bytes": original}
+
+    def evict(self, db: Session) -> int:
+        """
+        超过容量上限时从最旧的 pack 开始整体删除（当前正在写入的 pack 除外）
+
+        Returns:
+            删除的 pack 数量
+        """
+        if not self.max_bytes:
+            return 0
+
+        packs = db.query(
+            RawPage.pack, func.sum(RawPage.length), func.min(RawPage.created_at)
+        ).group_by(RawPage.pack).order_by(func.min(RawPage.created_at)).all()
+
+        total = sum(size or 0 for _, size, _ in packs)
+        removed = 0
+        for pack, size, _ in packs:
+            if total <= self.max_bytes:
+                break
+            if pack == self._pack_name or self._recently_written(pack):
+                continue  # 可能仍在被某个进程追加
+
+            db.query(RawPage).filter(RawPage.pack == pack).delete(synchronize_session=False)
+            db.commit()
+
+            with self._map_lock:
+                view = self._maps.pop(pack, None)
+                if view is not None:
+                    view.close()
+            try:
+                os.remove(os.path.join(self.root, pack))
+            except OSError as e:
+                logger.warning(f"Failed to remove pack {pack}: {e}")
+
+            total -= size or 0
+            removed += 1
+            logger.info(f"🗑️ Evicted page pack {pack}")
+
+        return removed
+
+
+    def _recently_written(self, pack: str) -> bool:
+        try:
+            return os.path.getmtime(os.path.join(self.root, pack)) > time.time() - ACTIVE_PACK_SECONDS
+        except OSError:
+            return False
+
+
+_store: Optional[PageStore] = None
+_store_lock = threading.Lock()
+
+
+def get_page_store() -> Optional[PageStore]:
+    """获取进程内共享的页面存储；未启用（ARTICLE_PAGE_STORE=0）时返回 None"""
+    from settings import PAGE_STORE_ENABLED, PAGE_STORE_MAX_BYTES
+
+    global _store
+    if not PAGE_STORE_ENABLED:
+        return None
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = PageStore(max_bytes=PAGE_STORE_MAX_BYTES)
+    return _store
@@ -0,0 +1,305 @@
+"""
+性能剖析
+负责：按需对单个 API 请求、单次抓取 / 提取运行做采样剖析，统计 SQL 语句耗时、疑似 N+1 查询与慢查询
+
+全部功能默认关闭，关闭时不注册中间件、不挂 SQL 事件钩子，@profiled_run 只多一次集合判断：
+- ARTICLE_PROFILING=1 开启剖析入口：
+  * 请求带 `X-Profile: 1` 头时剖析该请求，响应头 X-Profile-Id 给出输出文件名；
+  * POST /api/profile/arm?target=fetch_all_sources（或 extract_batch_content、请求路径 /api/batches）
+    预约下一次运行 / 请求（预约记录是 data/profiles/armed/ 下的文件，独立 worker 进程同样生效）；
+  * ARTICLE_PROFILE_RUNS=fetch_all_sources,extract_batch_content 让这些运行每次都剖析；
+- ARTICLE_SQL_LOG=1 记录每条语句及耗时；ARTICLE_SLOW_QUERY_MS>0 把超过阈值的语句写入慢查询日志。
+
+采样器是一个后台线程，每 ARTICLE_PROFILE_SAMPLE_MS 毫秒读取一次所有线程的调用栈（sys._current_frames），
+输出 folded stacks（`线程;文件:函数;... 次数`），可直接交给 flamegraph.pl、speedscope 或 inferno 生成火焰图。
+采样的是全部线程，同时进行的其他请求也会出现在结果中，按第一层（线程名）区分；
+SQL 统计则只计入本次请求 / 运行（contextvar，运行内的线程池用 in_current_context 传递）。
+流式响应（StreamingResponse / SSE）在响应体发送完毕后才结束剖析，SSE 连接会一直剖析到客户端断开。
+
+输出（data/profiles/）:
+    <时间>-<名称>.folded       采样结果
+    <时间>-<名称>.sql.txt      本次请求 / 运行的 SQL 统计（按语句汇总次数与耗时，疑似 N+1 标出）
+    slow_queries.log           慢查询日志
+"""
+
+import contextvars
+import functools
+import logging
+import os
+import re
+import sys
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import event as sa_event
+
+from database import DB_DIR, async_engine, engine
+import settings
+
+logger = logging.getLogger(__name__)
+
+PROFILE_DIR = os.path.join(DB_DIR, "profiles")
+ARMED_DIR = os.path.join(PROFILE_DIR, "armed")
+PROFILE_HEADER = "x-profile"
+MAX_STACK_DEPTH = 128
+STATEMENT_PREVIEW = 500
+
+_UNSAFE_NAME = re.compile(r"[^\w.-]+")
+
+slow_logger = logging.getLogger("sql.slow")
+
+# 当前请求的 SQL 统计（contextvar 会随 run_in_threadpool 传到同步路由的线程中）
+_request_scope: contextvars.ContextVar = contextvars.ContextVar("sql_scope", default=None)
+# 当前剖析中的运行（运行内自建的线程池需要用 in_current_context 包装任务，否则不会计入）
+_run_scope: contextvars.ContextVar = contextvars.ContextVar("run_scope", default=None)
+
+
+def _safe_name(name: str) -> str:
+    return _UNSAFE_NAME.sub("_", name).strip("_") or "root"
+
+
+class SamplingProfiler:
+    """定时采样所有线程的调用栈，按 folded stacks 汇总"""
+
+    def __init__(self, interval: float = None):
+        self.interval = interval if interval is not None else settings.PROFILE_SAMPLE_MS / 1000
+        self.samples: Dict[str, int] = defaultdict(int)
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def _run(self):
+        own_id = threading.get_ident()
+        while not self._stop_event.wait(self.interval):
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                self.samples[self._fold(names.get(thread_id, str(thread_id)), frame)] += 1
+
+    @staticmethod
+    def _fold(thread_name: str, frame) -> str:
+        stack = []
+        while frame is not None and len(stack) < MAX_STACK_DEPTH:
+            code = frame.f_code
+            stack.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+            frame = frame.f_back
+        stack.append(thread_name.replace(";", "_"))
+        return ";".join(reversed(stack))
+
+    def write(self, path: str):
+        with open(path, "w", encoding="utf-8") as f:
+            for stack, count in sorted(self.samples.items()):
+                f.write(f"{stack} {count}\n")
+
+
+class QueryScope:
+    """一次请求 / 运行内的 SQL 统计"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.statements: Dict[str, List[float]] = defaultdict(lambda: [0, 0.0])  # 语句 -> [次数, 总耗时 ms]
+        self._lock = threading.Lock()
+
+    def record(self, statement: str, elapsed_ms: float):
+        with self._lock:
+            entry = self.statements[statement]
+            entry[0] += 1
+            entry[1] += elapsed_ms
+            count = entry[0]
+        if count == settings.N_PLUS_ONE_THRESHOLD:
+            logger.warning(f"⚠️ Possible N+1 in {self.name}: statement executed {count}+ times: "
+                           f"{statement[:200]}")
+
+    @property
+    def total(self) -> Tuple[int, float]:
+        return (sum(int(count) for count, _ in self.statements.values()),
+                sum(elapsed for _, elapsed in self.statements.values()))
+
+    def write(self, path: str):
+        queries, elapsed = self.total
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(f"# {self.name}: {queries} statements, {elapsed:.1f} ms\n")
+            f.write("# count\ttotal_ms\tavg_ms\tstatement\n")
+            for statement, (count, total) in sorted(self.statements.items(), key=lambda item: -item[1][1]):
+                flag = " [N+1?]" if count >= settings.N_PLUS_ONE_THRESHOLD else ""
+                preview = " ".join(statement.split())[:STATEMENT_PREVIEW]
+                f.write(f"{int(count)}\t{total:.2f}\t{total / count:.2f}\t{preview}{flag}\n")
+
+
+# ========== SQL 钩子 ==========
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    # 开始时间记在本条语句的执行上下文上：语句抛出异常时不会留下未弹出的记录
+    if context is not None:
+        context._profile_started = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = getattr(context, "_profile_started", None)
+    if started is None:
+        return
+    elapsed_ms = (time.perf_counter() - started) * 1000
+
+    scope = _request_scope.get() or _run_scope.get()
+    if scope is not None:
+        scope.record(statement, elapsed_ms)
+    if settings.SQL_LOG:
+        logger.info(f"SQL {elapsed_ms:.1f} ms: {' '.join(statement.split())[:STATEMENT_PREVIEW]}")
+    if 0 < settings.SLOW_QUERY_MS <= elapsed_ms:
+        slow_logger.warning(f"{elapsed_ms:.1f} ms\t{' '.join(statement.split())}\t{str(parameters)[:STATEMENT_PREVIEW]}")
+
+
+def install():
+    """按配置注册 SQL 钩子（进程启动时调用一次；全部关闭时什么都不做）"""
+    if not (settings.PROFILING_ENABLED or settings.SQL_LOG or settings.SLOW_QUERY_MS > 0):
+        return
+
+    engines = [engine] + ([async_engine.sync_engine] if async_engine is not None else [])
+    for target in engines:
+        if not sa_event.contains(target, "before_cursor_execute", _before_cursor_execute):
+            sa_event.listen(target, "before_cursor_execute", _before_cursor_execute)
+            sa_event.listen(target, "after_cursor_execute", _after_cursor_execute)
+
+    if settings.SLOW_QUERY_MS > 0 and not slow_logger.handlers:
+        os.makedirs(PROFILE_DIR, exist_ok=True)
+        handler = logging.FileHandler(os.path.join(PROFILE_DIR, "slow_queries.log"), encoding="utf-8")
+        handler.setFormatter(logging.Formatter("%(asctime)s\t%(message)s"))
+        slow_logger.addHandler(handler)
+
+
+# ========== 触发方式 ==========
+
+def arm(target: str):
+    """预约剖析下一次运行（fetch_all_sources / extract_batch_content）或下一个访问该路径的请求"""
+    os.makedirs(ARMED_DIR, exist_ok=True)
+    open(os.path.join(ARMED_DIR, _safe_name(target)), "w").close()
+
+
+def _take_armed(target: str) -> bool:
+    """预约存在时取走（多个进程同时检查时只有一个能取到）"""
+    try:
+        os.remove(os.path.join(ARMED_DIR, _safe_name(target)))
+        return True
+    except FileNotFoundError:
+        return False
+
+
+def list_outputs(limit: int = 50) -> List[dict]:
+    """最近的剖析输出文件"""
+    if not os.path.isdir(PROFILE_DIR):
+        return []
+    entries = [entry for entry in os.scandir(PROFILE_DIR) if entry.is_file()]
+    entries.sort(key=lambda entry: entry.stat().st_mtime, reverse=True)
+    return [{
+        "name": entry.name,
+        "size": entry.stat().st_size,
+        "modified_at": datetime.utcfromtimestamp(entry.stat().st_mtime).isoformat(),
+    } for entry in entries[:limit]]
+
+
+def in_current_context(func):
+    """
+    包装交给线程池执行的任务，使其在提交时的 contextvars 上下文（的副本）中运行
+
+    剖析中的运行在线程池里执行的 SQL 因此仍计入该运行，同时进行的其他请求 / 运行不会混入。
+    """
+    context = contextvars.copy_context()
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        return context.copy().run(func, *args, **kwargs)
+    return wrapper
+
+
+class _Session:
+    """一次剖析：采样器 + SQL 统计，结束时写出结果"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.profile_id = f"{datetime.utcnow().strftime('%Y%m%dT%H%M%S%f')}-{_safe_name(name)}"
+        self.profiler = SamplingProfiler()
+        self.scope = QueryScope(name)
+        self.started = time.perf_counter()
+
+    def start(self):
+        self.profiler.start()
+
+    def finish(self):
+        self.profiler.stop()
+        os.makedirs(PROFILE_DIR, exist_ok=True)
+        base = os.path.join(PROFILE_DIR, self.profile_id)
+        self.profiler.write(base + ".folded")
+        self.scope.write(base + ".sql.txt")
+        queries, elapsed = self.scope.total
+        logger.info(f"🔬 Profiled {self.name} in {(time.perf_counter() - self.started) * 1000:.0f} ms "
+                    f"({queries} SQL statements, {elapsed:.0f} ms): {base}.folded")
+
+
+def profiled_run(name: str):
+    """
+    装饰抓取 / 提取等批量运行：配置为每次剖析或已预约时才剖析
+
+    未开启 ARTICLE_PROFILING 时直接调用原函数。
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not settings.PROFILING_ENABLED or _run_scope.get() is not None:
+                return func(*args, **kwargs)
+            if name not in settings.PROFILE_RUNS and not _take_armed(name):
+                return func(*args, **kwargs)
+
+            session = _Session(name)
+            token = _run_scope.set(session.scope)
+            session.start()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                _run_scope.reset(token)
+                session.finish()
+        return wrapper
+    return decorator
+
+
+async def profile_request(request, call_next):
+    """HTTP 中间件（只在开启 ARTICLE_PROFILING 时注册）"""
+    path = request.url.path
+    if request.headers.get(PROFILE_HEADER) != "1" and not _take_armed(path):
+        return await call_next(request)
+
+    session = _Session(f"{request.method} {path}")
+    token = _request_scope.set(session.scope)
+    session.start()
+    try:
+        response = await call_next(request)
+    except BaseException:
+        session.finish()
+        raise
+    finally:
+        _request_scope.reset(token)
+
+    # 响应体（StreamingResponse / SSE 的生成器）在返回之后才产生：发送完毕再结束剖析
+    body_iterator = response.body_iterator
+
+    async def profiled_body():
+        try:
+            async for chunk in body_iterator:
+                yield chunk
+        finally:
+            session.finish()
+
+    response.body_iterator = profiled_body()
+    response.headers["X-Profile-Id"] = session.profile_id
+    return response
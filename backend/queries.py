@@ -0,0 +1,159 @@
+"""
+读接口共用的查询语句与结果转换
+
+同步路由（api/articles.py、api/batches.py）与异步路由（api/async_reads.py）
+使用同一组语句，只在执行方式上不同（db.execute / await db.execute）。
+"""
+
+from datetime import datetime, timedelta
+from typing import List, Optional
+
+from sqlalchemy import select, func, desc
+
+from models import Article
+
+
+def article_markdown_stmt(article_id: str):
+    """单篇文章的正文与摘要（正文缺失时降级为摘要；已归档的文章需要再读归档库）"""
+    return select(Article.markdown_content, Article.summary, Article.archive_month).where(Article.id == article_id)
+
+
+def markdown_content(row) -> str:
+    """把 article_markdown_stmt 的结果行转换为返回的 Markdown 内容"""
+    return row.markdown_content or row.summary or ""
+
+
+# ArticleResponse 序列化的列（不含正文与摘要）
+ARTICLE_RESPONSE_COLUMNS = (
+    Article.id,
+    Article.title,
+    Article.author,
+    Article.url,
+    Article.category,
+    Article.language,
+    Article.created_at,
+    Article.word_count,
+    Article.char_count,
+    Article.token_estimate,
+    Article.reading_time_minutes,
+    Article.content_language,
+)
+
+# ArticleBrief 序列化的列（不含正文）
+ARTICLE_BRIEF_COLUMNS = (
+    Article.id,
+    Article.title,
+    Article.summary,
+    Article.author,
+    Article.url,
+    Article.published_at,
+    Article.created_at,
+)
+
+
+def article_responses(rows) -> List[dict]:
+    """文章行（ARTICLE_RESPONSE_COLUMNS）-> ArticleResponse 字段（JSON 原生类型）"""
+    return [article_response(row) for row in rows]
+
+
+def article_response(row) -> dict:
+    return {
+        "id": row.id,
+        "title": row.title,
+        "author": row.author,
+        "url": row.url,
+        "category": row.category,
+        "language": row.language,
+        "created_at": row.created_at.isoformat() if row.created_at else None,
+        "word_count": row.word_count,
+        "char_count": row.char_count,
+        "token_estimate": row.token_estimate,
+        "reading_time_minutes": row.reading_time_minutes,
+        "content_language": row.content_language,
+    }
+
+
+def list_articles_stmt(skip: int, limit: int, category: Optional[str] = None,
+                       content_language: Optional[str] = None,
+                       min_words: Optional[int] = None, max_words: Optional[int] = None,
+                       min_tokens: Optional[int] = None, max_tokens: Optional[int] = None):
+    """文章列表（只查询 ArticleResponse 需要的列），长度与语言条件走 articles 上的索引"""
+    stmt = select(*ARTICLE_RESPONSE_COLUMNS)
+    if category:
+        stmt = stmt.where(Article.category == category)
+    if content_language:
+        stmt = stmt.where(Article.content_language == content_language)
+    if min_words is not None:
+        stmt = stmt.where(Article.word_count >= min_words)
+    if max_words is not None:
+        stmt = stmt.where(Article.word_count <= max_words)
+    if min_tokens is not None:
+        stmt = stmt.where(Article.token_estimate >= min_tokens)
+    if max_tokens is not None:
+        stmt = stmt.where(Article.token_estimate <= max_tokens)
+    return stmt.offset(skip).limit(limit)
+
+
+def article_stmt(article_id: str):
+    """单篇文章（只查询 ArticleResponse 需要的列）"""
+    return select(*ARTICLE_RESPONSE_COLUMNS).where(Article.id == article_id)
+
+
+def batches_stmt():
+    """按创建日期分组的批次统计"""
+    return select(
+        func.date(Article.created_at).label('batch_date'),
+        func.count(Article.id).label('article_count'),
+        func.min(Article.created_at).label('first_article_time')
+    ).group_by(
+        func.date(Article.created_at)
+    ).order_by(
+        desc(func.date(Article.created_at))
+    )
+
+
+def batch_infos(rows) -> List[dict]:
+    """批次统计行 -> BatchInfo 字段"""
+    return [
+        {
+            "batch_id": idx,
+            "batch_date": str(batch_date),
+            "article_count": article_count,
+            "first_article_time": first_time.isoformat() if first_time else ""
+        }
+        for idx, (batch_date, article_count, first_time) in enumerate(rows, 1)
+    ]
+
+
+def batch_articles_stmt(batch_date: str):
+    """
+    指定日期创建的文章（只查询 ArticleBrief 需要的列）
+
+    用 created_at 的区间条件代替 date(created_at) = ?，可以走 created_at 索引。
+
+    Raises:
+        ValueError: batch_date 不是 YYYY-MM-DD 格式
+    """
+    day_start = datetime.strptime(batch_date, "%Y-%m-%d")
+    return select(*ARTICLE_BRIEF_COLUMNS).where(
+        Article.created_at >= day_start,
+        Article.created_at < day_start + timedelta(days=1)
+    ).order_by(
+        desc(Article.created_at)
+    )
+
+
+def article_briefs(articles) -> List[dict]:
+    """文章行（ARTICLE_BRIEF_COLUMNS）-> ArticleBrief 字段"""
+    return [
+        {
+            "id": article.id,
+            "title": article.title,
+            "summary": article.summary or "暂无摘要",
+            "author": article.author,
+            "url": article.url,
+            "published_at": article.published_at.isoformat() if article.published_at else None,
+            "created_at": article.created_at.isoformat()
+        }
+        for article in articles
+    ]
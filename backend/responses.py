@@ -0,0 +1,16 @@
+"""
+高吞吐接口的响应类
+
+列表类接口直接把查询行转换为 JSON 原生类型（字符串/数字）的 dict，
+再用 orjson 序列化，跳过 Pydantic 模型的构建与二次校验。
+路由上仍声明 response_model，用于生成接口文档。
+"""
+
+try:
+    import orjson  # noqa: F401
+    from fastapi.responses import ORJSONResponse as FastJSONResponse
+except ImportError:
+    # 未安装 orjson 时退回标准库 json（同样跳过模型校验）
+    from fastapi.responses import JSONResponse as FastJSONResponse
+
+__all__ = ["FastJSONResponse"]
@@ -6,116 +6,175 @@ RSS 抓取模块
 import feedparser
 import trafilatura
 import hashlib
-import requests
 from sqlalchemy.orm import Session
-from models import RSSSource, Article
-from datetime import datetime
-from dateutil import parser as date_parser
-from typing import List, Dict
+from models import RSSSource, Article, Job
+from database import SessionLocal
+from http_client import get_http_client, feed_response_headers
+from feed_stream import iter_feed_entries
+from entry_normalizer import NormalizedEntry, normalize_entry, utc_timestamp
+from job_queue import JobQueue, job_payload
+import source_health
+import source_stats  # noqa: F401  注册按源统计的 after_flush 钩子
+import events
+import dispatcher
+import extraction_cache
+import profiling
+from page_store import get_page_store
+from text_metrics import apply_metrics
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import List, Dict, Optional, Iterator
 import logging
 import time
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+EXTRACT_JOB = "extract"  # 全文提取任务类型
+FETCH_JOB = "fetch"  # 手动触发的抓取任务类型（由独立 worker 领取）
+
+FEED_ACCEPT = "application/rss+xml, application/atom+xml, application/xml;q=0.9, */*;q=0.8"
+MAX_FEED_SIZE = 5 * 1024 * 1024  # 单个 feed 最大 5MB
+SEEN_RUN_TO_STOP = 3  # 连续遇到多少个早于高水位的条目后停止读取
+STOP_HINT_MARGIN = timedelta(days=1)  # 发布时间早于“高水位 - 该值”的条目才视为停止读取的信号
+
+# trafilatura 全文提取参数（修改后缓存自动失效）
+EXTRACTION_OPTIONS = {
+    "output_format": "markdown",
+    "include_links": True,
+    "include_images": True,
+    "include_tables": True,
+}
+EXTRACTION_OPTIONS_HASH = extraction_cache.options_hash(EXTRACTION_OPTIONS)
+
+
+class ExtractionError(Exception):
+    """全文提取失败"""
+
 
 class RSSFetcher:
     """RSS 抓取器"""
 
     def __init__(self, db: Session):
         self.db = db
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'ArticleAggregator/1.0 (RSS Reader)'
-        })
+        self.http = get_http_client()  # 进程内共享的连接池
 
-    def fetch_all_sources(self, max_articles_per_source: int = 5) -> Dict[str, int]:
+    @profiling.profiled_run("fetch_all_sources")
+    def fetch_all_sources(self, max_articles_per_source: Optional[int] = None) -> Dict[str, int]:
         """
-        抓取所有启用的 RSS 源
+        抓取所有启用且未被隔离的 RSS 源
 
         Args:
-            max_articles_per_source: 每个源最多抓取文章数
+            max_articles_per_source: 每个源最多处理的新条目数（None 表示不限制，按高水位增量处理）
 
         Returns:
-            统计信息 {"sources_fetched": 源数量, "new_articles": 新文章数, "errors": 错误数}
+            统计信息 {"sources_fetched": 源数量, "new_articles": 新文章数, "errors": 错误数,
+                      "quarantined": 本轮跳过的隔离源数量}
         """
-        sources = self.db.query(RSSSource).filter(RSSSource.enabled == True).all()
+        enabled = self.db.query(RSSSource).filter(RSSSource.enabled == True)
+        sources = enabled.filter(source_health.due_filter()).all()
 
         stats = {
             "sources_fetched": 0,
             "new_articles": 0,
-            "errors": 0
+            "errors": 0,
+            "quarantined": enabled.count() - len(sources)
         }
 
         for source in sources:
-            try:
-                new_count = self.fetch_source(source, max_articles_per_source)
-                stats["new_articles"] += new_count
-                stats["sources_fetched"] += 1
+            new_count = self.fetch_and_record(source, max_articles_per_source)
+            if new_count is None:
+                stats["errors"] += 1
+                continue
 
-                # 更新最后抓取时间
-                source.last_fetched_at = datetime.utcnow()
-                self.db.commit()
+            stats["new_articles"] += new_count
+            stats["sources_fetched"] += 1
 
-                logger.info(f"✅ Fetched {source.name}: {new_count} new articles")
+            # 避免请求过快
+            time.sleep(1)
 
-                # 避免请求过快
-                time.sleep(1)
+        return stats
 
-            except Exception as e:
-                stats["errors"] += 1
-                logger.error(f"❌ Error fetching {source.name}: {str(e)}")
+    def fetch_and_record(self, source: RSSSource, max_articles: Optional[int] = None) -> Optional[int]:
+        """
+        抓取单个源并记录最后抓取时间与健康状态（提交事务）
 
-        return stats
+        Returns:
+            新增文章数量；抓取失败时返回 None
+        """
+        started = time.monotonic()
+        try:
+            new_count = self.fetch_source(source, max_articles)
+
+            # 更新最后抓取时间与健康状态
+            source.last_fetched_at = datetime.utcnow()
+            source_health.record_success(source, (time.monotonic() - started) * 1000, new_count)
+            self.db.commit()
 
-    def fetch_source(self, source: RSSSource, max_articles: int = 5) -> int:
+            logger.info(f"✅ Fetched {source.name}: {new_count} new articles")
+            return new_count
+
+        except Exception as e:
+            self.db.rollback()
+            logger.error(f"❌ Error fetching {source.name}: {str(e)}")
+
+            until = source_health.record_failure(source, str(e), (time.monotonic() - started) * 1000)
+            self.db.commit()
+            if until:
+                logger.warning(f"🚧 Quarantined {source.name} until {until.isoformat()} "
+                               f"({source.consecutive_failures} consecutive failures)")
+            return None
+
+    def fetch_source(self, source: RSSSource, max_articles: Optional[int] = None) -> int:
         """
-        抓取单个 RSS 源
+        增量抓取单个 RSS 源
+
+        feed 边下载边解析，连续遇到早于高水位的条目即停止读取；
+        条目是否处理过按 GUID / 链接判断（发布时间只用作停止读取的提示，可能写错时区）。
+        新条目按发布时间从新到旧处理，完成后把高水位推进到本次实际入库的最新条目（不超过当前时间）。
 
         Args:
             source: RSS 源对象
-            max_articles: 最多抓取文章数
+            max_articles: 最多处理的新条目数（None 表示不限制）。首次抓取时取最新的若干条；
+                          之后按从旧到新取，没有处理到的条目留到下一次
 
         Returns:
             新增文章数量
         """
-        # 解析 RSS feed
-        feed = feedparser.parse(source.rss_url)
-
-        if feed.bozo:  # 解析错误
-            logger.warning(f"Feed parse error for {source.name}: {feed.bozo_exception}")
+        # 边下载边解析，遇到高水位即停止读取剩余内容
+        response, chunks = self.http.stream(source.rss_url, accept=FEED_ACCEPT, max_body_size=MAX_FEED_SIZE)
+        try:
+            candidates = self._collect_candidate_entries(
+                source,
+                map(normalize_entry, iter_feed_entries(chunks, fallback=lambda: self._parse_feed_fully(source))),
+                max_articles
+            )
+        finally:
+            response.close()
 
-        # 检查是否有文章
-        if not feed.entries:
-            logger.debug(f"No entries found for {source.name}")
+        entries = self._select_entries(source, self._drop_known_entries(candidates), max_articles)
+        if not entries:
+            logger.debug(f"{source.name}: no entries newer than high-water mark")
             return 0
 
-        new_count = 0
-        duplicate_count = 0
-        entries = feed.entries[:max_articles]  # 限制数量
+        logger.debug(f"Processing {len(entries)} new entries from {source.name}")
 
-        logger.debug(f"Processing {len(entries)} entries from {source.name}")
+        new_count = 0
+        known_urls = set()
+        new_articles = []
+        ingested = []
 
         for entry in entries:
             try:
                 # 获取文章链接
-                url = entry.get("link", "")
+                url = entry.url
                 if not url:
                     continue
 
-                # 检查是否已存在（根据URL去重）
-                exists = self.db.query(Article).filter(Article.url == url).first()
-                if exists:
-                    duplicate_count += 1
+                # 同一 feed 内重复的链接只保留一次
+                if url in known_urls:
                     continue
-
-                # 提取元数据
-                title = entry.get("title", "Untitled")
-                author = entry.get("author", source.name)
-                summary = entry.get("summary", "")
-
-                # 解析发布时间
-                published_at = self._parse_date(entry.get("published", ""))
+                known_urls.add(url)
 
                 # 生成文章ID（基于URL的hash）
                 article_id = self._generate_article_id(url)
@@ -124,128 +183,337 @@ class RSSFetcher:
                 article = Article(
                     id=article_id,
                     source_id=source.id,
-                    title=title,
-                    author=author,
+                    title=entry.title,
+                    author=entry.author or source.name,
                     url=url,
-                    summary=self._clean_html(summary),
-                    published_at=published_at,
+                    summary=self._clean_html(entry.summary),
+                    published_at=entry.published_at,  # UTC；feed 未提供时为空，排序时用 created_at
+                    entry_updated_at=entry.updated_at,
+                    guid=entry.guid,
                     category=source.category,
                     language=source.language,
                     fetch_status="pending"  # 待提取全文
                 )
 
                 self.db.add(article)
+                new_articles.append(article)
+                ingested.append(entry)
                 new_count += 1
 
             except Exception as e:
                 logger.error(f"Error processing entry from {source.name}: {str(e)}")
 
-        self.db.commit()
+        self._advance_high_water_mark(source, ingested)
+
+        # 新文章的全文提取任务与文章在同一事务中入队
+        JobQueue(self.db).enqueue_many(EXTRACT_JOB, [
+            self._extract_job_item(article.id, article.published_at) for article in new_articles
+        ])
+        for article in new_articles:
+            events.record(self.db, events.ARTICLE_CREATED, events.article_created(article))
 
-        # 输出统计信息
-        if duplicate_count > 0:
-            logger.debug(f"{source.name}: {new_count} new, {duplicate_count} duplicates")
+        self.db.commit()
 
         return new_count
 
-    def extract_full_content(self, article: Article) -> bool:
+    def _collect_candidate_entries(self, source: RSSSource, entries: Iterator[NormalizedEntry],
+                                   max_articles: Optional[int]) -> List[NormalizedEntry]:
+        """
+        按 feed 顺序消费条目，必要时提前停止
+
+        绝大多数 feed 按从新到旧排列：连续遇到 SEEN_RUN_TO_STOP 个上次处理到的条目、
+        或发布时间早于“高水位 - STOP_HINT_MARGIN”的条目即停止，剩余内容不再下载和解析。
+        若观察到条目按从旧到新排列，则不提前停止。
+        这里不判断条目是否处理过（由 _drop_known_entries 按 GUID / 链接判断），
+        早于高水位的条目只作为停止提示，不会因为时间而被丢弃。
+
+        Returns:
+            读取到的条目（可能包含已入库的条目）
+        """
+        candidates = []
+        seen_run = 0
+        ascending = False
+        previous = None
+        mark = source.last_entry_published_at
+        stop_before = mark - STOP_HINT_MARGIN if mark else None
+
+        for entry in entries:
+            published = entry.published_at
+            if published and previous and published > previous:
+                ascending = True
+            if published:
+                previous = published
+
+            candidates.append(entry)
+            old = (source.last_entry_id and entry.key == source.last_entry_id) or \
+                (published and stop_before and published < stop_before)
+
+            if old:
+                seen_run += 1
+                if seen_run >= SEEN_RUN_TO_STOP and not ascending:
+                    break
+                continue
+
+            seen_run = 0
+            # 首次抓取只需要最新的 max_articles 条
+            if mark is None and max_articles is not None and len(candidates) >= max_articles and not ascending:
+                break
+
+        return candidates
+
+    def _drop_known_entries(self, entries: List[NormalizedEntry]) -> List[NormalizedEntry]:
+        """按 GUID / 链接去掉已入库的条目（批量查询，替代逐条 SELECT）"""
+        urls = [entry.url for entry in entries if entry.url]
+        guids = [entry.guid for entry in entries if entry.guid]
+        known_urls, known_guids = set(), set()
+        for i in range(0, len(urls), 500):  # 控制 IN 参数个数（SQLite 有上限）
+            known_urls.update(
+                row[0] for row in self.db.query(Article.url).filter(Article.url.in_(urls[i:i + 500])).all()
+            )
+        for i in range(0, len(guids), 500):
+            known_guids.update(
+                row[0] for row in self.db.query(Article.guid).filter(Article.guid.in_(guids[i:i + 500])).all()
+            )
+        return [
+            entry for entry in entries
+            if entry.url not in known_urls and not (entry.guid and entry.guid in known_guids)
+        ]
+
+    def _select_entries(self, source: RSSSource, unseen: List[NormalizedEntry],
+                        max_articles: Optional[int]) -> List[NormalizedEntry]:
+        """
+        未处理条目按发布时间从新到旧排序（没有时间的保持原顺序排在最后），按 max_articles 截取
+
+        首次抓取保留最新的条目；之后保留最旧的条目，高水位只推进到已入库的条目，
+        被截掉的较新条目在下一次抓取时处理，不会丢失。
         """
-        提取文章全文并转换为 Markdown
+        dated = [entry for entry in unseen if entry.published_at is not None]
+        undated = [entry for entry in unseen if entry.published_at is None]
+        # sort 是稳定的，reverse=True 时同一时间的条目仍保持原始顺序
+        dated.sort(key=lambda entry: entry.published_at, reverse=True)
+
+        ordered = dated + undated
+        if max_articles is None or len(ordered) <= max_articles:
+            return ordered
+        if source.last_entry_published_at is None:
+            return ordered[:max_articles]
+        if len(dated) >= max_articles:
+            return dated[len(dated) - max_articles:]
+        return dated + undated[:max_articles - len(dated)]
+
+    def _advance_high_water_mark(self, source: RSSSource, ingested: List[NormalizedEntry]):
+        """把高水位推进到本次入库的最新条目；发布时间晚于当前时间的按当前时间计"""
+        dated = [entry for entry in ingested if entry.published_at is not None]
+        if not dated:
+            return
+        newest = max(dated, key=lambda entry: entry.published_at)
+        published = min(newest.published_at, datetime.utcnow())
+        if source.last_entry_published_at is None or published > source.last_entry_published_at:
+            source.last_entry_published_at = published
+            source.last_entry_id = newest.key
+
+    def _parse_feed_fully(self, source: RSSSource):
+        """增量解析失败时的退路：完整下载后交给 feedparser（同样受 MAX_FEED_SIZE 限制）"""
+        body, response = self.http.get_bytes(source.rss_url, accept=FEED_ACCEPT, max_body_size=MAX_FEED_SIZE)
+        feed = feedparser.parse(body, response_headers=feed_response_headers(response))
+        if feed.bozo:  # 解析错误
+            logger.warning(f"Feed parse error for {source.name}: {feed.bozo_exception}")
+        return feed
+
+    def extract_full_content(self, article: Article, use_stored: bool = False) -> str:
+        """
+        提取文章全文并转换为 Markdown（成功时更新文章并提交）
+
+        失败时抛出异常，由任务队列决定重试或进入死信；
+        不再用摘要覆盖 markdown_content，读取端在正文缺失时自行降级到摘要。
 
         Args:
             article: 文章对象
+            use_stored: 优先使用原始页面存储中的页面（回填/重新提取时），没有时再下载
 
         Returns:
-            是否成功
+            页面来源："store" 或 "network"
+
+        Raises:
+            ExtractionError: 下载内容为空或提取不到正文
         """
-        try:
-            # 使用 trafilatura 提取全文
-            downloaded = trafilatura.fetch_url(article.url)
-
-            if not downloaded:
-                article.fetch_status = "failed"
-                article.markdown_content = article.summary  # 降级使用摘要
-                self.db.commit()
-                return False
-
-            # 提取并转换为 Markdown
-            markdown_content = trafilatura.extract(
-                downloaded,
-                output_format='markdown',
-                include_links=True,
-                include_images=True,
-                include_tables=True
-            )
+        store = get_page_store()
+        downloaded = None
+        origin = "store"
 
-            if not markdown_content:
-                article.fetch_status = "failed"
-                article.markdown_content = article.summary
-                self.db.commit()
-                return False
+        if use_stored and store is not None and article.content_hash:
+            downloaded = store.get(self.db, article.content_hash)
 
-            # 更新文章
-            article.markdown_content = markdown_content
-            article.fetch_status = "fetched"
-            self.db.commit()
+        if downloaded is None:
+            # 通过共享客户端下载页面，交给 trafilatura 提取全文
+            downloaded, _ = self.http.get_bytes(article.url, accept="text/html,application/xhtml+xml")
+            origin = "network"
 
-            logger.info(f"✅ Extracted full content: {article.title[:50]}...")
-            return True
+        if not downloaded:
+            raise ExtractionError("empty response body")
 
-        except Exception as e:
-            logger.error(f"❌ Error extracting {article.url}: {str(e)}")
-            article.fetch_status = "failed"
-            article.markdown_content = article.summary
+        body_hash = extraction_cache.content_hash(downloaded)
+
+        # 保存原始页面（启用时），即使后面提取失败也可以离线重新处理
+        if store is not None and origin == "network":
+            store.put(self.db, body_hash, downloaded, url=article.url)
+            article.content_hash = body_hash
             self.db.commit()
-            return False
 
-    def extract_batch_content(self, limit: int = 10) -> Dict[str, int]:
+        # 提取并转换为 Markdown（相同页面内容 + 相同参数直接复用缓存）
+        markdown_content = self.extract_markdown(downloaded, body_hash)
+
+        if not markdown_content:
+            raise ExtractionError("no extractable content")
+
+        # 更新文章（同时计算字数、token 估算、阅读时长与正文语言）
+        article.content_hash = body_hash
+        article.markdown_content = markdown_content
+        article.archive_month = None  # 重新提取的归档文章回到热表
+        article.archived_at = None
+        apply_metrics(article, markdown_content)
+        article.fetch_status = "fetched"
+        events.record(self.db, events.ARTICLE_EXTRACTED, events.article_extracted(article))
+        # 配置了 Dify 工作流时，分发任务与提取结果在同一事务中入队
+        dispatcher.enqueue_first_stage(self.db, [article.id])
+        self.db.commit()
+
+        logger.info(f"✅ Extracted full content: {article.title[:50]}...")
+        return origin
+
+    def extract_markdown(self, html: bytes, body_hash: str = None) -> str:
+        """
+        用 trafilatura 把页面转换为 Markdown，结果按内容 hash 缓存
+
+        Returns:
+            Markdown；提取不到正文时返回空字符串
+        """
+        body_hash = body_hash or extraction_cache.content_hash(html)
+        cache = extraction_cache.ExtractionCache(self.db)
+
+        cached = cache.get(body_hash, EXTRACTION_OPTIONS_HASH)
+        if cached is not None:
+            logger.debug(f"Extraction cache hit: {body_hash[:12]}")
+            return cached
+
+        markdown_content = trafilatura.extract(html, **EXTRACTION_OPTIONS) or ""
+        cache.put(body_hash, EXTRACTION_OPTIONS_HASH, markdown_content)
+        return markdown_content
+
+    def enqueue_pending_articles(self) -> int:
+        """
+        为还没有提取任务的 pending 文章补建任务（升级旧库或任务表被清空时使用）
+
+        Returns:
+            补建的任务数
+        """
+        queued_keys = self.db.query(Job.key).filter(Job.kind == EXTRACT_JOB)
+        rows = self.db.query(Article.id, Article.published_at).filter(
+            Article.fetch_status == "pending",
+            ~Article.id.in_(queued_keys)
+        ).all()
+
+        JobQueue(self.db).enqueue_many(EXTRACT_JOB, [
+            self._extract_job_item(article_id, published_at) for article_id, published_at in rows
+        ])
+        self.db.commit()
+        return len(rows)
+
+    @profiling.profiled_run("extract_batch_content")
+    def extract_batch_content(self, limit: int = 10, workers: int = 1) -> Dict[str, int]:
         """
-        批量提取待处理文章的全文
+        从任务队列领取并提取全文
 
         Args:
-            limit: 一次处理的文章数量
+            limit: 本次最多处理的任务数量
+            workers: 并发 worker 数（每个 worker 使用独立的数据库会话）
 
         Returns:
-            统计信息
+            统计信息 {"total", "success", "failed", "dead"}
         """
-        # 获取待提取的文章
-        pending_articles = self.db.query(Article).filter(
-            Article.fetch_status == "pending"
-        ).limit(limit).all()
+        if workers <= 1:
+            return self._drain_extract_jobs(limit)
 
-        stats = {
-            "total": len(pending_articles),
-            "success": 0,
-            "failed": 0
-        }
+        stats = {"total": 0, "success": 0, "failed": 0, "dead": 0}
+        per_worker = max(1, -(-limit // workers))  # 向上取整
+
+        def run_worker():
+            db = SessionLocal()
+            try:
+                return RSSFetcher(db)._drain_extract_jobs(per_worker)
+            finally:
+                db.close()
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            # 在线程池中也计入当前剖析中的运行
+            task = profiling.in_current_context(lambda _: run_worker())
+            for worker_stats in executor.map(task, range(workers)):
+                for key in stats:
+                    stats[key] += worker_stats[key]
+
+        return stats
+
+    def _drain_extract_jobs(self, limit: int) -> Dict[str, int]:
+        """单个 worker：逐个领取提取任务直到达到 limit 或队列为空"""
+        queue = JobQueue(self.db)
+        stats = {"total": 0, "success": 0, "failed": 0, "dead": 0}
+
+        while stats["total"] < limit:
+            jobs = queue.lease(EXTRACT_JOB, limit=1)
+            if not jobs:
+                break
 
-        for article in pending_articles:
-            if self.extract_full_content(article):
+            job = jobs[0]
+            stats["total"] += 1
+            article = self.db.query(Article).filter(Article.id == job.key).first()
+
+            if article is None:
+                # 文章已被删除，任务直接完成
+                queue.complete(job)
+                continue
+
+            payload = job_payload(job) or {}
+            origin = "network"
+            try:
+                origin = self.extract_full_content(article, use_stored=payload.get("reextract", False))
+                queue.complete(job)
                 stats["success"] += 1
-            else:
+            except Exception as e:
+                self.db.rollback()
+                logger.error(f"❌ Error extracting {article.url}: {str(e)}")
                 stats["failed"] += 1
 
-            # 避免请求过快
-            time.sleep(2)
+                if queue.fail(job, str(e)) == "dead":
+                    # 重试用尽：标记失败，正文保持为空，读取时降级到摘要
+                    article.fetch_status = "failed"
+                    self.db.commit()
+                    stats["dead"] += 1
+
+            # 避免请求过快（本地页面存储无需限速）
+            if origin == "network":
+                time.sleep(2)
+
+        if stats["total"]:
+            extraction_cache.ExtractionCache(self.db).evict()
+            store = get_page_store()
+            if store is not None:
+                store.evict(self.db)
 
         return stats
 
+    def _extract_job_item(self, article_id: str, published_at: Optional[datetime]) -> dict:
+        """提取任务：新发布的文章优先"""
+        return {
+            "key": article_id,
+            "order_key": utc_timestamp(published_at),
+        }
+
     def _generate_article_id(self, url: str) -> str:
         """生成文章ID（基于URL的短hash）"""
         hash_obj = hashlib.md5(url.encode())
         short_hash = hash_obj.hexdigest()[:12]
         return f"ART_{short_hash}"
 
-    def _parse_date(self, date_str: str) -> datetime:
-        """解析日期字符串"""
-        if not date_str:
-            return datetime.utcnow()
-
-        try:
-            return date_parser.parse(date_str)
-        except:
-            return datetime.utcnow()
-
     def _clean_html(self, html_text: str) -> str:
         """清理HTML标签"""
         if not html_text:
@@ -4,9 +4,15 @@ RSS 源管理模块
 """
 
 import xml.etree.ElementTree as ET
+import time
+import feedparser
+from concurrent.futures import ThreadPoolExecutor
+from sqlalchemy import insert
 from sqlalchemy.orm import Session
 from models import RSSSource
-from typing import List, Dict
+from http_client import get_http_client, feed_response_headers
+import source_health
+from typing import List, Dict, Iterator, Optional
 import os
 
 
@@ -16,65 +22,96 @@ class RSSSourceManager:
     def __init__(self, db: Session):
         self.db = db
 
-    def import_from_opml(self, opml_file_path: str) -> Dict[str, int]:
+    def import_from_opml(self, opml_file_path: str, validate: bool = False,
+                         concurrency: int = 16, disable_invalid: bool = True) -> Dict:
         """
-        从 OPML 文件导入 RSS 源
+        从 OPML 文件批量导入 RSS 源
+
+        流式解析 OPML，一次查询与已有 rss_url 去重，批量插入新源；
+        可选地并发校验每个新源（可访问、可解析、条目数、语言）。
 
         Args:
             opml_file_path: OPML 文件路径
+            validate: 是否并发校验新源
+            concurrency: 校验并发数
+            disable_invalid: 校验失败的源是否以禁用状态导入
 
         Returns:
-            导入统计 {"total": 总数, "new": 新增数, "existing": 已存在数}
+            导入统计 {"total": 总数, "new": 新增数, "existing": 已存在数,
+                      "invalid": 校验失败数, "validation": [每个新源的校验结果]}
         """
         if not os.path.exists(opml_file_path):
             raise FileNotFoundError(f"OPML file not found: {opml_file_path}")
 
-        tree = ET.parse(opml_file_path)
-        root = tree.getroot()
-
-        total = 0
-        new = 0
-        existing = 0
+        outlines = list(self._iter_opml_outlines(opml_file_path))
+        total = len(outlines)
 
-        # 查找所有 outline 元素
-        for outline in root.findall(".//outline[@type='rss']"):
-            total += 1
-            name = outline.get("text", "")
-            title = outline.get("title", name)
-            rss_url = outline.get("xmlUrl", "")
+        # 一次查询取出所有已存在的地址
+        known_urls = {row[0] for row in self.db.query(RSSSource.rss_url).all()}
 
-            if not rss_url:
+        new_outlines = []
+        existing = 0
+        for outline in outlines:
+            if not outline["rss_url"]:
                 continue
-
-            # 检查是否已存在
-            exists = self.db.query(RSSSource).filter(
-                RSSSource.rss_url == rss_url
-            ).first()
-
-            if exists:
+            if outline["rss_url"] in known_urls:
                 existing += 1
                 continue
-
-            # 创建新源
-            source = RSSSource(
-                name=name,
-                title=title,
-                rss_url=rss_url,
-                category=self._categorize_source(name),
-                language=self._detect_language(name)
-            )
-
-            self.db.add(source)
-            new += 1
-
+            known_urls.add(outline["rss_url"])  # 文件内重复的地址只导入一次
+            new_outlines.append(outline)
+
+        reports = {}
+        if validate and new_outlines:
+            with ThreadPoolExecutor(max_workers=max(1, concurrency)) as executor:
+                for report in executor.map(validate_feed, [o["rss_url"] for o in new_outlines]):
+                    reports[report["rss_url"]] = report
+
+        rows = []
+        for outline in new_outlines:
+            report = reports.get(outline["rss_url"])
+            language = (report or {}).get("language") or self._detect_language(outline["name"])
+            rows.append({
+                "name": outline["name"],
+                "title": outline["title"],
+                "rss_url": outline["rss_url"],
+                "website_url": outline["website_url"],
+                "category": self._categorize_source(outline["name"]),
+                "language": language,
+                "enabled": not (disable_invalid and report is not None and not report["ok"]),
+            })
+
+        # 批量插入（一条 executemany）
+        if rows:
+            self.db.execute(insert(RSSSource), rows)
         self.db.commit()
 
         return {
             "total": total,
-            "new": new,
-            "existing": existing
+            "new": len(rows),
+            "existing": existing,
+            "invalid": sum(1 for report in reports.values() if not report["ok"]),
+            "validation": list(reports.values())
         }
 
+    def _iter_opml_outlines(self, opml_file_path: str) -> Iterator[Dict[str, str]]:
+        """流式解析 OPML，逐个产出 type=rss 的 outline，解析完的元素及时释放"""
+        for event, element in ET.iterparse(opml_file_path, events=("start", "end")):
+            if element.tag != "outline":
+                continue
+
+            if event == "start":
+                if element.get("type") != "rss":
+                    continue
+                name = element.get("text", "")
+                yield {
+                    "name": name,
+                    "title": element.get("title", name),
+                    "rss_url": (element.get("xmlUrl") or "").strip(),
+                    "website_url": element.get("htmlUrl"),
+                }
+            else:
+                element.clear()
+
     def add_source(self, name: str, rss_url: str, category: str = None,
                    language: str = "zh_CN") -> RSSSource:
         """手动添加单个 RSS 源"""
@@ -101,13 +138,16 @@ class RSSSourceManager:
 
         return source
 
-    def list_sources(self, enabled_only: bool = False) -> List[RSSSource]:
+    def list_sources(self, enabled_only: bool = False, quarantined_only: bool = False) -> List[RSSSource]:
         """列出所有 RSS 源"""
         query = self.db.query(RSSSource)
 
         if enabled_only:
             query = query.filter(RSSSource.enabled == True)
 
+        if quarantined_only:
+            query = query.filter(~source_health.due_filter())
+
         return query.all()
 
     def enable_source(self, source_id: int):
@@ -115,6 +155,7 @@ class RSSSourceManager:
         source = self.db.query(RSSSource).filter(RSSSource.id == source_id).first()
         if source:
             source.enabled = True
+            source_health.reset(source)
             self.db.commit()
 
     def disable_source(self, source_id: int):
@@ -161,3 +202,65 @@ class RSSSourceManager:
             if '\u4e00' <= char <= '\u9fff':
                 return "zh_CN"
         return "en_US"
+
+
+def validate_feed(rss_url: str) -> Dict:
+    """
+    校验单个 RSS 源：能否访问、能否解析、条目数量、声明的语言
+
+    Returns:
+        {"rss_url", "ok", "status_code", "entry_count", "language", "title", "latency_ms", "error"}
+    """
+    report = {
+        "rss_url": rss_url,
+        "ok": False,
+        "status_code": None,
+        "entry_count": 0,
+        "language": None,
+        "title": None,
+        "latency_ms": None,
+        "error": None
+    }
+
+    started = time.monotonic()
+    try:
+        body, response = get_http_client().get_bytes(rss_url)
+        report["status_code"] = response.status_code
+
+        feed = feedparser.parse(body, response_headers=feed_response_headers(response))
+        report["entry_count"] = len(feed.entries)
+        report["title"] = feed.feed.get("title")
+        report["language"] = _normalize_language(feed.feed.get("language"))
+
+        if not feed.entries:
+            report["error"] = str(feed.bozo_exception) if feed.bozo else "feed has no entries"
+        else:
+            report["ok"] = True
+
+    except Exception as e:
+        status = getattr(getattr(e, "response", None), "status_code", None)
+        if status:
+            report["status_code"] = status
+        report["error"] = str(e)
+
+    report["latency_ms"] = int((time.monotonic() - started) * 1000)
+    return report
+
+
+def _normalize_language(language: Optional[str]) -> Optional[str]:
+    """把 feed 声明的语言（zh-cn、en-US、en）规范为 zh_CN / en_US 形式"""
+    if not language:
+        return None
+
+    language = language.strip().replace("-", "_")
+    if not language:
+        return None
+
+    parts = language.split("_")
+    if parts[0].lower() == "zh":
+        return "zh_CN"
+    if parts[0].lower() == "en":
+        return "en_US"
+    if len(parts) > 1:
+        return f"{parts[0].lower()}_{parts[1].upper()}"
+    return parts[0].lower()
@@ -9,6 +9,8 @@ from apscheduler.triggers.cron import CronTrigger
 from sqlalchemy.orm import Session
 from database import SessionLocal
 from rss_fetcher import RSSFetcher
+from article_archive import ArticleArchiver
+import threading
 import logging
 
 logger = logging.getLogger(__name__)
@@ -18,19 +20,33 @@ class ArticleScheduler:
     """文章抓取调度器"""
 
     def __init__(self):
+        # 定时抓取与手动触发（worker 领取的 fetch 任务）共用，避免同时跑两轮抓取
+        self.fetch_lock = threading.Lock()
         self.scheduler = BackgroundScheduler()
         self.scheduler.start()
         logger.info("📅 Scheduler started")
 
-    def start_rss_fetching(self, interval_hours: int = 6):
+    def start_rss_fetching(self, interval_hours: int = 6, run_now: bool = True):
         """
         启动定时RSS抓取
 
         Args:
             interval_hours: 抓取间隔（小时）
+            run_now: 是否立即执行一次
         """
-        logger.info("✅ RSS fetching will run once on startup")
-        self._fetch_rss_job()
+        self.scheduler.add_job(
+            func=self._fetch_rss_job,
+            trigger=IntervalTrigger(hours=interval_hours),
+            id='fetch_rss',
+            name='Fetch RSS feeds',
+            replace_existing=True,
+            max_instances=1,
+            coalesce=True
+        )
+        logger.info(f"✅ RSS fetching scheduled: every {interval_hours} hours")
+
+        if run_now:
+            self._fetch_rss_job()
 
     def start_content_extraction(self, interval_minutes: int = 30):
         """
@@ -48,18 +64,59 @@ class ArticleScheduler:
         )
         logger.info(f"✅ Content extraction scheduled: every {interval_minutes} minutes")
 
-    def _fetch_rss_job(self):
-        """RSS抓取任务"""
+    def start_archiving(self, after_days: int, hour: int = 3):
+        """
+        启动每日归档（把入库超过 after_days 天的文章正文移入归档库）
+
+        Args:
+            after_days: 归档期限（天）
+            hour: 每天执行的时刻
+        """
+        self.scheduler.add_job(
+            func=lambda: self._archive_job(after_days),
+            trigger=CronTrigger(hour=hour, minute=30),
+            id='archive_articles',
+            name='Archive old articles',
+            replace_existing=True,
+            max_instances=1,
+            coalesce=True
+        )
+        logger.info(f"✅ Archiving scheduled: daily at {hour}:30, articles older than {after_days} days")
+
+    def _archive_job(self, after_days: int):
+        """归档任务"""
+        db = SessionLocal()
+        try:
+            stats = ArticleArchiver(db, after_days=after_days).run()
+            logger.info(f"✅ Archiving completed: {stats}")
+        except Exception as e:
+            logger.error(f"❌ Archiving error: {str(e)}")
+        finally:
+            db.close()
+
+    def _fetch_rss_job(self) -> bool:
+        """
+        RSS抓取任务
+
+        Returns:
+            是否执行了抓取（已有抓取在进行时跳过，返回 False）
+        """
+        if not self.fetch_lock.acquire(blocking=False):
+            logger.info("⏭️ RSS fetch already running, skipped")
+            return False
+
         logger.info("🚀 Starting RSS fetch job...")
         db = SessionLocal()
         try:
             fetcher = RSSFetcher(db)
-            stats = fetcher.fetch_all_sources(max_articles_per_source=5)
+            stats = fetcher.fetch_all_sources()
             logger.info(f"✅ RSS fetch completed: {stats}")
         except Exception as e:
             logger.error(f"❌ RSS fetch error: {str(e)}")
         finally:
             db.close()
+            self.fetch_lock.release()
+        return True
 
     def _extract_content_job(self):
         """全文提取任务"""
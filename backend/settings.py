@@ -0,0 +1,60 @@
+"""
+运行配置
+所有配置项都可以通过环境变量覆盖
+"""
+
+import os
+
+
+def _env_int(name: str, default: int) -> int:
+    """读取整数配置；不是整数时在启动时报错并指出变量名，而不是在运行中比较时才出错"""
+    raw = os.getenv(name, str(default)).strip()
+    try:
+        return int(raw)
+    except ValueError:
+        raise ValueError(f"{name} must be an integer, got {raw!r}") from None
+
+
+# 抓取运行方式：
+#   embedded - API 进程内完成抓取与提取（默认，适合本地单机）
+#   external - API 只提供读取服务，抓取/提取由独立 worker 进程（python -m worker）完成
+INGEST_MODE = os.getenv("ARTICLE_INGEST_MODE", "embedded")
+EMBEDDED_INGESTION = INGEST_MODE != "external"
+
+# 读多写少的接口（/api/resource/markdown、/api/articles、/api/batches）是否使用异步实现
+# 需要安装 aiosqlite；设为 0 可回退到同步实现（用于压测对比）
+ASYNC_API = os.getenv("ARTICLE_ASYNC_API", "1") == "1"
+
+# 原始页面存储：保存下载的 HTML，改进提取逻辑后可以在本地重新处理而无需重新抓取
+PAGE_STORE_ENABLED = os.getenv("ARTICLE_PAGE_STORE", "0") == "1"
+PAGE_STORE_MAX_BYTES = int(float(os.getenv("ARTICLE_PAGE_STORE_MAX_GB", "20")) * 1024 ** 3)
+
+# Dify 工作流分发：在全文提取之后把文章提交给初评 / 分析 / 翻译工作流
+# 某个阶段的 API Key 为空时该阶段不启用
+DIFY_API_BASE = os.getenv("ARTICLE_DIFY_API_BASE", "http://localhost/v1")
+DIFY_FILTER_KEY = os.getenv("ARTICLE_DIFY_FILTER_KEY", "")
+DIFY_ANALYSIS_KEY = os.getenv("ARTICLE_DIFY_ANALYSIS_KEY", "")
+DIFY_TRANSLATE_KEY = os.getenv("ARTICLE_DIFY_TRANSLATE_KEY", "")
+DISPATCH_CONCURRENCY = _env_int("ARTICLE_DISPATCH_CONCURRENCY", 2)  # 同时进行的工作流运行数
+DISPATCH_TOKENS_PER_WINDOW = _env_int("ARTICLE_DISPATCH_TOKENS_PER_WINDOW", 200000)  # 每个窗口的 token 预算
+DISPATCH_WINDOW_SECONDS = _env_int("ARTICLE_DISPATCH_WINDOW_SECONDS", 60)
+DISPATCH_MIN_FILTER_VALUE = _env_int("ARTICLE_DISPATCH_MIN_FILTER_VALUE", 1)  # 初评价值（0-5）达到才分析
+DISPATCH_TRANSLATE_MIN_SCORE = _env_int("ARTICLE_DISPATCH_TRANSLATE_MIN_SCORE", 80)  # 分析评分达到才翻译
+
+# 冷热分层：入库超过该天数的文章正文与摘要移入按月的归档库（data/archive/articles-YYYY-MM.db），
+# articles 表只保留元数据与摘要开头；0 表示不归档
+ARCHIVE_AFTER_DAYS = int(os.getenv("ARTICLE_ARCHIVE_AFTER_DAYS", "0"))
+
+# 阅读数统计：阅读记录在内存中聚合，每隔该秒数（或缓冲的文章数超过上限时）批量写入一次
+VIEW_FLUSH_SECONDS = float(os.getenv("ARTICLE_VIEW_FLUSH_SECONDS", "5"))
+VIEW_MAX_BUFFERED = int(os.getenv("ARTICLE_VIEW_MAX_BUFFERED", "10000"))
+
+# 性能剖析（默认关闭；关闭时不注册任何中间件或 SQL 事件钩子）
+#   ARTICLE_PROFILING=1 时：请求带 X-Profile: 1 头、或通过 POST /api/profile/arm 预约后，
+#   对该请求 / 下一次抓取、提取运行做采样剖析，并统计 SQL 耗时与疑似 N+1 查询
+PROFILING_ENABLED = os.getenv("ARTICLE_PROFILING", "0") == "1"
+PROFILE_SAMPLE_MS = float(os.getenv("ARTICLE_PROFILE_SAMPLE_MS", "5"))  # 采样间隔
+PROFILE_RUNS = {name for name in os.getenv("ARTICLE_PROFILE_RUNS", "").split(",") if name}  # 每次都剖析的运行
+SQL_LOG = os.getenv("ARTICLE_SQL_LOG", "0") == "1"  # 记录每条语句及耗时（INFO 日志）
+SLOW_QUERY_MS = float(os.getenv("ARTICLE_SLOW_QUERY_MS", "0"))  # 慢查询阈值，超过的写入 data/profiles/slow_queries.log；0 表示不记录
+N_PLUS_ONE_THRESHOLD = int(os.getenv("ARTICLE_N_PLUS_ONE_THRESHOLD", "20"))  # 同一语句在一次请求 / 运行中执行的次数
@@ -0,0 +1,69 @@
+"""
+RSS 源健康状态
+负责：记录每个源的成功/失败、耗时与产出，对连续失败的源自动隔离（指数退避）
+
+被隔离的源在 quarantined_until 之前不参与抓取；到期后会被重新探测一次，
+成功则恢复，失败则隔离时间翻倍（上限 MAX_QUARANTINE_HOURS）。
+"""
+
+from datetime import datetime, timedelta
+from typing import Optional
+
+from sqlalchemy import or_
+
+from models import RSSSource
+
+QUARANTINE_THRESHOLD = 3  # 连续失败多少次后开始隔离
+BASE_QUARANTINE_HOURS = 1  # 第一次隔离时长
+MAX_QUARANTINE_HOURS = 7 * 24  # 隔离时长上限
+EWMA_ALPHA = 0.3  # 移动平均权重
+
+
+def due_filter(now: datetime = None):
+    """查询条件：未被隔离或隔离已到期（需要重新探测）的源"""
+    now = now or datetime.utcnow()
+    return or_(RSSSource.quarantined_until == None, RSSSource.quarantined_until <= now)  # noqa: E711
+
+
+def record_success(source: RSSSource, latency_ms: float, new_entries: int):
+    """记录一次成功抓取（不提交事务）"""
+    source.consecutive_failures = 0
+    source.last_success_at = datetime.utcnow()
+    source.quarantined_until = None
+    source.avg_latency_ms = _ewma(source.avg_latency_ms, latency_ms)
+    source.avg_entries_per_poll = _ewma(source.avg_entries_per_poll, new_entries)
+
+
+def record_failure(source: RSSSource, error: str, latency_ms: float) -> Optional[datetime]:
+    """
+    记录一次失败抓取（不提交事务）
+
+    Returns:
+        若本次失败触发隔离，返回隔离到期时间
+    """
+    now = datetime.utcnow()
+    failures = (source.consecutive_failures or 0) + 1
+
+    source.consecutive_failures = failures
+    source.last_failure_at = now
+    source.last_error = (error or "")[:1000]
+    source.avg_latency_ms = _ewma(source.avg_latency_ms, latency_ms)
+
+    if failures < QUARANTINE_THRESHOLD:
+        return None
+
+    hours = min(BASE_QUARANTINE_HOURS * 2 ** (failures - QUARANTINE_THRESHOLD), MAX_QUARANTINE_HOURS)
+    source.quarantined_until = now + timedelta(hours=hours)
+    return source.quarantined_until
+
+
+def reset(source: RSSSource):
+    """手动解除隔离（不提交事务）"""
+    source.consecutive_failures = 0
+    source.quarantined_until = None
+
+
+def _ewma(previous: Optional[float], value: float) -> float:
+    if previous is None:
+        return float(value)
+    return EWMA_ALPHA * value + (1 - EWMA_ALPHA) * previous
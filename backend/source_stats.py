@@ -0,0 +1,250 @@
+"""
+按源统计
+负责：维护每个源按天分桶的文章状态计数（source_daily_stats）与累计计数（source_stats）
+
+计数随写入增量更新，而不是查询时对 articles 做 GROUP BY：
+- Session 的 after_flush 钩子根据本次 flush 中 Article 的新增、删除、fetch_status / word_count 变化
+  计算增量，在同一事务中用 UPSERT（count = count + delta）写入两张统计表；
+  source_id、fetch_status、word_count 在模型中设置了 active_history，提交 / 回滚后（实例已过期）再修改时也能取到旧值；
+- 精选（featured）来自分析结果的批量 upsert，由 analysis_store 调用 record_featured_changes；
+- 阅读数由 view_counter 批量写入 source_stats.views，近 N 天的阅读数来自 article_view_daily（按阅读日期）。
+分桶按文章的入库日期，因此 “近 N 天” 指近 N 天入库的文章，与批次的口径一致。
+
+删除文章时由 analysis_store / view_counter 的 delete_for_articles 扣减精选数与阅读数；
+绕过 ORM 的批量 UPDATE 不会被统计；升级旧库或怀疑计数偏差时执行 rebuild()
+（python -m source_stats --rebuild）。
+"""
+
+import argparse
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Tuple
+
+from sqlalchemy import case, event as sa_event, func, inspect as sa_inspect
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+
+from models import Article, ArticleAnalysis, ArticleViewDaily, ArticleViews, RSSSource, SourceDailyStats, SourceStats
+
+COUNTERS = ("total", "pending", "fetched", "failed", "featured", "word_count")
+_TRACKED = ("source_id", "fetch_status", "word_count")
+WINDOWS = (7, 30, 90)
+
+# (source_id, day) -> {counter: delta}
+Deltas = Dict[Tuple[int, str], Dict[str, int]]
+
+
+def _key(source_id, created_at) -> Tuple[int, str]:
+    return source_id or 0, (created_at or datetime.utcnow()).strftime("%Y-%m-%d")
+
+
+def _previous(obj, attribute: str):
+    """属性在本次 flush 之前的值（没有变化时即当前值）"""
+    history = sa_inspect(obj).attrs[attribute].history
+    if not history.has_changes():
+        return getattr(obj, attribute)
+    return history.deleted[0] if history.deleted else None
+
+
+def _count(deltas: Deltas, source_id, created_at, status, words, sign: int):
+    counters = deltas[_key(source_id, created_at)]
+    counters["total"] += sign
+    counters[status or "pending"] += sign
+    counters["word_count"] += sign * (words or 0)
+
+
+@sa_event.listens_for(Session, "after_flush")
+def _collect_article_changes(session: Session, flush_context):
+    deltas: Deltas = defaultdict(lambda: defaultdict(int))
+
+    for obj in session.new:
+        if isinstance(obj, Article):
+            _count(deltas, obj.source_id, obj.created_at, obj.fetch_status, obj.word_count, 1)
+
+    for obj in session.dirty:
+        if not isinstance(obj, Article):
+            continue
+        before = tuple(_previous(obj, name) for name in _TRACKED)
+        after = tuple(getattr(obj, name) for name in _TRACKED)
+        if before != after:
+            # 源、状态或字数变化：从旧的桶中减去，再按新值计入
+            _count(deltas, before[0], obj.created_at, before[1], before[2], -1)
+            _count(deltas, after[0], obj.created_at, after[1], after[2], 1)
+
+    for obj in session.deleted:
+        if isinstance(obj, Article):
+            _count(deltas, _previous(obj, "source_id"), obj.created_at,
+                   _previous(obj, "fetch_status"), _previous(obj, "word_count"), -1)
+
+    if deltas:
+        apply_deltas(session, deltas)
+
+
+def apply_deltas(session: Session, deltas: Deltas):
+    """在会话当前事务中把增量写入两张统计表（不提交、不触发 autoflush）"""
+    per_source: Dict[int, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+    connection = session.connection()
+
+    for (source_id, day), counters in deltas.items():
+        counters = {name: value for name, value in counters.items() if name in COUNTERS and value}
+        if not counters:
+            continue
+        for name, value in counters.items():
+            per_source[source_id][name] += value
+        connection.execute(_upsert(SourceDailyStats, {"source_id": source_id, "day": day}, counters))
+
+    for source_id, counters in per_source.items():
+        connection.execute(_upsert(SourceStats, {"source_id": source_id}, counters))
+
+
+def _upsert(model, keys: dict, counters: Dict[str, int]):
+    table = model.__table__
+    values = {name: 0 for name in COUNTERS}
+    values.update(counters)
+    stmt = sqlite_insert(table).values(**keys, **values)
+    return stmt.on_conflict_do_update(
+        index_elements=list(keys),
+        set_={name: table.c[name] + value for name, value in counters.items()}
+    )
+
+
+def record_featured_changes(session: Session, changes: Iterable[Tuple[int, datetime, int]]):
+    """
+    记录精选状态变化（analysis_store 在 upsert 分析结果时调用）
+
+    Args:
+        changes: [(source_id, 文章 created_at, +1 / -1), ...]
+    """
+    deltas: Deltas = defaultdict(lambda: defaultdict(int))
+    for source_id, created_at, delta in changes:
+        deltas[_key(source_id, created_at)]["featured"] += delta
+    if deltas:
+        apply_deltas(session, deltas)
+
+
+def rebuild(db: Session):
+    """从 articles 全量重算两张统计表（一次 GROUP BY）"""
+    day = func.strftime("%Y-%m-%d", Article.created_at)
+    featured = func.sum(case((ArticleAnalysis.featured == True, 1), else_=0))  # noqa: E712
+    rows = db.query(
+        func.coalesce(Article.source_id, 0).label("source_id"),
+        day.label("day"),
+        func.count(Article.id).label("total"),
+        func.sum(case((func.coalesce(Article.fetch_status, "pending") == "pending", 1), else_=0)).label("pending"),
+        func.sum(case((Article.fetch_status == "fetched", 1), else_=0)).label("fetched"),
+        func.sum(case((Article.fetch_status == "failed", 1), else_=0)).label("failed"),
+        featured.label("featured"),
+        func.sum(func.coalesce(Article.word_count, 0)).label("word_count"),
+    ).outerjoin(
+        ArticleAnalysis, ArticleAnalysis.article_id == Article.id
+    ).group_by("source_id", "day").all()
+
+    db.query(SourceDailyStats).delete(synchronize_session=False)
+    db.query(SourceStats).delete(synchronize_session=False)
+
+    totals: Dict[int, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+    daily = []
+    for row in rows:
+        counters = {name: getattr(row, name) or 0 for name in COUNTERS}
+        daily.append({"source_id": row.source_id, "day": row.day, **counters})
+        for name, value in counters.items():
+            totals[row.source_id][name] += value
+
+    views = dict(db.query(
+        func.coalesce(ArticleViews.source_id, 0), func.sum(ArticleViews.views)
+    ).group_by(func.coalesce(ArticleViews.source_id, 0)).all())
+
+    if daily:
+        db.execute(sqlite_insert(SourceDailyStats), daily)
+    source_ids = set(totals) | set(views)
+    if source_ids:
+        db.execute(sqlite_insert(SourceStats), [
+            {"source_id": source_id, **{name: totals[source_id][name] for name in COUNTERS},
+             "views": views.get(source_id) or 0}
+            for source_id in source_ids
+        ])
+    db.commit()
+
+
+def ensure_built(db: Session):
+    """统计表为空而 articles 已有数据时（升级旧库）重算一次"""
+    if db.query(SourceStats.source_id).first() is None and db.query(Article.id).first() is not None:
+        rebuild(db)
+
+
+def rolling_stats(db: Session, windows: Tuple[int, ...] = WINDOWS) -> List[dict]:
+    """
+    每个源近 N 天（按入库日期）的计数与累计计数
+
+    只读取统计表：每个源最多 max(windows) 个日桶，与文章总数无关；
+    窗口内的阅读数按阅读日期统计（来自 article_view_daily）。
+    """
+    today = datetime.utcnow().date()
+    starts = {n: (today - timedelta(days=n - 1)).isoformat() for n in windows}
+    oldest = min(starts.values())
+
+    columns = []
+    for n, start in starts.items():
+        for name in COUNTERS:
+            columns.append(func.sum(case((SourceDailyStats.day >= start, getattr(SourceDailyStats, name)), else_=0))
+                           .label(f"{name}_{n}"))
+    window_rows = {
+        row.source_id: row for row in db.query(SourceDailyStats.source_id, *columns).filter(
+            SourceDailyStats.day >= oldest
+        ).group_by(SourceDailyStats.source_id).all()
+    }
+    view_columns = [
+        func.sum(case((ArticleViewDaily.day >= start, ArticleViewDaily.views), else_=0)).label(f"views_{n}")
+        for n, start in starts.items()
+    ]
+    view_rows = {
+        row.source_id: row for row in db.query(ArticleViewDaily.source_id, *view_columns).filter(
+            ArticleViewDaily.day >= oldest
+        ).group_by(ArticleViewDaily.source_id).all()
+    }
+
+    names = dict(db.query(RSSSource.id, RSSSource.name).all())
+    result = []
+    for totals in db.query(SourceStats).order_by(SourceStats.source_id).all():
+        row = window_rows.get(totals.source_id)
+        view_row = view_rows.get(totals.source_id)
+        result.append({
+            "source_id": totals.source_id,
+            "name": names.get(totals.source_id),
+            "windows": {
+                f"{n}d": {
+                    **{name: (getattr(row, f"{name}_{n}") or 0) if row else 0 for name in COUNTERS},
+                    "views": (getattr(view_row, f"views_{n}") or 0) if view_row else 0,
+                }
+                for n in windows
+            },
+            "totals": {name: getattr(totals, name) or 0 for name in COUNTERS + ("views",)},
+        })
+    return result
+
+
+def status_counts(db: Session) -> Dict[str, int]:
+    """全部文章的状态计数与阅读数（对每个源的累计计数求和）"""
+    names = COUNTERS + ("views",)
+    row = db.query(*[func.coalesce(func.sum(getattr(SourceStats, name)), 0).label(name) for name in names]).one()
+    return {name: getattr(row, name) for name in names}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="按源统计")
+    parser.add_argument("--rebuild", action="store_true", help="从 articles 全量重算统计表")
+    args = parser.parse_args()
+
+    from database import SessionLocal, init_db
+    init_db()
+    db = SessionLocal()
+    try:
+        if args.rebuild:
+            rebuild(db)
+        print(status_counts(db))
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
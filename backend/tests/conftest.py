@@ -0,0 +1,30 @@
+"""
+测试公共夹具：每个测试使用临时目录中的独立 SQLite 库，不接触 data/articles.db
+
+运行（在 backend 目录下）:
+    python -m pytest -q tests
+"""
+
+import os
+import sys
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import Base  # noqa: E402
+import models  # noqa: E402,F401  注册全部模型
+
+
+@pytest.fixture
+def db(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'articles.db'}", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=engine)
+    session = sessionmaker(autocommit=False, autoflush=False, bind=engine)()
+    try:
+        yield session
+    finally:
+        session.close()
+        engine.dispose()
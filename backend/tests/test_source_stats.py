@@ -0,0 +1,73 @@
+"""
+按源统计：增量计数在重新提取（提交 / 回滚后再修改文章）后仍与全量重算一致
+"""
+
+from datetime import datetime
+
+import page_store
+import settings
+import source_stats
+from models import Article, RSSSource, SourceDailyStats, SourceStats
+from rss_fetcher import RSSFetcher
+
+
+def _page(words: int) -> bytes:
+    paragraphs = "".join(
+        f"<p>{' '.join(f'word{i}x{j}' for j in range(words // 5))}</p>" for i in range(5)
+    )
+    return f"<html><head><title>t</title></head><body><article><h1>Title</h1>{paragraphs}</article></body></html>".encode()
+
+
+class _FakeHTTP:
+    def __init__(self):
+        self.body = _page(200)
+
+    def get_bytes(self, url, accept=None, max_body_size=None):
+        return self.body, None
+
+
+def _snapshot(db):
+    def rows(model, keys):
+        return sorted(
+            tuple(getattr(row, name) or 0 for name in keys + source_stats.COUNTERS)
+            for row in db.query(model).all()
+        )
+    return rows(SourceStats, ("source_id",)), rows(SourceDailyStats, ("source_id", "day"))
+
+
+def test_reextract_keeps_incremental_stats_consistent(db, tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "PAGE_STORE_ENABLED", True)
+    monkeypatch.setattr(page_store, "_store", page_store.PageStore(root=str(tmp_path / "pages")))
+
+    source = RSSSource(name="s", rss_url="http://example.com/feed")
+    db.add(source)
+    db.commit()
+    articles = [
+        Article(id=f"ART_{i}", source_id=source.id, title=f"a{i}", url=f"http://example.com/{i}",
+                created_at=datetime(2026, 10, 1 + i))
+        for i in range(3)
+    ]
+    db.add_all(articles)
+    db.commit()
+
+    fetcher = RSSFetcher(db)
+    fetcher.http = _FakeHTTP()
+
+    # 首次提取，再用不同长度的页面重新提取已提取的文章（store.put 之后提交，实例过期后再写指标与状态）
+    for article in articles:
+        fetcher.extract_full_content(article)
+    fetcher.http.body = _page(400)
+    fetcher.extract_full_content(articles[0])
+    fetcher.extract_full_content(articles[1], use_stored=True)
+
+    # 提取失败后回滚，再把已提取的文章标记为失败（与 _drain_extract_jobs 进入死信时相同）
+    db.rollback()
+    articles[2].fetch_status = "failed"
+    db.commit()
+
+    incremental = _snapshot(db)
+    totals = source_stats.status_counts(db)
+    assert totals["pending"] == 0 and totals["fetched"] == 2 and totals["failed"] == 1
+
+    source_stats.rebuild(db)
+    assert incremental == _snapshot(db)
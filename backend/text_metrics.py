@@ -0,0 +1,90 @@
+"""
+正文指标
+负责：计算字数（中日韩文字按字计，其他按词计）、字符数、估算 token 数、阅读时长与正文语言
+
+在全文提取时计算并存入 articles 表，Dify 工作流按长短分流时只需查询这些列，不必拉取正文。
+"""
+
+import math
+import re
+from typing import Dict
+
+# 中日韩统一表意文字（含扩展 A、兼容表意文字）
+_HAN = r"㐀-䶿一-鿿豈-﫿"
+_KANA = r"぀-ゟ゠-ヿ"
+_HANGUL = r"가-힯ᄀ-ᇿ"
+
+_HAN_RE = re.compile(f"[{_HAN}]")
+_KANA_RE = re.compile(f"[{_KANA}]")
+_HANGUL_RE = re.compile(f"[{_HANGUL}]")
+_CJK_RE = re.compile(f"[{_HAN}{_KANA}{_HANGUL}]")
+_WORD_RE = re.compile(r"[A-Za-z0-9À-ɏ]+(?:['’\-][A-Za-z0-9À-ɏ]+)*")
+
+# Markdown 中不计入正文的部分
+_IMAGE_RE = re.compile(r"!\[[^\]]*\]\([^)]*\)")
+_LINK_RE = re.compile(r"\[([^\]]*)\]\([^)]*\)")
+_URL_RE = re.compile(r"https?://\S+")
+
+CJK_CHARS_PER_MINUTE = 400  # 中文阅读速度（字/分钟）
+WORDS_PER_MINUTE = 230  # 英文阅读速度（词/分钟）
+TOKENS_PER_CJK_CHAR = 1.0  # 估算值：常见 LLM 分词器中一个汉字约 1 个 token
+TOKENS_PER_WORD = 1.3  # 估算值：英文一个词约 1.3 个 token
+
+
+def compute_metrics(markdown: str) -> Dict:
+    """
+    计算正文指标
+
+    Returns:
+        {"word_count", "char_count", "token_estimate", "reading_time_minutes", "content_language"}
+    """
+    text = _strip_markdown(markdown or "")
+
+    cjk_chars = len(_CJK_RE.findall(text))
+    latin_words = len(_WORD_RE.findall(text))
+
+    return {
+        "word_count": cjk_chars + latin_words,
+        "char_count": sum(1 for char in text if not char.isspace()),
+        "token_estimate": int(math.ceil(cjk_chars * TOKENS_PER_CJK_CHAR + latin_words * TOKENS_PER_WORD)),
+        "reading_time_minutes": _reading_time(cjk_chars, latin_words),
+        "content_language": detect_language(text),
+    }
+
+
+def detect_language(text: str) -> str:
+    """
+    根据文字系统粗略判断语言：假名 -> ja_JP，谚文 -> ko_KR，汉字为主 -> zh_CN，其他 -> en_US
+    """
+    kana = len(_KANA_RE.findall(text))
+    hangul = len(_HANGUL_RE.findall(text))
+    han = len(_HAN_RE.findall(text))
+    latin = len(_WORD_RE.findall(text))
+
+    if kana and kana * 5 >= han:
+        return "ja_JP"
+    if hangul and hangul >= han:
+        return "ko_KR"
+    # 汉字数量与英文词数相当时视为中文（技术文章常夹杂大量英文术语）
+    if han and han * 2 >= latin:
+        return "zh_CN"
+    return "en_US"
+
+
+def apply_metrics(article, markdown: str):
+    """把指标写入文章对象（不提交事务）"""
+    for field, value in compute_metrics(markdown).items():
+        setattr(article, field, value)
+
+
+def _reading_time(cjk_chars: int, latin_words: int) -> int:
+    """阅读时长（分钟，至少 1 分钟）"""
+    minutes = cjk_chars / CJK_CHARS_PER_MINUTE + latin_words / WORDS_PER_MINUTE
+    return max(1, int(math.ceil(minutes)))
+
+
+def _strip_markdown(markdown: str) -> str:
+    """去掉图片、链接地址等不属于正文的内容"""
+    text = _IMAGE_RE.sub(" ", markdown)
+    text = _LINK_RE.sub(r"\1", text)
+    return _URL_RE.sub(" ", text)
@@ -0,0 +1,225 @@
+"""
+阅读数统计
+负责：记录文章阅读（/api/resource/markdown、/api/articles/{id}），在内存中聚合后批量写入
+
+每次阅读都执行一条 UPDATE 会让所有读请求排队等待 SQLite 唯一的写锁，因此：
+- hit() 只在内存中累加（按文章分片加锁，多个线程同时记录时互不阻塞）；
+- 后台线程每 VIEW_FLUSH_SECONDS 秒（或缓冲的文章数超过 VIEW_MAX_BUFFERED 时提前）取走全部增量，
+  在一个事务中 UPSERT 到 article_views（累计）、article_view_daily（按天）与 source_stats.views（按源累计）；
+- 进程正常退出时（stop）写入剩余增量；进程崩溃最多丢失一个刷新周期内的阅读数。
+
+热门（累计阅读最多）与趋势（近 N 天阅读最多）只查询这些聚合表。
+"""
+
+import logging
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import func
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+
+from database import SessionLocal
+from models import Article, ArticleViewDaily, ArticleViews, SourceStats
+import settings
+
+logger = logging.getLogger(__name__)
+
+SHARDS = 16
+
+# (article_id, day) -> 阅读数
+Counts = Dict[Tuple[str, str], int]
+
+
+class _Shard:
+    __slots__ = ("lock", "counts")
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.counts: Counts = defaultdict(int)
+
+
+class ViewCounter:
+    """分片的内存阅读计数缓冲，定期批量写入数据库"""
+
+    def __init__(self, flush_seconds: float = None, max_buffered: int = None, shards: int = SHARDS):
+        self.flush_seconds = flush_seconds if flush_seconds is not None else settings.VIEW_FLUSH_SECONDS
+        self.max_buffered = max_buffered if max_buffered is not None else settings.VIEW_MAX_BUFFERED
+        self._shards = [_Shard() for _ in range(shards)]
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def hit(self, article_id: str, count: int = 1):
+        """记录一次阅读（只在内存中累加）"""
+        key = (article_id, time.strftime("%Y-%m-%d", time.gmtime()))
+        shard = self._shards[hash(article_id) % len(self._shards)]
+        with shard.lock:
+            shard.counts[key] += count
+            buffered = len(shard.counts)
+        if buffered * len(self._shards) >= self.max_buffered:
+            self._wakeup.set()
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="view-counter", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 10):
+        """停止后台线程并写入剩余增量"""
+        self._stop_event.set()
+        self._wakeup.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+        self.flush()
+
+    def flush(self) -> int:
+        """
+        取走缓冲中的全部增量并在一个事务中写入
+
+        Returns:
+            写入的阅读数；写入失败时增量放回缓冲，下次重试
+        """
+        with self._flush_lock:
+            counts = self._drain()
+            if not counts:
+                return 0
+            try:
+                return self._write(counts)
+            except Exception as e:
+                logger.warning(f"View counter flush failed, {len(counts)} entries kept for retry: {e}")
+                self._restore(counts)
+                return 0
+
+    def _run(self):
+        while not self._stop_event.is_set():
+            self._wakeup.wait(self.flush_seconds)
+            self._wakeup.clear()
+            self.flush()
+
+    def _drain(self) -> Counts:
+        counts: Counts = {}
+        for shard in self._shards:
+            with shard.lock:
+                if shard.counts:
+                    counts.update(shard.counts)
+                    shard.counts = defaultdict(int)
+        return counts
+
+    def _restore(self, counts: Counts):
+        for (article_id, day), count in counts.items():
+            shard = self._shards[hash(article_id) % len(self._shards)]
+            with shard.lock:
+                shard.counts[(article_id, day)] += count
+
+    def _write(self, counts: Counts) -> int:
+        db = SessionLocal()
+        try:
+            article_ids = list({article_id for article_id, _ in counts})
+            sources = {}
+            for i in range(0, len(article_ids), 500):
+                sources.update(db.query(Article.id, Article.source_id).filter(
+                    Article.id.in_(article_ids[i:i + 500])
+                ).all())
+
+            now = datetime.utcnow()
+            totals: Dict[str, int] = defaultdict(int)
+            daily = []
+            per_source: Dict[int, int] = defaultdict(int)
+            for (article_id, day), count in counts.items():
+                if article_id not in sources:
+                    continue  # 记录之后文章被删除
+                source_id = sources[article_id] or 0
+                totals[article_id] += count
+                per_source[source_id] += count
+                daily.append({"article_id": article_id, "day": day, "source_id": source_id, "views": count})
+
+            if not daily:
+                return 0
+
+            stmt = sqlite_insert(ArticleViews)
+            db.execute(stmt.on_conflict_do_update(
+                index_elements=["article_id"],
+                set_={
+                    "views": func.coalesce(ArticleViews.views, 0) + stmt.excluded.views,
+                    "last_viewed_at": stmt.excluded.last_viewed_at,
+                }
+            ), [
+                {"article_id": article_id, "source_id": sources[article_id] or 0, "views": count, "last_viewed_at": now}
+                for article_id, count in totals.items()
+            ])
+
+            stmt = sqlite_insert(ArticleViewDaily)
+            db.execute(stmt.on_conflict_do_update(
+                index_elements=["article_id", "day"],
+                set_={"views": func.coalesce(ArticleViewDaily.views, 0) + stmt.excluded.views}
+            ), daily)
+
+            stmt = sqlite_insert(SourceStats)
+            db.execute(stmt.on_conflict_do_update(
+                index_elements=["source_id"],
+                set_={"views": func.coalesce(SourceStats.views, 0) + stmt.excluded.views}
+            ), [{"source_id": source_id, "views": count} for source_id, count in per_source.items()])
+
+            db.commit()
+            return sum(totals.values())
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+
+_counter = ViewCounter()
+
+
+def get_view_counter() -> ViewCounter:
+    return _counter
+
+
+def delete_for_articles(db: Session, article_ids: List[str]):
+    """删除文章的阅读数并从 source_stats.views 中扣除（删除文章前调用，不提交）"""
+    per_source = db.query(ArticleViews.source_id, func.sum(ArticleViews.views)).filter(
+        ArticleViews.article_id.in_(article_ids)
+    ).group_by(ArticleViews.source_id).all()
+    for source_id, views in per_source:
+        db.query(SourceStats).filter(SourceStats.source_id == (source_id or 0)).update(
+            {SourceStats.views: func.coalesce(SourceStats.views, 0) - (views or 0)}, synchronize_session=False
+        )
+    db.query(ArticleViews).filter(ArticleViews.article_id.in_(article_ids)).delete(synchronize_session=False)
+    db.query(ArticleViewDaily).filter(ArticleViewDaily.article_id.in_(article_ids)).delete(synchronize_session=False)
+
+
+def popular(db: Session, limit: int = 20, source_id: int = None) -> List[dict]:
+    """累计阅读数最多的文章"""
+    query = db.query(
+        Article.id, Article.title, Article.url, Article.source_id, Article.category,
+        Article.published_at, ArticleViews.views
+    ).join(ArticleViews, ArticleViews.article_id == Article.id)
+    if source_id is not None:
+        query = query.filter(ArticleViews.source_id == source_id)
+    rows = query.order_by(ArticleViews.views.desc()).limit(limit).all()
+    return [row._asdict() for row in rows]
+
+
+def trending(db: Session, days: int = 7, limit: int = 20, source_id: int = None) -> List[dict]:
+    """近 N 天（按阅读日期）阅读数最多的文章"""
+    start = (datetime.utcnow().date() - timedelta(days=days - 1)).isoformat()
+    views = func.sum(ArticleViewDaily.views).label("views")
+    recent = db.query(ArticleViewDaily.article_id, views).filter(ArticleViewDaily.day >= start)
+    if source_id is not None:
+        recent = recent.filter(ArticleViewDaily.source_id == source_id)
+    recent = recent.group_by(ArticleViewDaily.article_id).order_by(views.desc()).limit(limit).subquery()
+
+    rows = db.query(
+        Article.id, Article.title, Article.url, Article.source_id, Article.category,
+        Article.published_at, recent.c.views
+    ).join(recent, recent.c.article_id == Article.id).order_by(recent.c.views.desc()).all()
+    return [row._asdict() for row in rows]
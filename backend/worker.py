@@ -0,0 +1,220 @@
+"""
+抓取 worker
+
+独立于 API 进程运行定时抓取和全文提取，两边通过数据库中的任务队列协作：
+API（ARTICLE_INGEST_MODE=external）收到手动抓取请求时只入队 fetch 任务，由 worker 领取执行。
+
+用法（在 backend 目录下）:
+    python -m worker                       # 常驻运行
+    python -m worker --extract-workers 4   # 4 个并发提取线程
+    python -m worker --once                # 抓取一轮并清空提取队列后退出（适合 cron）
+
+配置了 Dify 工作流（ARTICLE_DIFY_*_KEY）时，worker 同时运行工作流分发（见 dispatcher.py）。
+"""
+
+import argparse
+import logging
+import signal
+import threading
+
+from database import SessionLocal, init_db
+from job_queue import JobQueue, LEASE_SECONDS
+from models import Job
+from rss_fetcher import RSSFetcher, FETCH_JOB
+from dispatcher import Dispatcher, dispatch_enabled, enqueue_fetched_articles
+from scheduler import ArticleScheduler
+from settings import ARCHIVE_AFTER_DAYS
+import source_stats
+import profiling
+
+logger = logging.getLogger(__name__)
+
+
+class IngestWorker:
+    """抓取 + 提取 worker"""
+
+    def __init__(self, extract_workers: int = 2, fetch_interval_hours: int = 6,
+                 poll_seconds: int = 10, extract_batch: int = 10):
+        self.extract_workers = extract_workers
+        self.fetch_interval_hours = fetch_interval_hours
+        self.poll_seconds = poll_seconds
+        self.extract_batch = extract_batch
+        self.stop_event = threading.Event()
+
+    def run(self):
+        """常驻运行，直到收到 SIGINT/SIGTERM"""
+        db = SessionLocal()
+        try:
+            RSSFetcher(db).enqueue_pending_articles()
+            enqueue_fetched_articles(db)
+        finally:
+            db.close()
+
+        dispatcher = None
+        if dispatch_enabled():
+            dispatcher = Dispatcher()
+            dispatcher.start()
+
+        scheduler = ArticleScheduler()
+        scheduler.start_rss_fetching(interval_hours=self.fetch_interval_hours, run_now=False)
+        if ARCHIVE_AFTER_DAYS > 0:
+            scheduler.start_archiving(ARCHIVE_AFTER_DAYS)
+
+        threads = [
+            threading.Thread(target=self._extract_loop, name=f"extract-{i}", daemon=True)
+            for i in range(self.extract_workers)
+        ]
+        for thread in threads:
+            thread.start()
+
+        logger.info(f"👷 Worker started: {self.extract_workers} extract workers, "
+                    f"fetch every {self.fetch_interval_hours}h")
+
+        # 首次启动立即抓取一轮，之后由调度器定时触发
+        threading.Thread(target=scheduler._fetch_rss_job, name="fetch-initial", daemon=True).start()
+
+        try:
+            while not self.stop_event.is_set():
+                self._poll_fetch_jobs(scheduler)
+                self.stop_event.wait(self.poll_seconds)
+        finally:
+            scheduler.stop()
+            if dispatcher is not None:
+                dispatcher.stop()
+            for thread in threads:
+                thread.join(timeout=30)
+            logger.info("👷 Worker stopped")
+
+    def run_once(self) -> dict:
+        """抓取一轮并处理完当前提取队列"""
+        db = SessionLocal()
+        try:
+            fetcher = RSSFetcher(db)
+            fetcher.enqueue_pending_articles()
+            fetch_stats = fetcher.fetch_all_sources()
+            logger.info(f"✅ RSS fetch completed: {fetch_stats}")
+        finally:
+            db.close()
+
+        extract_stats = {"total": 0, "success": 0, "failed": 0, "dead": 0}
+        while True:
+            db = SessionLocal()
+            try:
+                stats = RSSFetcher(db).extract_batch_content(
+                    limit=self.extract_batch * self.extract_workers,
+                    workers=self.extract_workers
+                )
+            finally:
+                db.close()
+            for key in extract_stats:
+                extract_stats[key] += stats[key]
+            if stats["total"] == 0:
+                break
+        logger.info(f"✅ Content extraction completed: {extract_stats}")
+
+        result = {"fetch": fetch_stats, "extract": extract_stats}
+        if dispatch_enabled():
+            result["dispatch"] = Dispatcher().drain()
+            logger.info(f"✅ Workflow dispatch completed: {result['dispatch']}")
+        return result
+
+    def stop(self, *_):
+        """请求停止（信号处理函数）"""
+        logger.info("🛑 Stopping worker...")
+        self.stop_event.set()
+
+    def _extract_loop(self):
+        """单个提取线程：不断领取提取任务，队列为空时等待"""
+        while not self.stop_event.is_set():
+            db = SessionLocal()
+            try:
+                stats = RSSFetcher(db).extract_batch_content(limit=self.extract_batch)
+            except Exception as e:
+                logger.error(f"❌ Content extraction error: {str(e)}")
+                stats = {"total": 0}
+            finally:
+                db.close()
+
+            if stats["total"] == 0:
+                self.stop_event.wait(self.poll_seconds)
+
+    def _poll_fetch_jobs(self, scheduler: ArticleScheduler):
+        """
+        领取 API 入队的手动抓取任务
+
+        一轮抓取可能超过租约时长，抓取期间后台续租；定时抓取正在进行时本次跳过，
+        任务放回队列（不计入尝试次数），等那一轮结束后再领取执行。
+        """
+        db = SessionLocal()
+        try:
+            queue = JobQueue(db)
+            for job in queue.lease(FETCH_JOB, limit=1):
+                done = threading.Event()
+                renewer = threading.Thread(
+                    target=self._renew_lease, args=(job.id, queue.worker_id, done), name="fetch-lease", daemon=True
+                )
+                renewer.start()
+                try:
+                    ran = scheduler._fetch_rss_job()
+                finally:
+                    done.set()
+                    renewer.join()
+                if ran:
+                    queue.complete(job)
+                else:
+                    queue.release(job, delay_seconds=self.poll_seconds)
+        except Exception as e:
+            logger.error(f"❌ Fetch job error: {str(e)}")
+        finally:
+            db.close()
+
+    @staticmethod
+    def _renew_lease(job_id: int, worker_id: str, done: threading.Event):
+        """每 1/3 个租约时长续租一次（独立会话），直到 done 被设置"""
+        while not done.wait(LEASE_SECONDS / 3):
+            db = SessionLocal()
+            try:
+                job = db.get(Job, job_id)
+                if job is not None:
+                    JobQueue(db, worker_id=worker_id).extend(job)
+            except Exception as e:
+                logger.warning(f"⚠️ Fetch job lease renewal failed: {str(e)}")
+            finally:
+                db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="ArticleAggregator 抓取 worker")
+    parser.add_argument("--extract-workers", type=int, default=2, help="并发提取线程数")
+    parser.add_argument("--fetch-interval-hours", type=int, default=6, help="定时抓取间隔（小时）")
+    parser.add_argument("--poll-seconds", type=int, default=10, help="队列为空时的轮询间隔（秒）")
+    parser.add_argument("--extract-batch", type=int, default=10, help="每个提取线程单次领取的任务数")
+    parser.add_argument("--once", action="store_true", help="抓取一轮并清空提取队列后退出")
+    args = parser.parse_args()
+
+    init_db()
+    profiling.install()
+    db = SessionLocal()
+    try:
+        source_stats.ensure_built(db)
+    finally:
+        db.close()
+
+    worker = IngestWorker(
+        extract_workers=args.extract_workers,
+        fetch_interval_hours=args.fetch_interval_hours,
+        poll_seconds=args.poll_seconds,
+        extract_batch=args.extract_batch
+    )
+
+    if args.once:
+        worker.run_once()
+        return
+
+    signal.signal(signal.SIGINT, worker.stop)
+    signal.signal(signal.SIGTERM, worker.stop)
+    worker.run()
+
+
+if __name__ == "__main__":
+    main()